@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Page, Widget, Link
+from .models import Page, Widget, Link, NoteRevision
 
 @admin.register(Page)
 class PageAdmin(admin.ModelAdmin):
@@ -23,6 +23,9 @@ class WidgetAdmin(admin.ModelAdmin):
     # Ajoute un filtre sur le côté pour trier les widgets par page.
     list_filter = ('page',)
 
+    # Le texte des notes s'édite dans le tableau de bord (tampon d'écriture, compression, historique).
+    exclude = ('content', 'content_version', 'content_compressed', 'content_length', 'content_preview')
+
 @admin.register(Link)
 class LinkAdmin(admin.ModelAdmin):
     """
@@ -33,3 +36,13 @@ class LinkAdmin(admin.ModelAdmin):
 
     # Ajoute des filtres pour trier les liens par page (via le widget) et par widget.
     list_filter = ('widget__page', 'widget')
+
+@admin.register(NoteRevision)
+class NoteRevisionAdmin(admin.ModelAdmin):
+    """
+    Configuration de l'interface d'administration pour le modèle NoteRevision.
+    """
+    # Le contenu est compressé : on n'affiche que les métadonnées (voir l'API des révisions).
+    list_display = ('widget', 'version', 'created_at', 'updated_at', 'length', 'is_snapshot')
+    list_filter = ('widget',)
+    exclude = ('data',)
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    """Configuration de l'application 'dashboard'.
+
+    Branche les signaux (invalidation des caches) au démarrage de Django.
+    """
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'dashboard'
+
+    def ready(self):
+        # Import pour enregistrer les @receiver de dashboard/signals.py
+        from . import signals  # noqa: F401
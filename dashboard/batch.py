@@ -0,0 +1,227 @@
+"""Application d'un lot d'opérations du tableau de bord en une seule transaction.
+
+Une session de réorganisation (glisser des liens, renommer des widgets,
+déplacer des widgets ou des liens d'une page à l'autre, supprimer) envoyait
+jusqu'ici une requête par geste. Le client (scripts.html) met désormais ces
+gestes en file et les envoie ensemble à `api/batch/` :
+
+    {"ops": [
+        {"op": "move_link", "id": 12, "widget_id": 3, "prev_id": 10, "next_id": null},
+        {"op": "rename_widget", "id": 3, "title": "Outils"},
+        {"op": "move_widget_to_page", "id": 3, "page_id": 2},
+        {"op": "delete_link", "id": 15}
+    ]}
+
+Tous les objets cités sont chargés en une requête par modèle, puis les
+opérations sont appliquées dans l'ordre. Si l'une d'elles échoue, rien
+n'est écrit (transaction annulée).
+
+Chaque écriture passe par `save()` / `delete()` : les signaux (caches,
+index de recherche) fonctionnent comme pour les vues unitaires.
+"""
+from django.db import transaction
+from django.utils.text import slugify
+
+from . import ordering
+from .models import Link, Page, Widget
+
+MAX_OPERATIONS = 500
+
+
+class BatchError(Exception):
+    """Opération invalide dans un lot ; `index` est sa position dans la liste."""
+
+    def __init__(self, index, message):
+        super().__init__(message)
+        self.index = index
+        self.message = message
+
+
+def _id(op, name, required=True):
+    value = op.get(name)
+    if value in (None, ''):
+        if required:
+            raise ValueError(f"champ '{name}' manquant")
+        return None
+    if isinstance(value, bool) or not str(value).isdigit():
+        raise ValueError(f"champ '{name}' invalide")
+    return int(value)
+
+
+def _text(op, name):
+    value = op.get(name)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"champ '{name}' manquant")
+    return value
+
+
+class _Batch:
+    """État d'un lot en cours : objets déjà chargés, indexés par modèle puis par ID."""
+
+    def __init__(self, ops):
+        self.ops = ops
+        self.objects = {Page: {}, Widget: {}, Link: {}}
+
+    def preload(self):
+        """Charge en une requête par modèle tous les objets cités par le lot."""
+        wanted = {Page: set(), Widget: set(), Link: set()}
+        for op in self.ops:
+            model = OPERATIONS.get(op.get('op'), (None,))[0]
+            for name, target in (('id', model), ('widget_id', Widget), ('page_id', Page)):
+                try:
+                    value = _id(op, name, required=False)
+                except ValueError:
+                    continue  # Signalé avec son index lors de l'application
+                if target is not None and value is not None:
+                    wanted[target].add(value)
+        for model, ids in wanted.items():
+            if ids:
+                self.objects[model].update(model.objects.in_bulk(ids))
+
+    def get(self, model, pk):
+        obj = self.objects[model].get(pk)
+        if obj is None:
+            raise ValueError(f"{model.__name__} {pk} introuvable")
+        return obj
+
+    def forget_widget(self, widget_id):
+        """Retire du cache local un widget supprimé et ses liens (supprimés en cascade)."""
+        self.objects[Widget].pop(widget_id, None)
+        links = self.objects[Link]
+        for link_id in [pk for pk, link in links.items() if link.widget_id == widget_id]:
+            del links[link_id]
+
+    # --- Opérations -----------------------------------------------------------
+
+    def move_link(self, op):
+        link = self.get(Link, _id(op, 'id'))
+        widget = self.get(Widget, _id(op, 'widget_id'))
+        ordering.move_between(
+            link, Link.objects.filter(widget_id=widget.id),
+            prev_id=_id(op, 'prev_id', False), next_id=_id(op, 'next_id', False),
+            widget=widget,
+        )
+
+    def move_widget(self, op):
+        widget = self.get(Widget, _id(op, 'id'))
+        ordering.move_between(
+            widget, Widget.objects.filter(page_id=widget.page_id),
+            prev_id=_id(op, 'prev_id', False), next_id=_id(op, 'next_id', False),
+        )
+
+    def move_page(self, op):
+        page = self.get(Page, _id(op, 'id'))
+        ordering.move_between(
+            page, Page.objects.all(),
+            prev_id=_id(op, 'prev_id', False), next_id=_id(op, 'next_id', False),
+        )
+
+    def move_widget_to_page(self, op):
+        widget = self.get(Widget, _id(op, 'id'))
+        page = self.get(Page, _id(op, 'page_id'))
+        if widget.page_id == page.id:
+            return
+        widget.page = page
+        widget.order = ordering.next_order(page.widgets.all())
+        widget.save(update_fields=['page', 'order'])
+
+    def move_link_to_page(self, op):
+        link = self.get(Link, _id(op, 'id'))
+        page = self.get(Page, _id(op, 'page_id'))
+        # Même règle que la vue move_link_to_page : premier widget de la page, en fin de liste
+        widget = page.widgets.first()
+        if widget is None:
+            raise ValueError(f"la page '{page.name}' n'a aucun widget")
+        link.widget = widget
+        link.order = ordering.next_order(widget.links.all())
+        link.save(update_fields=['widget', 'order'])
+
+    def rename_link(self, op):
+        link = self.get(Link, _id(op, 'id'))
+        link.title = _text(op, 'title')
+        fields = ['title']
+        if 'url' in op:
+            link.url = op['url'] or None
+            fields.append('url')
+        link.save(update_fields=fields)
+
+    def rename_widget(self, op):
+        widget = self.get(Widget, _id(op, 'id'))
+        widget.title = _text(op, 'title')
+        widget.save(update_fields=['title'])
+
+    def rename_page(self, op):
+        page = self.get(Page, _id(op, 'id'))
+        page.name = _text(op, 'name')
+        # Même règle que la vue rename_page : le slug suit le nom
+        page.slug = slugify(page.name)
+        # Le slug est unique : sans ce contrôle, l'IntegrityError donnerait une erreur 500
+        if Page.objects.filter(slug=page.slug).exclude(pk=page.pk).exists():
+            raise ValueError(f"une autre page a déjà l'adresse '{page.slug}'")
+        page.save(update_fields=['name', 'slug'])
+
+    def delete_link(self, op):
+        link_id = _id(op, 'id')
+        self.get(Link, link_id).delete()
+        del self.objects[Link][link_id]
+
+    def delete_widget(self, op):
+        widget_id = _id(op, 'id')
+        self.get(Widget, widget_id).delete()
+        self.forget_widget(widget_id)
+
+    def delete_page(self, op):
+        page_id = _id(op, 'id')
+        self.get(Page, page_id).delete()
+        del self.objects[Page][page_id]
+        for widget_id in [pk for pk, widget in self.objects[Widget].items() if widget.page_id == page_id]:
+            self.forget_widget(widget_id)
+
+
+# op -> (modèle désigné par 'id', méthode de _Batch)
+OPERATIONS = {
+    'move_link': (Link, _Batch.move_link),
+    'move_widget': (Widget, _Batch.move_widget),
+    'move_page': (Page, _Batch.move_page),
+    'move_widget_to_page': (Widget, _Batch.move_widget_to_page),
+    'move_link_to_page': (Link, _Batch.move_link_to_page),
+    'rename_link': (Link, _Batch.rename_link),
+    'rename_widget': (Widget, _Batch.rename_widget),
+    'rename_page': (Page, _Batch.rename_page),
+    'delete_link': (Link, _Batch.delete_link),
+    'delete_widget': (Widget, _Batch.delete_widget),
+    'delete_page': (Page, _Batch.delete_page),
+}
+
+
+def apply(ops):
+    """Applique une liste ordonnée d'opérations, toutes ou aucune.
+
+    Args:
+        ops (list[dict]): Les opérations, chacune avec une clé 'op' (voir OPERATIONS)
+            et les champs propres à ce type d'opération.
+
+    Returns:
+        int: Le nombre d'opérations appliquées.
+
+    Raises:
+        BatchError: Si une opération est inconnue, incomplète ou cite un objet
+            introuvable. Aucune écriture n'est alors conservée.
+    """
+    if not isinstance(ops, list):
+        raise BatchError(None, "'ops' doit être une liste")
+    if len(ops) > MAX_OPERATIONS:
+        raise BatchError(None, f"au plus {MAX_OPERATIONS} opérations par lot")
+    for index, op in enumerate(ops):
+        if not isinstance(op, dict) or op.get('op') not in OPERATIONS:
+            raise BatchError(index, "opération inconnue")
+
+    batch = _Batch(ops)
+    with transaction.atomic():
+        batch.preload()
+        for index, op in enumerate(ops):
+            try:
+                OPERATIONS[op['op']][1](batch, op)
+            except ValueError as exc:
+                raise BatchError(index, str(exc)) from exc
+    return len(ops)
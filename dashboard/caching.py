@@ -0,0 +1,201 @@
+"""Cache des fragments HTML des widgets.
+
+Chaque widget possède un numéro de révision stocké dans le cache Django.
+Le HTML rendu de `partials/widget.html` est mis en cache sous la clé
+(id du widget, révision) : dès que la révision change (voir signals.py),
+l'ancienne entrée n'est plus jamais lue et finit par expirer.
+
+Le jeton CSRF des formulaires est propre à chaque navigateur : le fragment
+est donc rendu avec un marqueur, remplacé par le vrai jeton à chaque requête.
+
+Une révision globale (toutes pages confondues) sert à calculer l'ETag de la
+vue `index` : tant qu'elle ne change pas, le navigateur reçoit un 304.
+
+Les révisions vivent dans le cache Django (LocMemCache par défaut), propre à
+chaque processus : avec plusieurs workers, une écriture n'invaliderait que
+le cache de son propre processus. D'où l'exigence d'un processus unique, ou
+d'un backend partagé, décrite près de CACHES dans les réglages.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+WIDGET_TEMPLATE = 'partials/widget.html'
+DASHBOARD_REVISION_KEY = 'dashboard:rev'
+WIDGET_REVISION_KEY = 'dashboard:widget-rev:{}'
+WIDGET_FRAGMENT_KEY = 'dashboard:widget-html:{}:{}'
+CSRF_PLACEHOLDER = '__DASHBOARD_CSRF_TOKEN__'
+
+# Change à chaque redémarrage : un nouveau code ou de nouveaux templates invalident les ETags
+_BOOT_ID = time.time_ns()
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _new_revision():
+    """Renvoie une révision initiale unique (utilisée si la clé a été évincée du cache)."""
+    return time.time_ns()
+
+
+def get_dashboard_revision():
+    """Renvoie la révision globale du tableau de bord (pages, widgets et liens)."""
+    revision = cache.get(DASHBOARD_REVISION_KEY)
+    if revision is None:
+        revision = _new_revision()
+        if not cache.add(DASHBOARD_REVISION_KEY, revision, timeout=None):
+            revision = cache.get(DASHBOARD_REVISION_KEY, revision)
+    return revision
+
+
+def bump_dashboard_revision():
+    """Invalide l'ETag de toutes les pages après une écriture."""
+    try:
+        cache.incr(DASHBOARD_REVISION_KEY)
+    except ValueError:
+        cache.set(DASHBOARD_REVISION_KEY, _new_revision(), timeout=None)
+
+
+def page_etag(request, slug=None):
+    """Calcule l'ETag de la vue `index` sans toucher à la base de données.
+
+    Le cookie CSRF fait partie de la clé : le HTML contient le jeton du navigateur.
+    Les en-têtes HTMX aussi : un changement d'onglet reçoit un fragment, pas la page.
+    La révision globale ne change qu'une fois l'écriture validée (voir
+    `bump_revisions`) : un ETag n'est jamais associé à un contenu pas encore écrit.
+
+    Args:
+        request (HttpRequest): La requête courante.
+        slug (str, optional): Le slug de la page demandée.
+
+    Returns:
+        str: L'ETag (sans guillemets, ajoutés par Django).
+    """
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    variant = f"{request.headers.get('HX-Request', '')}:{request.headers.get('HX-History-Restore-Request', '')}"
+    raw = f"{_BOOT_ID}:{get_dashboard_revision()}:{slug or ''}:{csrf_cookie}:{variant}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def widget_etag(request, widget_id):
+    """Calcule l'ETag du fragment d'un widget (voir la vue `widget_fragment`)."""
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    revision = get_widget_revisions([widget_id])[widget_id]
+    raw = f"{_BOOT_ID}:{widget_id}:{revision}:{csrf_cookie}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_widget_revisions(widget_ids):
+    """Renvoie un dictionnaire {widget_id: révision} en un seul accès au cache."""
+    keys = {WIDGET_REVISION_KEY.format(widget_id): widget_id for widget_id in widget_ids}
+    found = cache.get_many(keys)
+
+    missing = {key: _new_revision() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+
+    return {widget_id: found[key] for key, widget_id in keys.items()}
+
+
+def bump_widget_revision(widget_id):
+    """Invalide le fragment d'un widget en incrémentant sa révision."""
+    key = WIDGET_REVISION_KEY.format(widget_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Clé absente (jamais lue ou évincée) : une nouvelle valeur suffit
+        cache.set(key, _new_revision(), timeout=None)
+
+
+def bump_revisions(widget_ids=()):
+    """Invalide les fragments de `widget_ids` et l'ETag de toutes les pages.
+
+    À appeler une fois l'écriture validée (voir signals.py). La révision
+    globale change avant et après celles des widgets :
+
+    - un rendu qui lit une révision de widget déjà incrémentée voit forcément
+      la révision globale changer depuis le chargement de ses lignes, et ne
+      met donc rien en cache (voir `render_widgets`) ;
+    - l'ETag final n'est jamais associé aux anciens fragments.
+
+    Args:
+        widget_ids (iterable[int]): Les widgets dont le fragment a changé.
+    """
+    widget_ids = set(widget_ids)
+    bump_dashboard_revision()
+    for widget_id in widget_ids:
+        bump_widget_revision(widget_id)
+    if widget_ids:
+        bump_dashboard_revision()
+
+
+def _record(hits, misses):
+    with _stats_lock:
+        _stats['hits'] += hits
+        _stats['misses'] += misses
+
+
+def get_stats():
+    """Renvoie les compteurs de succès/échecs du cache de fragments (pour ce processus)."""
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else None,
+    }
+
+
+def render_widgets(request, widgets, dashboard_revision):
+    """Rend une liste de widgets en réutilisant les fragments déjà en cache.
+
+    Seuls les widgets absents du cache sont rendus ; leurs liens sont alors
+    chargés en une seule requête (prefetch).
+
+    Les révisions des widgets ne sont connues qu'après le chargement de leurs
+    lignes : si une écriture a été validée entre les deux, les lignes sont
+    anciennes mais les révisions nouvelles. La révision globale, lue avant le
+    chargement, le détecte : les fragments sont alors rendus sans être mis en
+    cache.
+
+    Args:
+        request (HttpRequest): La requête courante (pour le jeton CSRF).
+        widgets (list[Widget]): Les widgets à afficher, dans l'ordre.
+        dashboard_revision (int): `get_dashboard_revision()`, lue avant de
+            charger `widgets` depuis la base.
+
+    Returns:
+        list[tuple[Widget, str]]: Couples (widget, HTML prêt à insérer).
+    """
+    revisions = get_widget_revisions([widget.id for widget in widgets])
+    cacheable = get_dashboard_revision() == dashboard_revision
+    keys = {widget.id: WIDGET_FRAGMENT_KEY.format(widget.id, revisions[widget.id]) for widget in widgets}
+    fragments = cache.get_many(keys.values())
+
+    missing = [widget for widget in widgets if keys[widget.id] not in fragments]
+    _record(hits=len(widgets) - len(missing), misses=len(missing))
+
+    if missing:
+        prefetch_related_objects(missing, 'links')
+        rendered = {
+            keys[widget.id]: render_to_string(WIDGET_TEMPLATE, {'widget': widget, 'csrf_token': CSRF_PLACEHOLDER})
+            for widget in missing
+        }
+        if cacheable:
+            cache.set_many(rendered, timeout=settings.DASHBOARD_FRAGMENT_CACHE_TIMEOUT)
+        fragments.update(rendered)
+
+    token = get_token(request)
+    return [
+        (widget, mark_safe(fragments[keys[widget.id]].replace(CSRF_PLACEHOLDER, token)))
+        for widget in widgets
+    ]
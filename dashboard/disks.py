@@ -0,0 +1,180 @@
+"""Découverte des disques à surveiller et mesure de leur occupation.
+
+Les points de montage sont lus dans /proc/self/mounts puis filtrés :
+
+- types de système de fichiers acceptés : DASHBOARD_MONITOR_DISK_FSTYPES ;
+- points de montage ignorés (motifs fnmatch) : DASHBOARD_MONITOR_DISK_EXCLUDE ;
+- un même périphérique monté plusieurs fois (bind mounts) n'est gardé qu'une fois ;
+- nom affiché : DASHBOARD_MONITOR_DISK_NAMES (point de montage -> nom), sinon
+  le dernier élément du chemin.
+
+La liste est gardée jusqu'à ce que la table des montages change : le noyau
+le signale sur le descripteur de /proc/self/mounts (POLLPRI), sans relire
+le fichier à chaque mesure.
+
+`disk_usage` (statvfs) peut bloquer indéfiniment sur un montage réseau qui
+ne répond plus. Chaque appel passe donc par son propre thread ; tous sont
+lancés ensemble et attendus au plus DASHBOARD_MONITOR_DISK_TIMEOUT secondes
+au total. Un disque qui ne répond pas est affiché comme tel et n'est plus
+interrogé tant que l'appel bloqué n'est pas revenu. Un thread par appel, et
+non un pool partagé : des montages bloqués ne peuvent pas occuper tous les
+threads et faire attendre les disques sains.
+"""
+import fnmatch
+import os
+import re
+import select
+import threading
+import time
+
+import psutil
+from django.conf import settings
+
+MOUNTS_FILE = '/proc/self/mounts'
+
+_lock = threading.Lock()
+_inflight = {}  # point de montage -> thread d'un appel qui a dépassé le délai
+
+
+def _unescape(field):
+    # /proc/mounts code les espaces, tabulations et antislashs en octal (\040)
+    raw = re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), field)
+    return raw.encode('latin-1').decode('utf-8', 'replace')
+
+
+def parse_mounts(text):
+    """Analyse le contenu de /proc/mounts.
+
+    Returns:
+        list[tuple[str, str, str]]: (périphérique, point de montage, type) de chaque ligne.
+    """
+    mounts = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 3:
+            mounts.append((_unescape(fields[0]), _unescape(fields[1]), fields[2]))
+    return mounts
+
+
+def select_disks(mounts):
+    """Applique les règles de filtrage (voir le docstring du module) aux montages.
+
+    Returns:
+        list[dict]: {'name', 'path'} de chaque disque à surveiller, dans l'ordre de montage.
+    """
+    fstypes = set(settings.DASHBOARD_MONITOR_DISK_FSTYPES)
+    names = settings.DASHBOARD_MONITOR_DISK_NAMES
+    disks, devices = [], set()
+    for device, path, fstype in mounts:
+        if fstype not in fstypes or device in devices:
+            continue
+        if any(fnmatch.fnmatch(path, pattern) for pattern in settings.DASHBOARD_MONITOR_DISK_EXCLUDE):
+            continue
+        devices.add(device)
+        disks.append({'name': names.get(path) or os.path.basename(path) or path, 'path': path})
+    return disks
+
+
+class MountTable:
+    """Liste des disques à surveiller, relue seulement quand la table des montages change."""
+
+    def __init__(self, path=MOUNTS_FILE):
+        self.path = path
+        self._file = None
+        self._poller = None
+        self._disks = None
+
+    def _changed(self):
+        if self._file is None:
+            self._file = open(self.path, encoding='latin-1')
+            self._poller = select.poll()
+            self._poller.register(self._file.fileno(), select.POLLPRI | select.POLLERR)
+            return True
+        return bool(self._poller.poll(0))
+
+    def disks(self):
+        """Renvoie les disques à surveiller (voir select_disks)."""
+        with _lock:
+            try:
+                changed = self._changed()
+            except OSError:
+                # Pas de /proc (hors Linux) : liste de psutil, relue à chaque fois
+                return select_disks([(p.device, p.mountpoint, p.fstype) for p in psutil.disk_partitions(all=True)])
+            if changed or self._disks is None:
+                # Relire le fichier depuis le début acquitte la notification du noyau
+                self._file.seek(0)
+                self._disks = select_disks(parse_mounts(self._file.read()))
+            return self._disks
+
+
+mount_table = MountTable()
+
+
+class _Measure(threading.Thread):
+    """Appel de `disk_usage` dans son propre thread.
+
+    Thread daemon : un appel bloqué pour toujours n'empêche pas l'arrêt du serveur.
+    """
+
+    def __init__(self, path):
+        super().__init__(name=f'disk-usage {path}', daemon=True)
+        self.path = path
+        self.usage = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.usage = psutil.disk_usage(self.path)
+        except OSError as e:
+            self.error = e
+
+
+def _start(disk):
+    """Lance la mesure d'un disque ; renvoie None si l'appel précédent est toujours bloqué."""
+    path = disk['path']
+    with _lock:
+        stuck = _inflight.get(path)
+        if stuck is not None:
+            if stuck.is_alive():
+                return None  # Inutile d'en lancer un autre
+            del _inflight[path]
+    measure = _Measure(path)
+    measure.start()
+    return measure
+
+
+def get_disks_info():
+    """Mesure l'occupation des disques découverts.
+
+    Toutes les mesures sont lancées ensemble : l'attente totale est d'au plus
+    DASHBOARD_MONITOR_DISK_TIMEOUT, quel que soit le nombre de disques bloqués.
+
+    Returns:
+        list[dict]: 'name', 'path', 'percent', 'free_gb', 'total_gb' de chaque
+            disque ; un disque qui ne répond pas a 'stalled' à True et des
+            valeurs à None. Les disques démontés entre-temps sont ignorés.
+    """
+    started = [(disk, _start(disk)) for disk in mount_table.disks()]
+    deadline = time.monotonic() + settings.DASHBOARD_MONITOR_DISK_TIMEOUT
+    disks_info = []
+    for disk, measure in started:
+        if measure is not None:
+            measure.join(max(deadline - time.monotonic(), 0))
+            if measure.is_alive():
+                with _lock:
+                    _inflight[disk['path']] = measure
+                measure = None
+        if measure is None:
+            disks_info.append({**disk, 'stalled': True, 'percent': None, 'free_gb': None, 'total_gb': None})
+            continue
+        if measure.error is not None:
+            continue  # Démonté entre-temps, ou accès refusé
+        usage = measure.usage
+        disks_info.append({
+            **disk,
+            'stalled': False,
+            'percent': usage.percent,
+            'free_gb': round(usage.free / (1024 ** 3), 0),
+            'total_gb': round(usage.total / (1024 ** 3), 0)
+        })
+    return disks_info
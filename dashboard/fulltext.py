@@ -0,0 +1,179 @@
+"""Recherche plein texte (SQLite FTS5) dans les notes et les liens.
+
+Les tables virtuelles `dashboard_note_fts` et `dashboard_link_fts` sont
+créées par la migration 0009. Leur rowid est l'id du widget (note) ou du
+lien indexé. Les deux index sont tenus à jour en Python par `index_note()`,
+`index_link()`... (appelées par signals.py, dans la transaction de
+l'écriture) : le texte des grandes notes est stocké compressé, et sous
+SQLite les triggers disparaissaient à chaque reconstruction de table par
+une migration (voir 0011 et 0014).
+"""
+from django.db import connection, transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Widget
+
+# Marqueurs neutres posés par snippet()/highlight(), remplacés par <mark> après échappement HTML
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+
+def is_available():
+    """Indique si la recherche plein texte est disponible (base SQLite)."""
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """Transforme la saisie de l'utilisateur en requête FTS5 sûre.
+
+    Chaque mot est mis entre guillemets (les opérateurs FTS5 tapés par
+    l'utilisateur sont donc ignorés) ; le dernier mot est cherché en préfixe.
+
+    Args:
+        text (str): La saisie brute, ex. 'cle ssh'.
+
+    Returns:
+        str: La requête MATCH, ex. '"cle" "ssh"*', ou '' si aucun mot.
+    """
+    words = [word.replace('"', '""') for word in text.split()]
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _highlight(fragment):
+    return mark_safe(escape(fragment or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>'))
+
+
+def search(text, limit=20):
+    """Cherche dans les notes et les liens, résultats classés par pertinence (bm25).
+
+    Args:
+        text (str): La saisie de l'utilisateur.
+        limit (int): Nombre maximal de résultats par type.
+
+    Returns:
+        list[dict]: Résultats avec 'kind' ('note' ou 'link'), 'id', 'title',
+            'snippet' (HTML échappé, termes trouvés dans des <mark>),
+            'url', 'page', 'page_slug' et 'rank' (plus petit = meilleur).
+    """
+    match = build_match_query(text)
+    if not match or not is_available():
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT w.id, w.title, p.name, p.slug,
+                   snippet(dashboard_note_fts, 1, '{_MARK_START}', '{_MARK_END}', '…', 16),
+                   bm25(dashboard_note_fts, 5.0, 1.0) AS rank
+            FROM dashboard_note_fts
+            JOIN dashboard_widget w ON w.id = dashboard_note_fts.rowid
+            JOIN dashboard_page p ON p.id = w.page_id
+            WHERE dashboard_note_fts MATCH %s
+            ORDER BY rank LIMIT %s
+            """,
+            [match, limit],
+        )
+        notes = [
+            {'kind': 'note', 'id': widget_id, 'title': title, 'page': page, 'page_slug': slug,
+             'url': '', 'snippet': _highlight(fragment), 'rank': rank}
+            for widget_id, title, page, slug, fragment, rank in cursor.fetchall()
+        ]
+
+        cursor.execute(
+            f"""
+            SELECT l.id, l.title, l.url, p.name, p.slug,
+                   highlight(dashboard_link_fts, 0, '{_MARK_START}', '{_MARK_END}'),
+                   bm25(dashboard_link_fts, 5.0, 1.0) AS rank
+            FROM dashboard_link_fts
+            JOIN dashboard_link l ON l.id = dashboard_link_fts.rowid
+            JOIN dashboard_widget w ON w.id = l.widget_id
+            JOIN dashboard_page p ON p.id = w.page_id
+            WHERE dashboard_link_fts MATCH %s
+            ORDER BY rank LIMIT %s
+            """,
+            [match, limit],
+        )
+        links = [
+            {'kind': 'link', 'id': link_id, 'title': title, 'page': page, 'page_slug': slug,
+             'url': url or '', 'snippet': _highlight(fragment), 'rank': rank}
+            for link_id, title, url, page, slug, fragment, rank in cursor.fetchall()
+        ]
+
+    return sorted(notes + links, key=lambda result: result['rank'])[:limit]
+
+
+def index_note(widget):
+    """Met à jour l'entrée d'une note dans l'index plein texte.
+
+    Args:
+        widget (Widget): Le widget, chargé avec son texte (compressé ou non).
+    """
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM dashboard_note_fts WHERE rowid = %s", [widget.id])
+        if widget.widget_type == 'note':
+            cursor.execute(
+                "INSERT INTO dashboard_note_fts(rowid, title, content) VALUES (%s, %s, %s)",
+                [widget.id, widget.title, widget.get_note_text()],
+            )
+
+
+def unindex_note(widget_id):
+    """Retire une note supprimée de l'index plein texte."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM dashboard_note_fts WHERE rowid = %s", [widget_id])
+
+
+def index_link(link):
+    """Met à jour l'entrée d'un lien dans l'index plein texte."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM dashboard_link_fts WHERE rowid = %s", [link.id])
+        cursor.execute(
+            "INSERT INTO dashboard_link_fts(rowid, title, url) VALUES (%s, %s, %s)",
+            [link.id, link.title, link.url or ''],
+        )
+
+
+def unindex_link(link_id):
+    """Retire un lien supprimé de l'index plein texte."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DELETE FROM dashboard_link_fts WHERE rowid = %s", [link_id])
+
+
+def rebuild():
+    """Reconstruit entièrement l'index plein texte à partir des tables du tableau de bord.
+
+    Returns:
+        tuple[int, int]: Nombre de notes et de liens indexés.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("DELETE FROM dashboard_note_fts")
+        # Le texte des grandes notes est compressé : il est décompressé ici, note par note
+        notes = 0
+        for widget in Widget.objects.filter(widget_type='note').iterator():
+            cursor.execute(
+                "INSERT INTO dashboard_note_fts(rowid, title, content) VALUES (%s, %s, %s)",
+                [widget.id, widget.title, widget.get_note_text()],
+            )
+            notes += 1
+        cursor.execute("DELETE FROM dashboard_link_fts")
+        cursor.execute(
+            """INSERT INTO dashboard_link_fts(rowid, title, url)
+               SELECT id, title, coalesce(url, '') FROM dashboard_link"""
+        )
+        links = cursor.rowcount
+        cursor.execute("INSERT INTO dashboard_note_fts(dashboard_note_fts) VALUES ('optimize')")
+        cursor.execute("INSERT INTO dashboard_link_fts(dashboard_link_fts) VALUES ('optimize')")
+    return notes, links
@@ -0,0 +1,177 @@
+"""Lecture continue des métriques GPU (nvidia-smi en boucle).
+
+Au lieu de lancer `nvidia-smi --query-gpu=...` à chaque mesure, un seul
+processus `nvidia-smi --loop=N` reste ouvert : il écrit une ligne CSV par
+GPU toutes les N secondes, lue au fil de l'eau par un thread :
+
+    index, température, mémoire utilisée (MiB), mémoire totale (MiB), nom
+
+Plusieurs GPU sont suivis (une entrée par index). Une valeur non mesurée
+(`[N/A]`, `[Not Supported]`) vaut None.
+
+Si la commande est introuvable ou s'arrête (pas de GPU Nvidia, driver
+absent), l'erreur est signalée une seule fois et la commande n'est relancée
+qu'après un délai qui double à chaque échec (GPU_RETRY_MIN à GPU_RETRY_MAX).
+
+La commande se règle avec DASHBOARD_MONITOR_GPU_COMMAND : n'importe quel
+programme qui écrit des lignes au même format convient. Sur une machine
+sans GPU, une source factice est fournie :
+
+    DASHBOARD_MONITOR_GPU_COMMAND="python -m dashboard.gpu --fake 2 {interval}"
+"""
+import atexit
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+GPU_FIELDS = 'index,temperature.gpu,memory.used,memory.total,name'
+DEFAULT_COMMAND = f'nvidia-smi --query-gpu={GPU_FIELDS} --format=csv,noheader,nounits --loop={{interval}}'
+
+# Délai (secondes) avant de relancer une commande qui a échoué, doublé à chaque échec
+GPU_RETRY_MIN = 30
+GPU_RETRY_MAX = 3600
+
+# Un GPU dont la dernière ligne a plus de N intervalles de boucle n'est plus affiché
+STALE_AFTER_INTERVALS = 3
+
+
+def parse_line(line):
+    """Analyse une ligne CSV de nvidia-smi (voir GPU_FIELDS).
+
+    Returns:
+        dict | None: 'index', 'temp', 'used', 'total', 'percent', 'name', ou
+            None si la ligne ne correspond pas au format attendu.
+    """
+    parts = [part.strip() for part in line.split(',', 4)]
+    if len(parts) != 5 or not parts[0].isdigit():
+        return None
+
+    def number(value):
+        try:
+            return int(float(value))
+        except ValueError:
+            return None  # [N/A], [Not Supported]...
+
+    used, total = number(parts[2]), number(parts[3])
+    return {
+        'index': int(parts[0]),
+        'temp': number(parts[1]),
+        'used': used,
+        'total': total,
+        'percent': round((used / total) * 100, 1) if used is not None and total else 0,
+        'name': parts[4],
+    }
+
+
+class GpuReader:
+    """Garde une commande de type `nvidia-smi --loop` ouverte et mémorise la dernière ligne de chaque GPU.
+
+    Args:
+        command (str): La commande ; `{interval}` est remplacé par l'intervalle en secondes.
+        interval (int): L'intervalle de boucle demandé à la commande.
+    """
+
+    def __init__(self, command, interval):
+        self.interval = max(int(interval), 1)
+        self.args = shlex.split(command.replace('{interval}', str(self.interval)))
+        self._lock = threading.Lock()
+        self._gpus = {}  # index -> (horodatage, dict)
+        self._process = None
+        self._thread = None
+        self.failures = 0
+
+    def start(self):
+        """Lance le thread de lecture (une seule fois)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='gpu-reader', daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self):
+        """Arrête la commande en cours (appelé à l'arrêt du serveur)."""
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def stats(self):
+        """Renvoie les dernières mesures de chaque GPU, par index croissant.
+
+        Returns:
+            list[dict]: Voir parse_line ; vide si aucun GPU n'a été lu récemment.
+        """
+        limit = time.monotonic() - STALE_AFTER_INTERVALS * self.interval
+        with self._lock:
+            return [gpu for _, (seen, gpu) in sorted(self._gpus.items()) if seen >= limit]
+
+    def _run(self):
+        while True:
+            reason = self._read_process()
+            with self._lock:
+                self._gpus.clear()
+            self.failures += 1
+            delay = min(GPU_RETRY_MIN * 2 ** (self.failures - 1), GPU_RETRY_MAX)
+            if self.failures == 1:
+                print(f"INFO: pas de métriques GPU ({reason}), nouvel essai dans {delay} s puis de moins en moins souvent")
+            time.sleep(delay)
+
+    def _read_process(self):
+        """Lit la commande jusqu'à ce qu'elle s'arrête ; renvoie la raison de l'arrêt."""
+        try:
+            self._process = subprocess.Popen(
+                self.args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                stdin=subprocess.DEVNULL, text=True, bufsize=1,
+            )
+        except OSError as e:
+            return f"{self.args[0]} : {e.strerror or e}"
+
+        process = self._process
+        for line in process.stdout:
+            gpu = parse_line(line)
+            if gpu is None:
+                continue
+            with self._lock:
+                self._gpus[gpu['index']] = (time.monotonic(), gpu)
+            if self.failures:
+                print("INFO: métriques GPU de nouveau disponibles")
+                self.failures = 0
+        return f"{self.args[0]} arrêté (code {process.wait()})"
+
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_reader():
+    """Renvoie le lecteur GPU partagé du processus, démarré au premier appel."""
+    global _reader
+    with _reader_lock:
+        if _reader is None:
+            _reader = GpuReader(
+                settings.DASHBOARD_MONITOR_GPU_COMMAND or DEFAULT_COMMAND,
+                settings.DASHBOARD_MONITOR_INTERVAL,
+            )
+            _reader.start()
+    return _reader
+
+
+def _fake(count, interval=1):
+    """Source factice : écrit en boucle des lignes au format de nvidia-smi pour `count` GPU."""
+    while True:
+        for index in range(count):
+            total = 8192 * (index + 1)
+            print(f"{index}, {random.randint(35, 80)}, {random.randint(0, total)}, {total}, Fake GPU {index}", flush=True)
+        time.sleep(interval)
+
+
+if __name__ == '__main__':
+    # python -m dashboard.gpu --fake [nombre de GPU] [intervalle]
+    if len(sys.argv) >= 2 and sys.argv[1] == '--fake':
+        _fake(int(sys.argv[2]) if len(sys.argv) > 2 else 1, float(sys.argv[3]) if len(sys.argv) > 3 else 1)
+    else:
+        sys.exit("usage : python -m dashboard.gpu --fake [nombre de GPU] [intervalle]")
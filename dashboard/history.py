@@ -0,0 +1,295 @@
+"""Historique des métriques système, en mémoire et à taille fixe.
+
+Chaque métrique (cpu, ram, gpu0, disk:Système...) est résumée à trois
+résolutions, chacune dans un anneau de seaux préalloué :
+
+    1 s  : 3600 seaux (1 heure)
+    1 min : 1440 seaux (24 heures)
+    1 h  : 720 seaux (30 jours)
+
+Un seau garde le minimum, la somme et le nombre de mesures (donc la
+moyenne) et le maximum de sa période. Les valeurs sont rangées dans des
+colonnes typées sur un tampon d'octets préalloué, pas dans des listes de
+dictionnaires : environ 140 Ko par métrique, quelle que soit la durée de
+fonctionnement.
+
+Une requête sur une période lit la résolution la plus fine qui la couvre :
+24 h se lisent dans les 1440 seaux d'une minute, sans relire les mesures.
+
+L'historique est en mémoire, ou dans un fichier `mmap` s'il est rattaché à
+un MetricStore (voir metricstore.py) : il survit alors aux redémarrages et
+peut être lu depuis un autre processus.
+"""
+import threading
+import time
+
+# (nom, durée d'un seau en secondes, nombre de seaux)
+RESOLUTIONS = (
+    ('1s', 1, 3600),
+    ('1m', 60, 1440),
+    ('1h', 3600, 720),
+)
+
+# Garde-fou : au-delà, une nouvelle métrique reprend l'emplacement d'une métrique
+# sans mesure depuis RETENTION secondes (disque démonté...), sinon elle n'est pas suivie
+MAX_METRICS = 32
+# Durée couverte par la résolution la plus grossière : au-delà, il ne reste rien à lire
+RETENTION = max(width * capacity for _, width, capacity in RESOLUTIONS)
+
+
+# Entête d'un anneau : 4 entiers 32 bits non signés
+RING_HEADER = 16
+SEQ, HEAD, SIZE = 0, 1, 2
+
+# Lectures refaites au plus, quand un autre processus écrit dans l'anneau
+READ_RETRIES = 1000
+
+
+def ring_size(capacity):
+    """Renvoie la taille en octets d'un anneau de `capacity` seaux (entête compris)."""
+    # début (double) + min, max, somme (float) + nombre (entier 32 bits)
+    return RING_HEADER + 24 * capacity
+
+
+class Ring:
+    """Anneau de seaux consécutifs de `width` secondes (min / moyenne / max).
+
+    Les colonnes sont des vues typées sur un tampon d'octets : un `bytearray`
+    (historique en mémoire) ou une tranche d'un fichier `mmap` (metricstore.py).
+    Le tampon commence par un entête : compteur de séquence, index du seau le
+    plus récent, nombre de seaux.
+
+    Le compteur de séquence est impair pendant une écriture : un lecteur d'un
+    autre processus relit l'anneau tant qu'il a changé pendant sa lecture, et
+    un anneau resté impair après un arrêt brutal est réparé par `recover()`.
+
+    Args:
+        width (int): Durée d'un seau en secondes.
+        capacity (int): Nombre de seaux gardés.
+        buffer (bytearray | memoryview | None): Tampon de `ring_size(capacity)`
+            octets (alloué et mis à zéro par défaut).
+    """
+
+    def __init__(self, width, capacity, buffer=None):
+        self.width = width
+        self.capacity = capacity
+        view = memoryview(bytearray(ring_size(capacity)) if buffer is None else buffer)
+        offset = RING_HEADER
+        self.cursor = view[:offset].cast('I')
+        columns = []
+        for code, size in (('d', 8), ('f', 4), ('f', 4), ('f', 4), ('I', 4)):
+            columns.append(view[offset:offset + size * capacity].cast(code))
+            offset += size * capacity
+        self.start, self.low, self.high, self.total, self.count = columns
+
+    @property
+    def size(self):
+        return min(self.cursor[SIZE], self.capacity)
+
+    def _begin(self):
+        self.cursor[SEQ] = (self.cursor[SEQ] + 1) & 0xFFFFFFFF
+
+    def add(self, timestamp, value):
+        """Ajoute une mesure au seau de son instant (en crée un si besoin)."""
+        bucket = timestamp - timestamp % self.width
+        head, size = self.cursor[HEAD] % self.capacity, self.size
+        if size and bucket < self.start[head]:
+            return  # Horloge revenue en arrière : mesure ignorée
+
+        self._begin()  # Impair : écriture en cours
+        try:
+            if size and bucket == self.start[head]:
+                self.low[head] = min(self.low[head], value)
+                self.high[head] = max(self.high[head], value)
+                self.total[head] += value
+                self.count[head] += 1
+            else:
+                # Le seau est rempli avant d'être publié par HEAD et SIZE
+                head = (head + 1) % self.capacity if size else 0
+                self.start[head] = bucket
+                self.low[head] = self.high[head] = self.total[head] = value
+                self.count[head] = 1
+                self.cursor[HEAD] = head
+                self.cursor[SIZE] = min(size + 1, self.capacity)
+        finally:
+            self._begin()  # Pair : écriture terminée
+
+    def recover(self):
+        """Répare un anneau dont l'écriture a été interrompue (compteur impair).
+
+        Le seau le plus récent, peut-être incomplet, est abandonné.
+
+        Returns:
+            bool: True si l'anneau a été réparé.
+        """
+        if self.cursor[SEQ] % 2 == 0:
+            return False
+        if self.size:
+            self.cursor[HEAD] = (self.cursor[HEAD] - 1) % self.capacity
+            self.cursor[SIZE] = self.size - 1
+        self._begin()
+        return True
+
+    def last(self):
+        """Renvoie le début du seau le plus récent, ou None si l'anneau est vide."""
+        return self.start[self.cursor[HEAD] % self.capacity] if self.size else None
+
+    def clear(self):
+        """Vide l'anneau (les colonnes ne sont plus lues tant qu'elles ne sont pas réécrites)."""
+        self._begin()
+        self.cursor[HEAD] = 0
+        self.cursor[SIZE] = 0
+        self._begin()
+
+    def span(self):
+        """Renvoie la durée couverte quand l'anneau est plein, en secondes."""
+        return self.width * self.capacity
+
+    def read(self, since):
+        """Renvoie les seaux commençant à `since` ou après, du plus ancien au plus récent.
+
+        Seuls ces seaux sont parcourus (en partant du plus récent). Si l'anneau
+        est modifié pendant la lecture (par un autre processus), elle est refaite
+        (au plus READ_RETRIES fois).
+
+        Returns:
+            list[tuple[float, float, float, float, int]]: (début, min, somme, max, nombre).
+        """
+        for _ in range(READ_RETRIES):
+            seq = self.cursor[SEQ]
+            if seq % 2 == 0:
+                result = self._read(since)
+                if self.cursor[SEQ] == seq:
+                    return result
+            time.sleep(0)
+        # Écrivain arrêté en pleine écriture : le seau le plus récent peut être incomplet
+        return self._read(since)
+
+    def _read(self, since):
+        result = []
+        index = self.cursor[HEAD] % self.capacity
+        for _ in range(self.size):
+            if self.start[index] < since:
+                break
+            result.append((self.start[index], self.low[index], self.total[index], self.high[index], self.count[index]))
+            index = (index - 1) % self.capacity
+        result.reverse()
+        return result
+
+
+class MetricHistory:
+    """Historique multi-résolution de plusieurs métriques (voir le docstring du module)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rings = {}  # nom -> [Ring par résolution]
+        self._slots = {}  # nom -> emplacement dans le fichier (si rattaché à un MetricStore)
+        self._store = None
+
+    def attach(self, store):
+        """Range désormais l'historique dans un fichier et recharge les métriques qu'il contient.
+
+        Les mesures déjà gardées en mémoire sont abandonnées.
+
+        Args:
+            store (MetricStore): Le fichier, ouvert en écriture (ou en lecture seule
+                pour un processus qui ne fait que lire).
+        """
+        with self._lock:
+            self._store = store
+            self._slots = {name: slot for slot, name in store.names()}
+            self._rings = {name: store.rings(slot) for name, slot in self._slots.items()}
+
+    def names(self):
+        """Renvoie les noms des métriques suivies."""
+        with self._lock:
+            return list(self._rings)
+
+    def record(self, values, timestamp=None):
+        """Ajoute une mesure pour chaque métrique.
+
+        Args:
+            values (dict[str, float]): Valeur de chaque métrique (None = pas de mesure).
+            timestamp (float | None): Instant de la mesure (time.time() par défaut).
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for name, value in values.items():
+                if value is None:
+                    continue
+                rings = self._rings.get(name)
+                if rings is None:
+                    rings = self._new_rings(name, timestamp)
+                    if rings is None:
+                        continue
+                    self._rings[name] = rings
+                for ring in rings:
+                    ring.add(timestamp, value)
+
+    def _new_rings(self, name, timestamp):
+        if len(self._rings) >= MAX_METRICS:
+            return self._reclaim(name, timestamp)
+        if self._store is not None:
+            slot = self._store.add_metric(name)
+            if slot is None:
+                return None
+            self._slots[name] = slot
+            return self._store.rings(slot)
+        return [Ring(width, capacity) for _, width, capacity in RESOLUTIONS]
+
+    def _reclaim(self, name, timestamp):
+        """Donne à `name` les anneaux de la métrique la plus ancienne, si elle n'a plus rien à lire."""
+        def last(item):
+            return item[1][0].last() or 0
+        old_name, rings = min(self._rings.items(), key=last)
+        if last((old_name, rings)) >= timestamp - RETENTION:
+            return None  # Toutes les métriques ont encore des mesures dans l'historique
+        del self._rings[old_name]
+        for ring in rings:
+            ring.clear()
+        if self._store is not None:
+            slot = self._slots.pop(old_name)
+            self._store.set_name(slot, name)
+            self._slots[name] = slot
+        return rings
+
+    def series(self, name, seconds, points=None, now=None):
+        """Renvoie la série d'une métrique sur les `seconds` dernières secondes.
+
+        Args:
+            name (str): Le nom de la métrique.
+            seconds (float): La période voulue.
+            points (int | None): Nombre maximal de points ; les seaux voisins
+                sont alors regroupés (min des min, moyenne pondérée, max des max).
+            now (float | None): La fin de la période (time.time() par défaut).
+
+        Returns:
+            dict | None: {'resolution': durée d'un point en secondes, 't', 'min',
+                'avg', 'max': listes de même longueur}, ou None si la métrique
+                est inconnue.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rings = self._rings.get(name)
+            if rings is None:
+                return None
+            # La résolution la plus fine qui couvre la période (sinon la plus grossière)
+            ring = next((r for r in rings if r.span() >= seconds), rings[-1])
+            buckets = ring.read(now - seconds)
+
+        group = 1
+        if points and len(buckets) > points:
+            group = -(-len(buckets) // points)  # Arrondi supérieur
+        series = {'resolution': ring.width * group, 't': [], 'min': [], 'avg': [], 'max': []}
+        for i in range(0, len(buckets), group):
+            chunk = buckets[i:i + group]
+            count = sum(b[4] for b in chunk)
+            series['t'].append(chunk[0][0])
+            series['min'].append(round(min(b[1] for b in chunk), 1))
+            series['avg'].append(round(sum(b[2] for b in chunk) / count, 1))
+            series['max'].append(round(max(b[3] for b in chunk), 1))
+        return series
+
+
+# Instance partagée, alimentée par le thread d'échantillonnage (monitor.py)
+metric_history = MetricHistory()
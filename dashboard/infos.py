@@ -0,0 +1,99 @@
+"""Chargement groupé de la page "Infos" (`api/infos/`).
+
+Au chargement de la page, une seule requête rend les fragments de toutes les
+sources (météo, monitoring, réseau, processus) et les renvoie ensemble ; HTMX
+place chacun dans sa carte (`hx-swap-oob`). Les sources sont rendues en
+parallèle par un pool de threads : la réponse attend la plus lente, pas la
+somme de toutes.
+
+Chaque source a son propre délai. Une source en retard ou en erreur est
+simplement absente de la réponse : l'en-tête HX-Trigger envoie alors
+l'événement `infos-missing-<nom>`, sur lequel la carte concernée fait sa
+propre requête. Le calcul en retard continue en arrière-plan et profite à
+cette requête (caches de monitor.py, network.py, weather.py).
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from dataclasses import dataclass
+from typing import Callable
+
+from django.template.loader import render_to_string
+
+from . import monitor
+from .network import network_context
+from .processes import panel_context
+from .weather import weather_context
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='infos')
+
+
+@dataclass
+class InfoSource:
+    """Une carte de la page Infos alimentée par `api/infos/`."""
+    name: str
+    target: str  # id de l'élément dont le contenu est remplacé
+    timeout: float  # secondes, depuis le début de la requête
+    render: Callable  # () -> (html, en-têtes supplémentaires)
+
+
+SOURCES = []
+
+
+def register(name, target, timeout):
+    """Décorateur : ajoute une source à la page Infos."""
+    def decorator(render):
+        SOURCES.append(InfoSource(name, target, timeout, render))
+        return render
+    return decorator
+
+
+@register('weather', 'weather', timeout=1)
+def render_weather():
+    return render_to_string('partials/weather.html', weather_context()), {}
+
+
+@register('monitor', 'system-monitor', timeout=2)
+def render_monitor():
+    snapshot = monitor.get_snapshot()
+    # Mêmes informations que `system_monitor` : ETag de l'affichage et rythme du polling
+    headers = {
+        'X-Monitor-ETag': monitor.make_etag(snapshot),
+        'X-Monitor-Interval': monitor.poll_interval(snapshot),
+    }
+    return render_to_string(monitor.MONITOR_TEMPLATE, snapshot), headers
+
+
+@register('network', 'network-info', timeout=1)
+def render_network():
+    return render_to_string('partials/network_info.html', network_context()), {}
+
+
+@register('processes', 'top-processes', timeout=2)
+def render_processes():
+    return render_to_string('partials/top_processes.html', panel_context()), {}
+
+
+def gather():
+    """Rend toutes les sources en parallèle, chacune dans la limite de son délai.
+
+    Returns:
+        tuple[list, list[str], dict]: (source, html) des sources rendues, noms
+            des sources absentes (retard ou erreur) et en-têtes à ajouter.
+    """
+    start = time.monotonic()
+    futures = [(source, _executor.submit(source.render)) for source in SOURCES]
+    fragments, missing, headers = [], [], {}
+    for source, future in futures:
+        remaining = source.timeout - (time.monotonic() - start)
+        try:
+            html, extra = future.result(timeout=max(remaining, 0))
+        except TimeoutError:
+            missing.append(source.name)
+            continue
+        except Exception as e:
+            print(f"ERREUR: source Infos '{source.name}' : {e}")
+            missing.append(source.name)
+            continue
+        fragments.append((source, html))
+        headers.update(extra)
+    return fragments, missing, headers
@@ -2,6 +2,7 @@ import json
 import os
 from django.core.management.base import BaseCommand
 from dashboard.models import Page, Widget, Link
+from dashboard.ordering import ORDER_GAP
 from django.utils.text import slugify
 
 
@@ -33,7 +34,7 @@ class Command(BaseCommand):
                 self.stdout.write(f"Page créée : {page_name}")
 
             # Gestion de l'ordre des widgets
-            widget_order = 0
+            widget_order = ORDER_GAP
 
             # On parcourt les widgets (Catégories)
             for widget_title, links_list in widgets_data.items():
@@ -43,9 +44,9 @@ class Command(BaseCommand):
                     page=page,
                     defaults={'order': widget_order}
                 )
-                widget_order += 1
+                widget_order += ORDER_GAP
 
-                link_order = 0
+                link_order = ORDER_GAP
                 # On parcourt les liens
                 for link_data in links_list:
                     # link_data est une liste : [Titre, URL, IconURL]
@@ -63,7 +64,7 @@ class Command(BaseCommand):
                             'order': link_order
                         }
                     )
-                    link_order += 1
+                    link_order += ORDER_GAP
 
                 self.stdout.write(f" - Widget traité : {widget_title} ({len(links_list)} liens)")
 
@@ -0,0 +1,45 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.metricstore import open_reader
+
+
+class Command(BaseCommand):
+    help = "Affiche l'historique du monitoring système (lu dans le fichier, même serveur lancé)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('metrics', nargs='*', help="Métriques à afficher (toutes par défaut)")
+        parser.add_argument('--range', type=int, default=3600, help="Période en secondes (3600 par défaut)")
+        parser.add_argument('--points', type=int, default=60, help="Nombre maximal de points par série")
+        parser.add_argument('--file', default=settings.DASHBOARD_MONITOR_HISTORY_FILE, help="Fichier d'historique")
+        parser.add_argument('--json', action='store_true', help="Affiche les séries complètes en JSON")
+
+    def handle(self, *args, **options):
+        if not options['file']:
+            raise CommandError("Aucun fichier d'historique (DASHBOARD_MONITOR_HISTORY_FILE est vide).")
+        try:
+            history = open_reader(options['file'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Lecture impossible : {e}")
+
+        series = {}
+        for name in options['metrics'] or history.names():
+            data = history.series(name, options['range'], options['points'])
+            if data is None:
+                self.stdout.write(self.style.WARNING(f"{name} : métrique inconnue"))
+            elif data['t']:
+                series[name] = data
+
+        if options['json']:
+            self.stdout.write(json.dumps(series, indent=2))
+            return
+
+        for name, data in series.items():
+            last = time.strftime('%d/%m %H:%M:%S', time.localtime(data['t'][-1]))
+            self.stdout.write(
+                f"{name:<24} min {min(data['min']):5.1f}  moy {sum(data['avg']) / len(data['avg']):5.1f}  "
+                f"max {max(data['max']):5.1f}  ({len(data['t'])} points de {data['resolution']} s, dernier {last})"
+            )
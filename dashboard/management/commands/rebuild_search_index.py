@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from dashboard import fulltext
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index plein texte (FTS5) des notes et des liens"
+
+    def handle(self, *args, **kwargs):
+        if not fulltext.is_available():
+            self.stdout.write(self.style.ERROR("La recherche plein texte nécessite SQLite (FTS5)."))
+            return
+
+        notes, links = fulltext.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Index reconstruit : {notes} notes, {links} liens."))
@@ -0,0 +1,158 @@
+"""Fichier binaire de l'historique des métriques système, projeté en mémoire (mmap).
+
+L'historique de history.py est rangé tel quel dans un fichier de taille
+fixe : une mesure est une simple écriture en mémoire (le noyau recopie les
+pages sur le disque) et un redémarrage retrouve l'historique sans rien
+relire ni convertir.
+
+Format (petit-boutiste) :
+
+    entête (64 octets)   : 'DBMH', version (u16), nombre de résolutions (u16),
+                           nombre de métriques (u32), puis (durée, capacité)
+                           en u32 pour chaque résolution, complété par des zéros
+    répertoire           : MAX_METRICS noms de 64 octets (UTF-8 complété par
+                           des zéros ; nom vide = emplacement libre)
+    données              : pour chaque emplacement, un anneau par résolution
+                           (entête de 16 octets puis colonnes, voir history.Ring)
+
+Un fichier dont l'entête ne correspond pas (autre version, RESOLUTIONS ou
+MAX_METRICS modifiés) est réinitialisé à l'ouverture en écriture.
+
+Un seul processus écrit (verrou `flock` sur le fichier) ; d'autres peuvent
+lire en même temps avec `open_reader()`, par exemple la commande
+`python manage.py monitor_history`.
+"""
+import fcntl
+import mmap
+import os
+import struct
+
+from .history import MAX_METRICS, RESOLUTIONS, MetricHistory, Ring, ring_size
+
+MAGIC = b'DBMH'
+VERSION = 1
+HEADER_SIZE = 64
+NAME_SIZE = 64
+
+METRIC_SIZE = sum(ring_size(capacity) for _, _, capacity in RESOLUTIONS)
+DATA_OFFSET = HEADER_SIZE + MAX_METRICS * NAME_SIZE
+FILE_SIZE = DATA_OFFSET + MAX_METRICS * METRIC_SIZE
+
+
+def _header():
+    header = struct.pack('<4sHHI', MAGIC, VERSION, len(RESOLUTIONS), MAX_METRICS)
+    header += b''.join(struct.pack('<II', width, capacity) for _, width, capacity in RESOLUTIONS)
+    return header.ljust(HEADER_SIZE, b'\0')
+
+
+class MetricStore:
+    """Fichier d'historique ouvert en écriture (un seul processus) ou en lecture seule.
+
+    Args:
+        path (str | Path): Le chemin du fichier (créé si besoin en écriture).
+        writable (bool): False pour lire le fichier d'un autre processus.
+
+    Raises:
+        BlockingIOError: En écriture, si un autre processus écrit déjà dans ce fichier.
+        ValueError: En lecture seule, si le fichier n'a pas le format attendu.
+        OSError: Si le fichier ne peut pas être ouvert.
+    """
+
+    def __init__(self, path, writable=True):
+        self.path = path
+        self.writable = writable
+        if writable:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._prepare()
+                self._mmap = mmap.mmap(self._fd, FILE_SIZE)
+            except BaseException:
+                os.close(self._fd)
+                raise
+        else:
+            self._fd = os.open(path, os.O_RDONLY)
+            try:
+                if os.fstat(self._fd).st_size != FILE_SIZE or os.pread(self._fd, HEADER_SIZE, 0) != _header():
+                    raise ValueError(f"{path} : format d'historique inconnu")
+                self._mmap = mmap.mmap(self._fd, FILE_SIZE, access=mmap.ACCESS_READ)
+            except BaseException:
+                os.close(self._fd)
+                raise
+        self._view = memoryview(self._mmap)
+        if writable:
+            self.recovered = sum(ring.recover() for slot, _ in self.names() for ring in self.rings(slot))
+
+    def _prepare(self):
+        """Crée le fichier, ou le réinitialise s'il n'a pas le format attendu."""
+        size = os.fstat(self._fd).st_size
+        if size == FILE_SIZE and os.pread(self._fd, HEADER_SIZE, 0) == _header():
+            return
+        if size:
+            print(f"INFO: {self.path} n'a pas le format attendu, historique du monitoring réinitialisé")
+        os.ftruncate(self._fd, 0)
+        os.ftruncate(self._fd, FILE_SIZE)  # Zéros : répertoire vide, anneaux vides
+        os.pwrite(self._fd, _header(), 0)
+
+    def names(self):
+        """Renvoie les métriques enregistrées.
+
+        Returns:
+            list[tuple[int, str]]: (emplacement, nom) de chaque métrique.
+        """
+        result = []
+        for slot in range(MAX_METRICS):
+            offset = HEADER_SIZE + slot * NAME_SIZE
+            name = bytes(self._view[offset:offset + NAME_SIZE]).rstrip(b'\0')
+            if name:
+                result.append((slot, name.decode('utf-8', 'replace')))
+        return result
+
+    def add_metric(self, name):
+        """Réserve un emplacement pour une nouvelle métrique.
+
+        Returns:
+            int | None: L'emplacement, ou None si le fichier est plein.
+        """
+        used = {slot for slot, _ in self.names()}
+        slot = next((s for s in range(MAX_METRICS) if s not in used), None)
+        if slot is not None:
+            self.set_name(slot, name)
+        return slot
+
+    def set_name(self, slot, name):
+        """Écrit le nom de la métrique d'un emplacement (nouvelle métrique ou emplacement repris)."""
+        # Tronqué sans couper un caractère UTF-8
+        encoded = name.encode('utf-8')[:NAME_SIZE - 1].decode('utf-8', 'ignore').encode('utf-8')
+        offset = HEADER_SIZE + slot * NAME_SIZE
+        self._view[offset:offset + NAME_SIZE] = encoded.ljust(NAME_SIZE, b'\0')
+
+    def rings(self, slot):
+        """Renvoie les anneaux (un par résolution) d'un emplacement, projetés sur le fichier."""
+        rings = []
+        offset = DATA_OFFSET + slot * METRIC_SIZE
+        for _, width, capacity in RESOLUTIONS:
+            size = ring_size(capacity)
+            rings.append(Ring(width, capacity, self._view[offset:offset + size]))
+            offset += size
+        return rings
+
+    def flush(self):
+        """Force l'écriture sur le disque des pages modifiées."""
+        if self.writable:
+            self._mmap.flush()
+
+
+def open_reader(path):
+    """Ouvre un fichier d'historique en lecture seule, par exemple depuis un autre processus.
+
+    Returns:
+        MetricHistory: L'historique, à interroger avec `series()`.
+
+    Raises:
+        ValueError: Si le fichier n'a pas le format attendu.
+        OSError: Si le fichier ne peut pas être ouvert.
+    """
+    history = MetricHistory()
+    history.attach(MetricStore(path, writable=False))
+    return history
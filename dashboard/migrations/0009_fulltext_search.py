@@ -0,0 +1,83 @@
+# Index plein texte SQLite FTS5 pour les notes et les liens.
+#
+# Deux tables virtuelles dont le rowid est l'id de l'objet indexé, tenues à
+# jour par des triggers SQL (donc aussi pour les bulk_update et l'admin).
+# La migration remplit l'index avec les données existantes.
+
+from django.db import migrations
+
+TOKENIZER = "tokenize = 'unicode61 remove_diacritics 2'"
+
+CREATE_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS dashboard_note_fts USING fts5(title, content, {TOKENIZER})",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS dashboard_link_fts USING fts5(title, url, {TOKENIZER})",
+
+    # --- Notes (widgets de type 'note') ---
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_ai AFTER INSERT ON dashboard_widget
+       WHEN new.widget_type = 'note' BEGIN
+           INSERT INTO dashboard_note_fts(rowid, title, content) VALUES (new.id, new.title, coalesce(new.content, ''));
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_au AFTER UPDATE OF title, content, widget_type ON dashboard_widget
+       BEGIN
+           DELETE FROM dashboard_note_fts WHERE rowid = old.id;
+           INSERT INTO dashboard_note_fts(rowid, title, content)
+               SELECT new.id, new.title, coalesce(new.content, '') WHERE new.widget_type = 'note';
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_ad AFTER DELETE ON dashboard_widget
+       BEGIN
+           DELETE FROM dashboard_note_fts WHERE rowid = old.id;
+       END""",
+
+    # --- Liens ---
+    """CREATE TRIGGER IF NOT EXISTS dashboard_link_fts_ai AFTER INSERT ON dashboard_link
+       BEGIN
+           INSERT INTO dashboard_link_fts(rowid, title, url) VALUES (new.id, new.title, coalesce(new.url, ''));
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_link_fts_au AFTER UPDATE OF title, url ON dashboard_link
+       BEGIN
+           DELETE FROM dashboard_link_fts WHERE rowid = old.id;
+           INSERT INTO dashboard_link_fts(rowid, title, url) VALUES (new.id, new.title, coalesce(new.url, ''));
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_link_fts_ad AFTER DELETE ON dashboard_link
+       BEGIN
+           DELETE FROM dashboard_link_fts WHERE rowid = old.id;
+       END""",
+
+    # --- Remplissage initial ---
+    """INSERT INTO dashboard_note_fts(rowid, title, content)
+       SELECT id, title, coalesce(content, '') FROM dashboard_widget WHERE widget_type = 'note'""",
+    """INSERT INTO dashboard_link_fts(rowid, title, url)
+       SELECT id, title, coalesce(url, '') FROM dashboard_link""",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS dashboard_widget_fts_ai",
+    "DROP TRIGGER IF EXISTS dashboard_widget_fts_au",
+    "DROP TRIGGER IF EXISTS dashboard_widget_fts_ad",
+    "DROP TRIGGER IF EXISTS dashboard_link_fts_ai",
+    "DROP TRIGGER IF EXISTS dashboard_link_fts_au",
+    "DROP TRIGGER IF EXISTS dashboard_link_fts_ad",
+    "DROP TABLE IF EXISTS dashboard_note_fts",
+    "DROP TABLE IF EXISTS dashboard_link_fts",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        # FTS5 n'existe que sous SQLite : les autres bases n'ont simplement pas de recherche plein texte
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0008_alter_widget_widget_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE_SQL), _run(DROP_SQL)),
+    ]
@@ -0,0 +1,34 @@
+# Passage à des clés d'ordre espacées (voir dashboard/ordering.py).
+#
+# Les pages, widgets (par page) et liens (par widget) existants sont
+# renumérotés 1024, 2048, 3072... en conservant leur ordre actuel.
+
+from django.db import migrations
+
+ORDER_GAP = 1024
+
+
+def respace(apps, schema_editor):
+    for model_name, parent_field in (('Page', None), ('Widget', 'page_id'), ('Link', 'widget_id')):
+        model = apps.get_model('dashboard', model_name)
+        sort = [parent_field, 'order', 'id'] if parent_field else ['order', 'id']
+        objs = list(model.objects.order_by(*sort))
+
+        position, parent = 0, object()
+        for obj in objs:
+            if parent_field and getattr(obj, parent_field) != parent:
+                position, parent = 0, getattr(obj, parent_field)
+            position += 1
+            obj.order = position * ORDER_GAP
+        model.objects.bulk_update(objs, ['order'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0009_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(respace, migrations.RunPython.noop),
+    ]
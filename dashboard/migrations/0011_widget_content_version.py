@@ -0,0 +1,49 @@
+# Sous SQLite, l'ajout d'une colonne avec contrainte (CHECK de PositiveIntegerField)
+# reconstruit la table dashboard_widget, ce qui supprime ses triggers : ceux de
+# l'index plein texte des notes (migration 0009) sont donc recréés juste après.
+
+from django.db import migrations, models
+
+CREATE_NOTE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_ai AFTER INSERT ON dashboard_widget
+       WHEN new.widget_type = 'note' BEGIN
+           INSERT INTO dashboard_note_fts(rowid, title, content) VALUES (new.id, new.title, coalesce(new.content, ''));
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_au AFTER UPDATE OF title, content, widget_type ON dashboard_widget
+       BEGIN
+           DELETE FROM dashboard_note_fts WHERE rowid = old.id;
+           INSERT INTO dashboard_note_fts(rowid, title, content)
+               SELECT new.id, new.title, coalesce(new.content, '') WHERE new.widget_type = 'note';
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_ad AFTER DELETE ON dashboard_widget
+       BEGIN
+           DELETE FROM dashboard_note_fts WHERE rowid = old.id;
+       END""",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0010_sparse_order_keys'),
+    ]
+
+    operations = [
+        # En arrière, la suppression de la colonne reconstruit aussi la table : triggers recréés après
+        migrations.RunPython(migrations.RunPython.noop, _run(CREATE_NOTE_TRIGGERS)),
+        migrations.AddField(
+            model_name='widget',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(_run(CREATE_NOTE_TRIGGERS), migrations.RunPython.noop),
+    ]
@@ -0,0 +1,112 @@
+# Stockage compressé des grandes notes.
+#
+# Les notes de plus de DASHBOARD_NOTE_COMPRESS_THRESHOLD caractères sont
+# compressées (zlib) dans 'content_compressed' et 'content' passe à NULL.
+# Les triggers FTS des notes (migration 0009) lisaient 'content' : l'index
+# des notes est désormais tenu à jour en Python (voir fulltext.index_note).
+# Les triggers des liens ne changent pas.
+# L'index des notes est entièrement reconstruit ici (bases migrées avant que
+# la migration 0011 ne recrée les triggers supprimés par la reconstruction de
+# dashboard_widget sous SQLite).
+
+import zlib
+
+from django.conf import settings
+from django.db import migrations, models
+
+PREVIEW_LENGTH = 400
+
+DROP_NOTE_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS dashboard_widget_fts_ai",
+    "DROP TRIGGER IF EXISTS dashboard_widget_fts_au",
+    "DROP TRIGGER IF EXISTS dashboard_widget_fts_ad",
+]
+
+CREATE_NOTE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_ai AFTER INSERT ON dashboard_widget
+       WHEN new.widget_type = 'note' BEGIN
+           INSERT INTO dashboard_note_fts(rowid, title, content) VALUES (new.id, new.title, coalesce(new.content, ''));
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_au AFTER UPDATE OF title, content, widget_type ON dashboard_widget
+       BEGIN
+           DELETE FROM dashboard_note_fts WHERE rowid = old.id;
+           INSERT INTO dashboard_note_fts(rowid, title, content)
+               SELECT new.id, new.title, coalesce(new.content, '') WHERE new.widget_type = 'note';
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_widget_fts_ad AFTER DELETE ON dashboard_widget
+       BEGIN
+           DELETE FROM dashboard_note_fts WHERE rowid = old.id;
+       END""",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+def compress_large_notes(apps, schema_editor):
+    Widget = apps.get_model('dashboard', 'Widget')
+    for widget in Widget.objects.filter(widget_type='note').exclude(content=None):
+        text = widget.content
+        widget.content_length = len(text)
+        widget.content_preview = text[:PREVIEW_LENGTH]
+        if len(text) > settings.DASHBOARD_NOTE_COMPRESS_THRESHOLD:
+            widget.content = None
+            widget.content_compressed = zlib.compress(text.encode('utf-8'))
+        widget.save(update_fields=['content', 'content_compressed', 'content_length', 'content_preview'])
+
+
+def decompress_notes(apps, schema_editor):
+    Widget = apps.get_model('dashboard', 'Widget')
+    for widget in Widget.objects.filter(content=None).exclude(content_compressed=None):
+        widget.content = zlib.decompress(bytes(widget.content_compressed)).decode('utf-8')
+        widget.save(update_fields=['content'])
+
+
+def reindex_notes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Widget = apps.get_model('dashboard', 'Widget')
+    schema_editor.execute("DELETE FROM dashboard_note_fts")
+    for widget in Widget.objects.filter(widget_type='note'):
+        text = widget.content
+        if text is None:
+            text = zlib.decompress(bytes(widget.content_compressed)).decode('utf-8') if widget.content_compressed else ''
+        schema_editor.execute(
+            "INSERT INTO dashboard_note_fts(rowid, title, content) VALUES (%s, %s, %s)",
+            [widget.id, widget.title, text],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0012_noterevision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='widget',
+            name='content_compressed',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='widget',
+            name='content_length',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='widget',
+            name='content_preview',
+            field=models.TextField(blank=True, default=''),
+        ),
+        # Les triggers lisaient 'content' (NULL pour une note compressée) : l'index passe en Python
+        migrations.RunPython(_run(DROP_NOTE_TRIGGERS), _run(CREATE_NOTE_TRIGGERS)),
+        migrations.RunPython(compress_large_notes, decompress_notes),
+        migrations.RunPython(reindex_notes, migrations.RunPython.noop),
+    ]
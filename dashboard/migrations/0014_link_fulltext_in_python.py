@@ -0,0 +1,56 @@
+# Index plein texte des liens tenu à jour en Python (voir fulltext.index_link).
+#
+# Les triggers SQL des liens (migration 0009) disparaîtraient, sous SQLite, à
+# la prochaine reconstruction de dashboard_link par une migration (comme ceux
+# des notes avec 0011) : ils sont remplacés par des signaux, comme pour les
+# notes depuis 0013. L'index des liens est reconstruit par précaution.
+
+from django.db import migrations
+
+DROP_LINK_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS dashboard_link_fts_ai",
+    "DROP TRIGGER IF EXISTS dashboard_link_fts_au",
+    "DROP TRIGGER IF EXISTS dashboard_link_fts_ad",
+]
+
+CREATE_LINK_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS dashboard_link_fts_ai AFTER INSERT ON dashboard_link
+       BEGIN
+           INSERT INTO dashboard_link_fts(rowid, title, url) VALUES (new.id, new.title, coalesce(new.url, ''));
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_link_fts_au AFTER UPDATE OF title, url ON dashboard_link
+       BEGIN
+           DELETE FROM dashboard_link_fts WHERE rowid = old.id;
+           INSERT INTO dashboard_link_fts(rowid, title, url) VALUES (new.id, new.title, coalesce(new.url, ''));
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS dashboard_link_fts_ad AFTER DELETE ON dashboard_link
+       BEGIN
+           DELETE FROM dashboard_link_fts WHERE rowid = old.id;
+       END""",
+]
+
+REINDEX_LINKS = [
+    "DELETE FROM dashboard_link_fts",
+    """INSERT INTO dashboard_link_fts(rowid, title, url)
+       SELECT id, title, coalesce(url, '') FROM dashboard_link""",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0013_large_note_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(DROP_LINK_TRIGGERS + REINDEX_LINKS), _run(CREATE_LINK_TRIGGERS)),
+    ]
@@ -1,5 +1,11 @@
+import zlib
+
+from django.conf import settings
 from django.db import models
 
+# Nombre de caractères affichés pour une grande note avant le chargement du texte complet
+NOTE_PREVIEW_LENGTH = 400
+
 class Page(models.Model):
     """Représente un onglet (une page) du tableau de bord.
 
@@ -35,7 +41,17 @@ class Widget(models.Model):
         widget_type (CharField): Le type de widget (ex: 'list', 'note').
         content (TextField): Le contenu textuel, utilisé principalement
                              pour les widgets de type 'note'.
+        content_version (PositiveIntegerField): Incrémenté à chaque sauvegarde
+                             de 'content' (sauvegarde par deltas, voir notes.py).
+        content_compressed (BinaryField): Le texte des grandes notes, compressé
+                             avec zlib ('content' vaut alors None).
+        content_length (PositiveIntegerField): Nombre de caractères de la note.
+        content_preview (TextField): Le début de la note, affiché à la place
+                             du texte complet pour les grandes notes.
     """
+    # Champs à écrire quand le texte d'une note change (voir set_note_text)
+    NOTE_FIELDS = ['content', 'content_compressed', 'content_length', 'content_preview']
+
     # Choix du type de widget
     TYPE_CHOICES = [
         ('list', 'Liste de liens'),
@@ -50,6 +66,10 @@ class Widget(models.Model):
     # Nouveaux champs
     widget_type = models.CharField(max_length=10, choices=TYPE_CHOICES, default='list')
     content = models.TextField(blank=True, null=True)  # Pour stocker le texte de la note
+    content_version = models.PositiveIntegerField(default=0)
+    content_compressed = models.BinaryField(blank=True, null=True)
+    content_length = models.PositiveIntegerField(default=0)
+    content_preview = models.TextField(blank=True, default='')
 
     class Meta:
         ordering = ['order']
@@ -57,6 +77,34 @@ class Widget(models.Model):
     def __str__(self):
         return self.title
 
+    @property
+    def is_large_note(self):
+        """True si le texte est stocké compressé (seul l'aperçu est rendu dans la page)."""
+        return self.content is None and self.content_length > 0
+
+    def get_note_text(self):
+        """Renvoie le texte complet de la note, décompressé si nécessaire."""
+        if self.content is None and self.content_compressed is not None:
+            return zlib.decompress(bytes(self.content_compressed)).decode('utf-8')
+        return self.content or ''
+
+    def set_note_text(self, text):
+        """Change le texte de la note en choisissant le stockage (brut ou compressé).
+
+        À enregistrer avec `save(update_fields=Widget.NOTE_FIELDS + [...])`.
+
+        Args:
+            text (str): Le nouveau texte complet.
+        """
+        self.content_length = len(text)
+        self.content_preview = text[:NOTE_PREVIEW_LENGTH]
+        if len(text) > settings.DASHBOARD_NOTE_COMPRESS_THRESHOLD:
+            self.content = None
+            self.content_compressed = zlib.compress(text.encode('utf-8'))
+        else:
+            self.content = text
+            self.content_compressed = None
+
 class Link(models.Model):
     """Représente un lien hypertexte ou une commande dans un widget.
 
@@ -81,3 +129,38 @@ class Link(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class NoteRevision(models.Model):
+    """Une version passée du contenu d'un widget 'note' (historique compressé).
+
+    La révision la plus récente d'une note est toujours un instantané complet
+    (texte compressé zlib). Les plus anciennes sont stockées sous forme de
+    différences par lignes par rapport à la révision suivante, avec un
+    instantané complet toutes les DASHBOARD_NOTE_SNAPSHOT_EVERY révisions.
+    Voir revisions.py.
+
+    Attributes:
+        widget (ForeignKey): La note concernée.
+        version (PositiveIntegerField): La valeur de 'content_version' enregistrée.
+        created_at (DateTimeField): Début de la fenêtre couverte par la révision.
+        updated_at (DateTimeField): Dernière sauvegarde regroupée dans cette révision.
+        is_snapshot (BooleanField): True si 'data' contient le texte complet.
+        data (BinaryField): Le texte ou la différence, compressé avec zlib.
+        length (PositiveIntegerField): Nombre de caractères du texte.
+        digest (CharField): Empreinte SHA-1 du texte (évite les doublons).
+    """
+    widget = models.ForeignKey(Widget, on_delete=models.CASCADE, related_name='revisions')
+    version = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    is_snapshot = models.BooleanField(default=True)
+    data = models.BinaryField()
+    length = models.PositiveIntegerField(default=0)
+    digest = models.CharField(max_length=40)
+
+    class Meta:
+        ordering = ['-id']
+
+    def __str__(self):
+        return f"{self.widget} (v{self.version})"
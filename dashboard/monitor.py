@@ -0,0 +1,245 @@
+"""Échantillonnage des métriques système en arrière-plan.
+
+Le widget de monitoring (widgets_infos.html) interroge `api/system-monitor/`
+toutes les 8 s, dans chaque onglet ouvert. Mesurer à chaque requête coûtait
+un `nvidia-smi` (fork) et un `disk_usage` par disque, multipliés par le
+nombre d'onglets, et le pourcentage CPU dépendait du temps écoulé depuis
+l'appel précédent... venu d'un autre onglet.
+
+Un seul thread mesure désormais tout toutes les DASHBOARD_MONITOR_INTERVAL
+secondes et remplace un instantané partagé ; la vue se contente de le lire.
+Le thread démarre à la première lecture (`get_snapshot()`), qui fait aussi
+la première mesure. Les GPU sont lus en continu par dashboard/gpu.py : une
+mesure ne lance aucun processus. Les disques sont découverts et mesurés
+(avec un délai) par dashboard/disks.py.
+
+Chaque mesure alimente aussi l'historique (dashboard/history.py), dont la
+dernière heure est jointe à l'instantané pour les mini-graphes du widget.
+L'historique est gardé dans DASHBOARD_MONITOR_HISTORY_FILE (metricstore.py)
+et retrouvé au redémarrage. Le fragment rendu est poussé aux flux SSE
+ouverts (stream.py).
+
+Comme le tampon des notes, l'instantané est propre au processus.
+"""
+import atexit
+import os
+import threading
+import time
+
+import psutil
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from . import disks, gpu
+from .history import metric_history
+from .metricstore import MetricStore
+from .processes import process_table
+from .stream import monitor_broadcaster
+
+MONITOR_TEMPLATE = 'partials/system_monitor.html'
+
+# Mini-graphes du widget : la dernière heure, en 60 points
+SPARKLINE_RANGE = 3600
+SPARKLINE_POINTS = 60
+SPARKLINE_METRICS = ('cpu', 'ram', 'gpu0')
+
+# Polling adaptatif du widget (secondes) : onglet caché, machine au repos, normal, machine chargée
+POLL_HIDDEN = 60
+POLL_IDLE = 20
+POLL_NORMAL = 8
+POLL_BUSY = 3
+# Seuils CPU (%) de la machine "au repos" et "chargée"
+CPU_IDLE = 10
+CPU_BUSY = 70
+
+# Un ETag reste valable au plus pendant une période (les mini-graphes avancent chaque minute)
+ETAG_PERIOD = 60
+
+# Durée de la toute première mesure CPU (aucune mesure précédente à laquelle se comparer)
+FIRST_CPU_INTERVAL = 0.2
+
+_lock = threading.Lock()
+_snapshot = None
+_sampler = None
+
+
+def get_gpu_stats():
+    """Renvoie les dernières mesures des GPU, lues en continu par dashboard/gpu.py (sans lancer de processus).
+
+    Returns:
+        list[dict]: Un dictionnaire par GPU ('index', 'temp', 'used', 'total',
+            'percent', 'name') ; vide s'il n'y a pas de GPU Nvidia ou de driver.
+    """
+    return gpu.get_reader().stats()
+
+
+def collect(cpu_interval=None):
+    """Mesure une fois toutes les métriques.
+
+    Args:
+        cpu_interval (float | None): None mesure le CPU depuis l'appel précédent
+            (sans attendre) ; un nombre de secondes bloque le temps de la mesure.
+
+    Returns:
+        dict: Le contexte de `partials/system_monitor.html` (sans les
+            mini-graphes, ajoutés à la publication), plus 'sampled_at'
+            (horodatage time.time() de la mesure).
+    """
+    cpu = psutil.cpu_percent(interval=cpu_interval)
+    ram = psutil.virtual_memory()
+    gpus = get_gpu_stats()
+    return {
+        'cpu_usage': cpu,
+        'ram_percent': ram.percent,
+        'ram_used_gb': round(ram.used / (1024 ** 3), 1),
+        'ram_total_gb': round(ram.total / (1024 ** 3), 1),
+        'disks': disks.get_disks_info(),
+        'gpu': gpus[0] if gpus else None,  # Jauge principale
+        'gpus': gpus,
+        'sampled_at': time.time(),
+    }
+
+
+def sample_values(snapshot):
+    """Extrait d'un instantané les valeurs suivies par l'historique (en pourcentage).
+
+    Returns:
+        dict[str, float]: 'cpu', 'ram', 'gpu<index>' et 'disk:<nom>'.
+    """
+    values = {'cpu': snapshot['cpu_usage'], 'ram': snapshot['ram_percent']}
+    for stats in snapshot['gpus']:
+        values[f"gpu{stats['index']}"] = stats['percent']
+    for disk in snapshot['disks']:
+        values[f"disk:{disk['name']}"] = disk['percent']
+    return values
+
+
+def _etag_values(snapshot):
+    values = sample_values(snapshot)
+    for stats in snapshot['gpus']:
+        values[f"gpu{stats['index']}_temp"] = stats['temp']
+    return [values[name] for name in sorted(values)]
+
+
+def make_etag(snapshot):
+    """Calcule l'ETag d'un instantané : la période en cours et les valeurs affichées.
+
+    Les valeurs sont dans l'ETag lui-même : `is_close()` peut ainsi comparer
+    ce qu'affiche le client à l'instantané actuel sans rien garder côté serveur.
+    """
+    values = '_'.join('x' if value is None else f"{value:.1f}" for value in _etag_values(snapshot))
+    return f'"mon-{int(snapshot["sampled_at"] // ETAG_PERIOD)}-{values}"'
+
+
+def is_close(etag, snapshot, tolerance):
+    """Indique si l'affichage décrit par `etag` est encore assez proche de l'instantané.
+
+    Args:
+        etag (str): L'en-tête If-None-Match envoyé par le client.
+        snapshot (dict): L'instantané actuel.
+        tolerance (float): L'écart maximal accepté sur chaque valeur (points de %, °C).
+
+    Returns:
+        bool: True si même période, mêmes métriques et aucune valeur n'a bougé
+            de `tolerance` ou plus.
+    """
+    try:
+        _, period, values = etag.strip().removeprefix('W/').strip('"').split('-', 2)
+        if int(period) != int(snapshot['sampled_at'] // ETAG_PERIOD):
+            return False
+        seen = [None if value == 'x' else float(value) for value in values.split('_')]
+    except ValueError:
+        return False
+    current = _etag_values(snapshot)
+    if len(seen) != len(current):
+        return False
+    for old, new in zip(seen, current):
+        if (old is None) != (new is None) or (old is not None and abs(new - old) >= tolerance):
+            return False
+    return True
+
+
+def poll_interval(snapshot, hidden=False):
+    """Renvoie le délai conseillé (secondes) avant la prochaine interrogation du widget.
+
+    Lent si l'onglet est caché ou la machine au repos, rapide si elle est chargée.
+    """
+    if hidden:
+        return POLL_HIDDEN
+    if snapshot['cpu_usage'] < CPU_IDLE:
+        return POLL_IDLE
+    if snapshot['cpu_usage'] > CPU_BUSY:
+        return POLL_BUSY
+    return POLL_NORMAL
+
+
+def _publish(snapshot):
+    """Enregistre un instantané dans l'historique, y ajoute les mini-graphes et le rend visible."""
+    global _snapshot
+    metric_history.record(sample_values(snapshot), snapshot['sampled_at'])
+    sparklines = {}
+    for name in SPARKLINE_METRICS:
+        series = metric_history.series(name, SPARKLINE_RANGE, SPARKLINE_POINTS, now=snapshot['sampled_at'])
+        sparklines[name] = series['avg'] if series else []
+    snapshot['sparklines'] = sparklines
+    # Remplacement d'une seule référence : les lecteurs voient l'ancien ou le nouvel instantané
+    _snapshot = snapshot
+    # Un seul rendu par mesure, partagé par tous les flux ouverts (voir stream.py)
+    if monitor_broadcaster.has_subscribers():
+        monitor_broadcaster.publish(render_to_string(MONITOR_TEMPLATE, snapshot))
+
+
+def _sample_loop():
+    while True:
+        time.sleep(settings.DASHBOARD_MONITOR_INTERVAL)
+        try:
+            _publish(collect())
+            # Table des processus : seulement si le panneau "Processus" est ouvert
+            if process_table.is_wanted():
+                process_table.refresh()
+        except Exception as e:
+            print(f"ERREUR: mesure des métriques système impossible ({e})")
+
+
+def _open_history():
+    """Rattache l'historique au fichier DASHBOARD_MONITOR_HISTORY_FILE (sinon il reste en mémoire)."""
+    path = settings.DASHBOARD_MONITOR_HISTORY_FILE
+    if not path:
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        store = MetricStore(path)
+    except BlockingIOError:
+        print(f"INFO: {path} est déjà utilisé par un autre processus, historique du monitoring gardé en mémoire")
+        return
+    except OSError as e:
+        print(f"ERREUR: historique du monitoring impossible à ouvrir ({e}), gardé en mémoire")
+        return
+    if store.recovered:
+        print(f"INFO: {store.recovered} anneau(x) d'historique réparé(s) après un arrêt brutal")
+    metric_history.attach(store)
+    atexit.register(store.flush)
+
+
+def _start_sampler():
+    global _sampler
+    with _lock:
+        if _sampler is not None:
+            return
+        _open_history()
+        # Le lecteur GPU démarre pendant la première mesure CPU : ses premières lignes arrivent à temps
+        gpu.get_reader()
+        _publish(collect(cpu_interval=FIRST_CPU_INTERVAL))
+        _sampler = threading.Thread(target=_sample_loop, name='metrics-sampler', daemon=True)
+        _sampler.start()
+
+
+def get_snapshot():
+    """Renvoie les dernières métriques mesurées, sans rien mesurer (sauf au premier appel).
+
+    Returns:
+        dict: Voir `collect()`. Ne pas le modifier : il est partagé entre les requêtes.
+    """
+    if _sampler is None:
+        _start_sampler()
+    return _snapshot
@@ -0,0 +1,76 @@
+"""Adresses IP (locale et publique) du serveur, pour le widget "Réseau".
+
+L'IP publique demande un aller-retour vers un service externe
+(DASHBOARD_PUBLIC_IP_URL, api.ipify.org par défaut). Elle est donc obtenue
+hors des requêtes par un `Refresher` (refresh.py) : la vue répond toujours
+immédiatement avec les dernières adresses connues, et un thread les
+redemande quand elles ont plus de DASHBOARD_NETWORK_TTL secondes.
+
+Quand une adresse change, le signal `network_changed` (signals.py) est envoyé.
+"""
+import ipaddress
+import socket
+
+import requests
+from django.conf import settings
+
+from .refresh import Refresher
+from .signals import network_changed
+
+PUBLIC_IP_TIMEOUT = 5
+
+
+def get_local_ip():
+    """Renvoie l'IP de l'interface utilisée pour sortir vers Internet.
+
+    `connect` sur un socket UDP choisit seulement la route : aucun paquet n'est envoyé.
+    """
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            return s.getsockname()[0]
+    except OSError:
+        return "127.0.0.1"
+
+
+def get_public_ip():
+    """Interroge DASHBOARD_PUBLIC_IP_URL (réponse en texte brut : l'adresse seule).
+
+    Raises:
+        requests.RequestException: Service injoignable ou en erreur.
+        ValueError: La réponse n'est pas une adresse IP (portail captif...).
+    """
+    response = requests.get(settings.DASHBOARD_PUBLIC_IP_URL, timeout=PUBLIC_IP_TIMEOUT)
+    response.raise_for_status()
+    return str(ipaddress.ip_address(response.text.strip()))
+
+
+def fetch(previous):
+    """Relit les deux adresses ; en cas d'échec, l'IP publique précédente est gardée."""
+    try:
+        public_ip = get_public_ip()
+    except (requests.RequestException, ValueError) as e:
+        print(f"ERREUR: IP publique indisponible ({e})")
+        public_ip = previous['public_ip'] if previous else None
+    return {'local_ip': get_local_ip(), 'public_ip': public_ip}
+
+
+def network_context():
+    """Contexte de `partials/network_info.html`, depuis le cache (n'attend jamais le réseau).
+
+    Au tout premier appel, 'pending' est vrai : le fragment indique que la
+    détection est en cours et se redemande une seconde plus tard.
+    """
+    info = network_info.get()
+    return {
+        'pending': info is None,
+        'local_ip': info and info['local_ip'],
+        'public_ip': info and info['public_ip'] or "Indisponible",
+    }
+
+
+def _changed(previous, current):
+    network_changed.send(sender=network_info, previous=previous, current=current)
+
+
+network_info = Refresher('network', fetch, ttl=settings.DASHBOARD_NETWORK_TTL, on_change=_changed)
@@ -0,0 +1,295 @@
+"""Sauvegarde des blocs-notes par deltas, avec numéro de version.
+
+Au lieu de renvoyer tout le texte à chaque frappe, le navigateur envoie un
+"splice" `[début, nb_supprimés, texte_inséré]` calculé par rapport à la
+dernière version qu'il connaît (`base_version`). Les positions sont en
+unités UTF-16, comme les chaînes JavaScript.
+
+Si un autre onglet a sauvegardé entre-temps, le delta est transformé à
+travers les deltas manqués (gardés en mémoire, NOTE_LOG_SIZE par note) :
+des modifications à des endroits différents sont fusionnées ; si elles se
+chevauchent, ou si l'historique n'est plus disponible (redémarrage), la
+sauvegarde est refusée (StaleVersion) et le client recharge la note.
+
+Les sauvegardes ne sont pas écrites tout de suite : elles vont dans un
+tampon en mémoire (une entrée par note, la dernière version gagne), vidé en
+une seule transaction toutes les DASHBOARD_NOTE_FLUSH_INTERVAL secondes par
+un thread d'arrière-plan, dès que le texte en attente dépasse
+DASHBOARD_NOTE_BUFFER_MAX_SIZE, et à l'arrêt propre du serveur (atexit).
+Plusieurs notes ouvertes ne coûtent donc qu'un commit (et un fsync SQLite)
+par intervalle. Les lectures passent par `apply_pending()` pour voir le
+texte pas encore écrit.
+
+Journal et tampon étant en mémoire, ils sont propres au processus (comme
+l'index de recherche) : le serveur de développement n'en a qu'un.
+"""
+import atexit
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from . import caching
+from .models import Widget
+
+# Nombre de deltas récents gardés par note pour fusionner les versions périmées
+NOTE_LOG_SIZE = 50
+
+_lock = threading.RLock()
+_log = defaultdict(lambda: deque(maxlen=NOTE_LOG_SIZE))  # widget_id -> deque[(version, splice)]
+_pending = {}  # widget_id -> (contenu, version) pas encore écrits en base
+_flushing = {}  # widget_id -> (contenu, version) en cours d'écriture par flush()
+# Un seul vidage à la fois ; _lock, lui, n'est jamais tenu pendant l'écriture en base
+_flush_lock = threading.Lock()
+_flusher = None
+
+
+class StaleVersion(Exception):
+    """Le delta ne peut pas être appliqué à la version courante de la note."""
+
+    def __init__(self, content, version):
+        super().__init__(f"version {version} attendue")
+        self.content = content
+        self.version = version
+
+
+def _utf16(text):
+    return text.encode('utf-16-le')
+
+
+def parse_splice(value):
+    """Valide un splice reçu en JSON.
+
+    Args:
+        value: La valeur brute, attendue sous la forme [int, int, str].
+
+    Returns:
+        tuple[int, int, str]: (début, nb_supprimés, texte_inséré).
+
+    Raises:
+        ValueError: Si la forme ou les types ne conviennent pas.
+    """
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ValueError("splice invalide")
+    start, deleted, inserted = value
+    if not all(isinstance(n, int) and not isinstance(n, bool) and n >= 0 for n in (start, deleted)):
+        raise ValueError("splice invalide")
+    if not isinstance(inserted, str):
+        raise ValueError("splice invalide")
+    return start, deleted, inserted
+
+
+def apply_splice(text, splice):
+    """Applique un splice (positions UTF-16) à un texte.
+
+    Raises:
+        ValueError: Si le splice dépasse la fin du texte ou coupe un caractère.
+    """
+    start, deleted, inserted = splice
+    data = _utf16(text)
+    if 2 * (start + deleted) > len(data):
+        raise ValueError("splice hors du texte")
+    result = data[:2 * start] + _utf16(inserted) + data[2 * (start + deleted):]
+    # Lève UnicodeDecodeError (un ValueError) si une paire de substitution est coupée
+    return result.decode('utf-16-le')
+
+
+def transform(splice, applied):
+    """Réécrit `splice` pour qu'il s'applique après `applied` (tous deux écrits sur le même texte).
+
+    Args:
+        splice (tuple): Le delta du client.
+        applied (tuple): Un delta déjà appliqué par le serveur.
+
+    Returns:
+        tuple | None: Le delta décalé, ou None si les deux modifient la même zone.
+    """
+    start, deleted, inserted = splice
+    a_start, a_deleted, a_inserted = applied
+    shift = len(_utf16(a_inserted)) // 2 - a_deleted
+
+    if deleted == 0 and a_deleted == 0 and start == a_start:
+        # Deux insertions au même endroit : celle du serveur reste en premier
+        return start + shift, deleted, inserted
+    if start + deleted <= a_start:
+        return splice
+    if start >= a_start + a_deleted:
+        return start + shift, deleted, inserted
+    return None
+
+
+def _current(widget_id):
+    """Renvoie (contenu, version) d'une note, tampon compris."""
+    if widget_id in _pending:
+        return _pending[widget_id]
+    if widget_id in _flushing:
+        return _flushing[widget_id]
+    widget = Widget.objects.only('content', 'content_compressed', 'content_version').get(id=widget_id)
+    return widget.get_note_text(), widget.content_version
+
+
+def _store(widget_id, content, version, splice):
+    _pending[widget_id] = (content, version)
+    _log[widget_id].append((version, splice))
+    # Le fragment en cache et l'ETag doivent refléter le texte pas encore écrit en base
+    caching.bump_revisions([widget_id])
+
+
+def _after_write():
+    if settings.DASHBOARD_NOTE_FLUSH_INTERVAL <= 0 or pending_size() > settings.DASHBOARD_NOTE_BUFFER_MAX_SIZE:
+        flush()
+    else:
+        _start_flusher()
+
+
+def save_patch(widget_id, base_version, splice):
+    """Applique un delta à une note et incrémente sa version.
+
+    Args:
+        widget_id (int): L'ID du widget 'note'.
+        base_version (int): La version sur laquelle le client a calculé le delta.
+        splice (tuple[int, int, str]): Le delta (voir parse_splice).
+
+    Returns:
+        tuple[str, int, bool]: Le nouveau contenu, la nouvelle version et True si
+            le delta a dû être fusionné avec des sauvegardes plus récentes (le
+            client doit alors reprendre le contenu renvoyé).
+
+    Raises:
+        Widget.DoesNotExist: Si le widget n'existe pas.
+        StaleVersion: Si la fusion est impossible.
+        ValueError: Si le delta ne s'applique pas au texte.
+    """
+    with _lock:
+        content, version = _current(widget_id)
+        merged = base_version != version
+        if merged:
+            missed = [entry for entry_version, entry in _log[widget_id] if entry_version > base_version]
+            if base_version > version or len(missed) != version - base_version:
+                raise StaleVersion(content, version)
+            for applied in missed:
+                splice = transform(splice, applied)
+                if splice is None:
+                    raise StaleVersion(content, version)
+
+        content = apply_splice(content, splice)
+        version += 1
+        _store(widget_id, content, version, splice)
+    _after_write()
+    return content, version, merged
+
+
+def save_full(widget_id, content):
+    """Remplace tout le contenu d'une note (ancien format, dernier écrivain gagnant).
+
+    Returns:
+        int: La nouvelle version.
+
+    Raises:
+        Widget.DoesNotExist: Si le widget n'existe pas.
+    """
+    with _lock:
+        previous, version = _current(widget_id)
+        # Journalisé comme un remplacement total : un delta périmé ne sera plus fusionné
+        # que s'il insère au tout début ou à la toute fin du texte
+        splice = (0, len(_utf16(previous)) // 2, content)
+        version += 1
+        _store(widget_id, content, version, splice)
+    _after_write()
+    return version
+
+
+# --- Tampon d'écriture --------------------------------------------------------
+
+def pending_size():
+    """Renvoie le nombre total de caractères en attente d'écriture."""
+    with _lock:
+        return sum(len(content) for content, _ in _pending.values())
+
+
+def apply_pending(widgets):
+    """Remplace, sur des widgets chargés depuis la base, le contenu par celui du tampon.
+
+    Args:
+        widgets (Iterable[Widget]): Les widgets à afficher.
+    """
+    with _lock:
+        for widget in widgets:
+            entry = _pending.get(widget.id) or _flushing.get(widget.id)
+            if entry is not None:
+                content, widget.content_version = entry
+                widget.set_note_text(content)
+
+
+def discard(widget_id):
+    """Oublie une note supprimée (appelé par signals.py)."""
+    with _lock:
+        _pending.pop(widget_id, None)
+        _flushing.pop(widget_id, None)
+        _log.pop(widget_id, None)
+
+
+def flush():
+    """Écrit toutes les notes en attente, en une seule transaction.
+
+    Le tampon est mis de côté sous le verrou, puis écrit sans le tenir : les
+    sauvegardes des requêtes (save_patch) n'attendent pas la base. Pendant
+    l'écriture, les lectures voient les notes mises de côté (`_flushing`).
+
+    Chaque note passe par `save()` : les signaux (caches, recherche) sont envoyés.
+    En cas d'erreur, les notes non réécrites entre-temps retournent dans le
+    tampon et seront réécrites au prochain vidage.
+
+    Returns:
+        int: Le nombre de notes écrites.
+    """
+    global _pending, _flushing
+    with _flush_lock:
+        with _lock:
+            if not _pending:
+                return 0
+            batch, _pending, _flushing = _pending, {}, _pending
+        try:
+            with transaction.atomic():
+                widgets = Widget.objects.in_bulk(list(batch))
+                for widget_id, (content, version) in batch.items():
+                    widget = widgets.get(widget_id)
+                    if widget is None:
+                        continue  # Supprimé entre-temps
+                    widget.set_note_text(content)
+                    widget.content_version = version
+                    widget.save(update_fields=[*Widget.NOTE_FIELDS, 'content_version'])
+        except BaseException:
+            with _lock:
+                # Une sauvegarde arrivée pendant l'écriture est plus récente : elle est gardée
+                for widget_id, entry in batch.items():
+                    _pending.setdefault(widget_id, entry)
+                _flushing = {}
+            raise
+        with _lock:
+            _flushing = {}
+    return len(batch)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(settings.DASHBOARD_NOTE_FLUSH_INTERVAL)
+        try:
+            flush()
+        except Exception as e:
+            print(f"ERREUR: écriture des notes en attente impossible ({e}), nouvel essai plus tard")
+        finally:
+            # Le thread ne doit pas garder de connexion SQLite ouverte entre deux vidages
+            connections.close_all()
+
+
+def _start_flusher():
+    global _flusher
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='note-flusher', daemon=True)
+            _flusher.start()
+            # Arrêt propre (Ctrl+C, rechargement automatique) : rien ne doit être perdu
+            atexit.register(flush)
@@ -0,0 +1,108 @@
+"""Clés d'ordre espacées pour les pages, widgets et liens.
+
+Les champs `order` ne sont plus des entiers consécutifs (0, 1, 2...) mais
+des multiples de ORDER_GAP. Déplacer un élément entre deux voisins consiste
+à lui donner une clé au milieu de l'intervalle : une seule ligne est écrite.
+
+Quand deux voisins n'ont plus d'entier libre entre eux (après une dizaine
+de déplacements au même endroit), les frères sont renumérotés une fois,
+en une seule requête UPDATE.
+"""
+from django.db import transaction
+from django.db.models import Max
+
+from .signals import orders_bulk_updated
+
+ORDER_GAP = 1024
+
+
+def next_order(siblings):
+    """Renvoie la clé à utiliser pour ajouter un élément à la fin de `siblings`.
+
+    Args:
+        siblings (QuerySet): Les éléments de même niveau (ex. `widget.links.all()`).
+
+    Returns:
+        int: La plus grande clé existante + ORDER_GAP.
+    """
+    last = siblings.aggregate(last=Max('order'))['last']
+    return ORDER_GAP if last is None else last + ORDER_GAP
+
+
+def order_between(prev_order, next_order_):
+    """Calcule une clé strictement comprise entre deux voisins.
+
+    Args:
+        prev_order (int | None): Clé du voisin précédent (None = début de liste).
+        next_order_ (int | None): Clé du voisin suivant (None = fin de liste).
+
+    Returns:
+        int | None: La nouvelle clé, ou None s'il ne reste aucun entier libre.
+    """
+    if prev_order is None and next_order_ is None:
+        return ORDER_GAP
+    if prev_order is None:
+        return next_order_ - ORDER_GAP
+    if next_order_ is None:
+        return prev_order + ORDER_GAP
+    if next_order_ - prev_order > 1:
+        return (prev_order + next_order_) // 2
+    return None
+
+
+def rebalance(siblings):
+    """Renumérote des frères avec un écart régulier, en une seule requête UPDATE.
+
+    Args:
+        siblings (QuerySet): Les éléments à renuméroter.
+
+    Returns:
+        dict: {pk: objet} avec les nouvelles clés.
+    """
+    objs = list(siblings.order_by('order', 'pk'))
+    for position, obj in enumerate(objs, start=1):
+        obj.order = position * ORDER_GAP
+    siblings.model.objects.bulk_update(objs, ['order'])
+    transaction.on_commit(lambda: orders_bulk_updated.send(sender=siblings.model, instances=objs))
+    return {obj.pk: obj for obj in objs}
+
+
+def move_between(obj, siblings, prev_id=None, next_id=None, **fields):
+    """Place `obj` entre deux voisins en n'écrivant que sa propre ligne.
+
+    Args:
+        obj (Model): L'élément déplacé (Page, Widget ou Link).
+        siblings (QuerySet): Les éléments de la liste de destination.
+        prev_id (int, optional): ID du voisin qui précède `obj` après le déplacement.
+        next_id (int, optional): ID du voisin qui suit `obj` après le déplacement.
+        **fields: Autres champs à modifier en même temps (ex. widget=...).
+
+    Returns:
+        int: La nouvelle clé d'ordre de `obj`.
+
+    Raises:
+        ValueError: Si aucune clé ne peut être trouvée entre les voisins (rien n'est écrit).
+    """
+    with transaction.atomic():
+        others = siblings.exclude(pk=obj.pk)
+        # Les IDs inconnus (page périmée côté client) sont ignorés
+        neighbours = others.in_bulk([pk for pk in (prev_id, next_id) if pk])
+        prev, next_ = neighbours.get(prev_id), neighbours.get(next_id)
+        if prev and next_ and prev.order >= next_.order:
+            # Voisins inversés (page périmée côté client) : `obj` est placé juste après `prev`
+            next_ = others.filter(order__gt=prev.order).order_by('order', 'pk').first()
+
+        order = order_between(prev.order if prev else None, next_.order if next_ else None)
+        if order is None:
+            # Plus de place entre les deux voisins : on renumérote la liste une fois
+            rebalanced = rebalance(others)
+            order = order_between(rebalanced[prev.pk].order, rebalanced[next_.pk].order)
+        if order is None:
+            raise ValueError("impossible de placer l'élément entre ces voisins")
+
+        for name, value in fields.items():
+            setattr(obj, name, value)
+        obj.order = order
+        # post_save est envoyé normalement (caches, index de recherche)
+        obj.save(update_fields=['order', *fields])
+    return order
@@ -0,0 +1,146 @@
+"""Processus les plus gourmands (CPU, mémoire, disque), pour le panneau "Processus".
+
+Un `psutil.Process` garde les temps CPU de sa mesure précédente :
+`cpu_percent(interval=None)` donne donc l'utilisation depuis la dernière
+actualisation sans attendre. La table garde un objet par PID d'une
+actualisation à l'autre ; seuls les nouveaux PID sont créés et les PID
+disparus oubliés.
+
+À chaque actualisation, tous les processus sont lus une seule fois (temps
+CPU, mémoire résidente, compteurs d'entrées/sorties) : le tri par débit
+disque porte sur toute la table. Le nom n'est lu que pour les processus
+affichés.
+
+La table n'est actualisée (par le thread d'échantillonnage de monitor.py)
+que si le panneau a été consulté depuis moins de WANTED_FOR secondes :
+personne ne regarde, rien n'est lu. Après une pause plus longue (onglet
+masqué), la première consultation actualise la table elle-même.
+"""
+import threading
+import time
+
+import psutil
+from django.conf import settings
+
+# Nombre maximal de processus renvoyés
+TOP_LIMIT = 15
+# Le panneau est considéré comme ouvert pendant N secondes après sa dernière consultation
+WANTED_FOR = 60
+# Délai entre les deux premières actualisations (sinon tous les CPU vaudraient 0)
+FIRST_INTERVAL = 0.2
+
+SORT_CHOICES = (('cpu', 'CPU'), ('rss', 'Mémoire'), ('io', 'Disque'))
+SORT_KEYS = tuple(key for key, _ in SORT_CHOICES)
+
+
+class ProcessTable:
+    """Table persistante des processus et de leurs dernières mesures."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._procs = {}  # pid -> psutil.Process
+        self._io = {}  # pid -> (horodatage, octets lus + écrits)
+        self._rows = []
+        self._wanted_until = 0
+        self.refreshed_at = None  # time.monotonic() de la dernière actualisation
+
+    def is_wanted(self):
+        return time.monotonic() < self._wanted_until
+
+    def refresh(self):
+        """Relit la table des processus (incrémentalement, voir le docstring du module)."""
+        with self._lock:
+            pids = set(psutil.pids())
+            for pid in self._procs.keys() - pids:
+                del self._procs[pid]
+                self._io.pop(pid, None)
+            for pid in pids - self._procs.keys():
+                try:
+                    self._procs[pid] = psutil.Process(pid)
+                except psutil.Error:
+                    pass
+
+            rows = []
+            now = time.monotonic()
+            for pid, proc in list(self._procs.items()):
+                try:
+                    with proc.oneshot():
+                        rows.append({
+                            'pid': pid, 'cpu': proc.cpu_percent(None), 'rss': proc.memory_info().rss,
+                            'io': self._io_rate(pid, proc, now), 'proc': proc,
+                        })
+                except psutil.NoSuchProcess:
+                    del self._procs[pid]
+                    self._io.pop(pid, None)
+                except psutil.Error:
+                    continue  # Accès refusé : processus ignoré
+            self._rows = rows
+            self.refreshed_at = now
+
+    def _io_rate(self, pid, proc, now):
+        """Renvoie le débit disque (octets/s) depuis la lecture précédente, ou None."""
+        try:
+            counters = proc.io_counters()
+        except (psutil.Error, AttributeError):
+            return None  # Accès refusé, ou non disponible sur ce système
+        total = counters.read_bytes + counters.write_bytes
+        previous = self._io.get(pid)
+        self._io[pid] = (now, total)
+        if previous is None or now <= previous[0]:
+            return None
+        return max(total - previous[1], 0) / (now - previous[0])
+
+    def top(self, sort='cpu', limit=TOP_LIMIT):
+        """Renvoie les processus les plus gourmands selon `sort`.
+
+        Marque aussi le panneau comme ouvert : le thread d'échantillonnage
+        actualise la table tant qu'il est consulté.
+
+        Args:
+            sort (str): 'cpu', 'rss' ou 'io' (débit disque entre les deux
+                dernières actualisations).
+            limit (int): Nombre de processus renvoyés.
+
+        Returns:
+            list[dict]: 'pid', 'name', 'username', 'cpu' (%), 'rss' (octets), 'io'
+                (octets/s ou None).
+        """
+        now = time.monotonic()
+        idle = self.refreshed_at is None or now - self.refreshed_at > max(WANTED_FOR, settings.DASHBOARD_MONITOR_INTERVAL)
+        self._wanted_until = now + WANTED_FOR
+        if idle:
+            # Table jamais lue, ou plus actualisée depuis que le panneau n'est plus consulté :
+            # deux lectures rapprochées, sinon le CPU serait une moyenne sur toute la pause
+            self.refresh()
+            time.sleep(FIRST_INTERVAL)
+            self.refresh()
+        elif now - self.refreshed_at > settings.DASHBOARD_MONITOR_INTERVAL:
+            self.refresh()
+
+        with self._lock:
+            rows = sorted(self._rows, key=lambda row: row[sort] or 0, reverse=True)[:limit]
+
+            result = []
+            for row in rows:
+                proc = row['proc']
+                try:
+                    name, username = proc.name(), proc.username()
+                except psutil.NoSuchProcess:
+                    continue
+                except psutil.Error:
+                    name, username = '?', ''
+                result.append({
+                    'pid': row['pid'], 'name': name, 'username': username,
+                    'cpu': round(row['cpu'], 1), 'rss': row['rss'], 'io': row['io'],
+                })
+        return result
+
+
+process_table = ProcessTable()
+
+
+def panel_context(sort='cpu'):
+    """Contexte de `partials/top_processes.html` (tri inconnu : CPU)."""
+    if sort not in SORT_KEYS:
+        sort = 'cpu'
+    return {'processes': process_table.top(sort), 'sort': sort, 'sort_choices': SORT_CHOICES}
@@ -0,0 +1,90 @@
+"""Valeurs lentes à obtenir (services externes), rafraîchies en arrière-plan.
+
+Une vue qui a besoin d'une telle valeur lit `Refresher.get()`, qui répond
+immédiatement avec ce qui est en mémoire :
+
+- valeur récente (moins de `ttl` secondes) : servie telle quelle ;
+- valeur périmée : servie quand même, et un thread la recalcule (une seule
+  fois, quel que soit le nombre de requêtes qui la lisent en même temps) ;
+- aucune valeur (premier appel) : None, et le calcul démarre.
+
+Si le calcul échoue, la dernière valeur connue reste servie et le calcul
+n'est retenté qu'après `retry` secondes.
+"""
+import threading
+import time
+
+
+class Refresher:
+    """Valeur calculée par `fetch()` hors des requêtes, avec durée de vie.
+
+    Args:
+        name (str): Nom (thread, messages d'erreur).
+        fetch (callable): Calcule la valeur à partir de la valeur précédente
+            (ou None) ; peut lever une exception.
+        ttl (float): Durée (secondes) pendant laquelle la valeur est fraîche.
+        retry (float): Délai (secondes) avant un nouvel essai après un échec.
+        on_change (callable | None): Appelée avec (ancienne, nouvelle) quand la
+            valeur change (pas au premier calcul).
+    """
+
+    def __init__(self, name, fetch, ttl, retry=30, on_change=None):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+        self.retry = retry
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self.value = None
+        self.fetched_at = None  # time.monotonic() du dernier calcul réussi
+        self.failed_at = None
+        self.error = None
+        self._running = False
+
+    def is_fresh(self):
+        return self.fetched_at is not None and time.monotonic() - self.fetched_at < self.ttl
+
+    def get(self):
+        """Renvoie la valeur en mémoire (None au tout premier appel), sans jamais attendre.
+
+        Lance un recalcul en arrière-plan si la valeur est absente ou périmée.
+        """
+        with self._lock:
+            if not self.is_fresh() and not self._running and not self._in_retry_delay():
+                self._running = True
+                threading.Thread(target=self._run, name=f'refresh-{self.name}', daemon=True).start()
+            return self.value
+
+    def _in_retry_delay(self):
+        return self.failed_at is not None and time.monotonic() - self.failed_at < self.retry
+
+    def refresh(self):
+        """Recalcule la valeur tout de suite, dans le thread appelant.
+
+        Returns:
+            La nouvelle valeur, ou la précédente si le calcul a échoué.
+        """
+        previous = self.value
+        try:
+            value = self.fetch(previous)
+        except Exception as e:
+            with self._lock:
+                self.failed_at = time.monotonic()
+                self.error = e
+            print(f"ERREUR: {self.name} : rafraîchissement impossible ({e}), nouvel essai dans {self.retry} s")
+            return previous
+        with self._lock:
+            self.value = value
+            self.fetched_at = time.monotonic()
+            self.failed_at = None
+            self.error = None
+        if previous is not None and value != previous and self.on_change is not None:
+            self.on_change(previous, value)
+        return value
+
+    def _run(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._running = False
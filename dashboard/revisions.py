@@ -0,0 +1,200 @@
+"""Historique compressé des blocs-notes.
+
+À chaque écriture du contenu d'une note (voir signals.py), `record()` met à
+jour l'historique de cette note :
+
+- les sauvegardes rapprochées (moins de DASHBOARD_NOTE_REVISION_INTERVAL
+  secondes depuis le début de la révision courante) remplacent la révision
+  la plus récente au lieu d'en créer une nouvelle : une frappe toutes les
+  500 ms ne produit qu'une révision par intervalle ;
+- la révision la plus récente est un instantané complet (zlib) ; quand une
+  nouvelle révision arrive, la précédente est remplacée par la différence
+  (par lignes, difflib) qui permet de la retrouver à partir de la suivante.
+  Un instantané complet est gardé toutes les DASHBOARD_NOTE_SNAPSHOT_EVERY
+  révisions pour borner le coût de lecture d'une vieille révision ;
+- les révisions trop anciennes sont supprimées. Comme chaque différence
+  dépend de la révision suivante, supprimer les plus vieilles ne casse
+  jamais la chaîne.
+
+`Widget.content` n'est pas touché : lire la version courante d'une note
+coûte exactement la même chose qu'avant.
+"""
+import difflib
+import hashlib
+import json
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import NoteRevision
+
+
+def _compress(text):
+    return zlib.compress(text.encode('utf-8'))
+
+
+def _decompress(data):
+    return zlib.decompress(bytes(data)).decode('utf-8')
+
+
+def _compress_delta(source, target):
+    return zlib.compress(json.dumps(make_delta(source, target), separators=(',', ':')).encode('utf-8'))
+
+
+def _decompress_delta(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def make_delta(source, target):
+    """Calcule une différence par lignes qui transforme `source` en `target`.
+
+    Returns:
+        list: Suite d'opérations : [début, fin] recopie les lignes source[début:fin],
+            une chaîne insère ce texte.
+    """
+    source_lines = source.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, source_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:  # 'replace' ou 'insert' ('delete' : rien à recopier)
+            ops.append(''.join(target_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(source, ops):
+    """Applique une différence calculée par `make_delta` à `source`."""
+    source_lines = source.splitlines(keepends=True)
+    return ''.join(''.join(source_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def record(widget):
+    """Enregistre le contenu actuel d'une note dans son historique.
+
+    Args:
+        widget (Widget): La note, avec son contenu à jour.
+
+    Returns:
+        NoteRevision | None: La révision créée ou mise à jour, ou None si le
+            contenu est identique à la dernière révision.
+    """
+    text = widget.get_note_text()
+    digest = _digest(text)
+    now = timezone.now()
+
+    with transaction.atomic():
+        latest = NoteRevision.objects.filter(widget=widget).first()
+        if latest is not None and latest.digest == digest:
+            return None
+
+        if latest is not None and now - latest.created_at < timedelta(seconds=settings.DASHBOARD_NOTE_REVISION_INTERVAL):
+            # Même fenêtre : on remplace l'instantané le plus récent, et la différence
+            # de la révision précédente, calculée sur l'ancien texte, est refaite
+            _rebase_previous(latest, text)
+            revision = latest
+        else:
+            if latest is not None:
+                _demote(latest, text)
+            revision = NoteRevision(widget=widget)
+
+        revision.version = widget.content_version
+        revision.is_snapshot = True
+        revision.data = _compress(text)
+        revision.length = len(text)
+        revision.digest = digest
+        revision.save()
+
+        if revision is not latest:
+            prune(widget)
+    return revision
+
+
+def _demote(revision, next_text):
+    """Remplace l'instantané `revision` par sa différence avec la révision suivante.
+
+    L'instantané est conservé s'il est le premier après une série de
+    DASHBOARD_NOTE_SNAPSHOT_EVERY - 1 différences.
+    """
+    previous_kinds = list(
+        NoteRevision.objects.filter(widget_id=revision.widget_id, id__lt=revision.id)
+        .values_list('is_snapshot', flat=True)[:max(settings.DASHBOARD_NOTE_SNAPSHOT_EVERY - 1, 0)]
+    )
+    # Les N-1 révisions précédentes sont déjà des différences : on garde un instantané ici
+    if len(previous_kinds) >= settings.DASHBOARD_NOTE_SNAPSHOT_EVERY - 1 and not any(previous_kinds):
+        return
+    text = _decompress(revision.data)
+    revision.is_snapshot = False
+    revision.data = _compress_delta(next_text, text)
+    revision.save(update_fields=['is_snapshot', 'data'])
+
+
+def _rebase_previous(latest, new_text):
+    """Recalcule la différence de la révision qui précède `latest` par rapport à `new_text`.
+
+    Utilisé quand l'instantané `latest` est remplacé dans sa fenêtre : sans
+    cela, la révision précédente serait relue à partir d'un texte qui n'est
+    plus celui contre lequel sa différence a été calculée.
+    """
+    previous = NoteRevision.objects.filter(widget_id=latest.widget_id, id__lt=latest.id).first()
+    if previous is None or previous.is_snapshot:
+        return
+    text = apply_delta(_decompress(latest.data), _decompress_delta(previous.data))
+    previous.data = _compress_delta(new_text, text)
+    previous.save(update_fields=['data'])
+
+
+def prune(widget):
+    """Supprime les révisions trop anciennes ou en surnombre (jamais la plus récente).
+
+    Seules les plus vieilles révisions sont supprimées : les différences
+    restantes peuvent toujours être relues depuis un instantané plus récent.
+
+    Returns:
+        int: Le nombre de révisions supprimées.
+    """
+    revisions = NoteRevision.objects.filter(widget=widget)
+    ids = list(revisions.values_list('id', flat=True)[:max(settings.DASHBOARD_NOTE_REVISION_MAX, 1)])
+    if not ids:
+        return 0
+    cutoff = timezone.now() - timedelta(days=settings.DASHBOARD_NOTE_REVISION_RETENTION_DAYS)
+    deleted, _ = revisions.exclude(id=ids[0]).filter(Q(id__lt=ids[-1]) | Q(updated_at__lt=cutoff)).delete()
+    return deleted
+
+
+def get_content(revision):
+    """Reconstitue le texte d'une révision.
+
+    Part du premier instantané qui suit (ou est) `revision` et remonte la
+    chaîne des différences jusqu'à elle.
+
+    Args:
+        revision (NoteRevision): La révision à relire.
+
+    Returns:
+        str: Le texte de la note à cette révision.
+    """
+    if revision.is_snapshot:
+        return _decompress(revision.data)
+
+    chain = []
+    for newer in NoteRevision.objects.filter(widget_id=revision.widget_id, id__gt=revision.id).order_by('id').iterator():
+        if newer.is_snapshot:
+            text = _decompress(newer.data)
+            break
+        chain.append(newer)
+    else:
+        raise ValueError(f"historique incomplet pour la révision {revision.id}")
+
+    for older in reversed([revision, *chain]):
+        text = apply_delta(text, _decompress_delta(older.data))
+    return text
@@ -0,0 +1,244 @@
+"""Index de recherche en mémoire sur les liens (lanceur rapide).
+
+L'index est construit une seule fois (3 requêtes SQL) à la première
+recherche, puis tenu à jour par les signaux (voir signals.py) : une frappe
+dans la barre de recherche ne touche jamais SQLite.
+
+Chaque lien est indexé avec son titre, son URL, le titre de son widget et
+le nom de sa page. La correspondance se fait par trigrammes (tolérante aux
+fautes de frappe), avec des bonus pour les préfixes et sous-chaînes exacts.
+"""
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+
+# Part minimale des trigrammes de la requête qu'un lien doit partager pour être candidat
+MIN_TRIGRAM_MATCH = 0.5
+MAX_QUERY_LENGTH = 100
+
+
+def normalize(text):
+    """Met en minuscules et retire les accents ('Écran' -> 'ecran')."""
+    text = unicodedata.normalize('NFKD', (text or '').lower())
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def trigrams(text):
+    """Renvoie l'ensemble des trigrammes d'un texte normalisé, mot par mot.
+
+    Chaque mot est entouré d'espaces pour que les débuts de mots
+    ("  g", " go") soient aussi indexés : une requête de 1 ou 2 lettres
+    trouve donc les mots qui commencent par ces lettres.
+    """
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass
+class LinkDocument:
+    """Un lien tel qu'il est stocké dans l'index."""
+    id: int
+    title: str
+    url: str
+    widget_id: int
+    norm_title: str = ''
+    norm_url: str = ''
+    norm_context: str = ''
+    grams: frozenset = frozenset()
+
+
+class LinkSearchIndex:
+    """Index inversé trigramme -> liens, partagé par tous les threads du processus."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._docs = {}
+        self._postings = defaultdict(set)
+        self._widgets = {}  # widget_id -> {'title', 'page_id', 'links': set()}
+        self._pages = {}  # page_id -> {'name', 'slug'}
+
+    # --- Construction -------------------------------------------------------
+
+    def ensure_built(self):
+        with self._lock:
+            if not self._built:
+                self.rebuild()
+
+    def rebuild(self):
+        """(Re)charge tout l'index depuis la base de données."""
+        from .models import Link, Page, Widget
+
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._pages = {
+                page_id: {'name': name, 'slug': slug}
+                for page_id, name, slug in Page.objects.values_list('id', 'name', 'slug')
+            }
+            self._widgets = {
+                widget_id: {'title': title, 'page_id': page_id, 'links': set()}
+                for widget_id, title, page_id in Widget.objects.values_list('id', 'title', 'page_id')
+            }
+            for link_id, title, url, widget_id in Link.objects.values_list('id', 'title', 'url', 'widget_id'):
+                self._add(LinkDocument(id=link_id, title=title, url=url or '', widget_id=widget_id))
+            self._built = True
+
+    def _context(self, widget_id):
+        widget = self._widgets.get(widget_id)
+        if not widget:
+            return '', None
+        page = self._pages.get(widget['page_id'])
+        return f"{widget['title']} {page['name'] if page else ''}", page
+
+    def _add(self, doc):
+        context, _ = self._context(doc.widget_id)
+        doc.norm_title = normalize(doc.title)
+        doc.norm_url = normalize(doc.url)
+        doc.norm_context = normalize(context)
+        doc.grams = frozenset(trigrams(f"{doc.norm_title} {doc.norm_url} {doc.norm_context}"))
+
+        self._docs[doc.id] = doc
+        for gram in doc.grams:
+            self._postings[gram].add(doc.id)
+        self._widgets.setdefault(doc.widget_id, {'title': '', 'page_id': None, 'links': set()})['links'].add(doc.id)
+
+    def _remove(self, link_id):
+        doc = self._docs.pop(link_id, None)
+        if doc is None:
+            return
+        for gram in doc.grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(link_id)
+                if not postings:
+                    del self._postings[gram]
+        widget = self._widgets.get(doc.widget_id)
+        if widget:
+            widget['links'].discard(link_id)
+
+    def _reindex_widget_links(self, widget_id):
+        widget = self._widgets.get(widget_id)
+        if not widget:
+            return
+        for link_id in list(widget['links']):
+            doc = self._docs[link_id]
+            self._remove(link_id)
+            self._add(LinkDocument(id=doc.id, title=doc.title, url=doc.url, widget_id=doc.widget_id))
+
+    # --- Mises à jour incrémentales (appelées par signals.py) ---------------
+    # Tant que l'index n'est pas construit, il n'y a rien à maintenir.
+
+    def update_link(self, link_id, title, url, widget_id):
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(link_id)
+            self._add(LinkDocument(id=link_id, title=title, url=url or '', widget_id=widget_id))
+
+    def remove_link(self, link_id):
+        with self._lock:
+            if self._built:
+                self._remove(link_id)
+
+    def update_widget(self, widget_id, title, page_id):
+        with self._lock:
+            if not self._built:
+                return
+            widget = self._widgets.setdefault(widget_id, {'title': '', 'page_id': None, 'links': set()})
+            if (widget['title'], widget['page_id']) != (title, page_id):
+                widget['title'], widget['page_id'] = title, page_id
+                self._reindex_widget_links(widget_id)
+
+    def remove_widget(self, widget_id):
+        with self._lock:
+            if not self._built:
+                return
+            widget = self._widgets.pop(widget_id, None)
+            for link_id in (widget['links'] if widget else ()):
+                self._remove(link_id)
+
+    def update_page(self, page_id, name, slug):
+        with self._lock:
+            if not self._built:
+                return
+            old = self._pages.get(page_id)
+            self._pages[page_id] = {'name': name, 'slug': slug}
+            if old is None or old['name'] != name:
+                for widget_id, widget in self._widgets.items():
+                    if widget['page_id'] == page_id:
+                        self._reindex_widget_links(widget_id)
+
+    def remove_page(self, page_id):
+        with self._lock:
+            if self._built:
+                self._pages.pop(page_id, None)
+
+    # --- Recherche ------------------------------------------------------------
+
+    def search(self, query, limit=10):
+        """Renvoie les meilleurs liens pour une requête, triés par pertinence.
+
+        Args:
+            query (str): Le texte tapé par l'utilisateur.
+            limit (int): Nombre maximal de résultats.
+
+        Returns:
+            list[dict]: Résultats avec 'id', 'title', 'url', 'widget', 'page', 'page_slug', 'score'.
+        """
+        norm_query = normalize(query[:MAX_QUERY_LENGTH]).strip()
+        query_grams = trigrams(norm_query)
+        if not query_grams:
+            return []
+
+        self.ensure_built()
+        with self._lock:
+            counts = Counter()
+            for gram in query_grams:
+                counts.update(self._postings.get(gram, ()))
+
+            threshold = max(1, int(len(query_grams) * MIN_TRIGRAM_MATCH))
+            scored = []
+            for link_id, shared in counts.items():
+                if shared < threshold:
+                    continue
+                doc = self._docs[link_id]
+                scored.append((self._score(doc, norm_query, shared / len(query_grams)), doc))
+
+            scored.sort(key=lambda item: (-item[0], item[1].norm_title))
+            results = []
+            for score, doc in scored[:limit]:
+                widget = self._widgets.get(doc.widget_id, {})
+                page = self._pages.get(widget.get('page_id')) or {}
+                results.append({
+                    'id': doc.id,
+                    'title': doc.title,
+                    'url': doc.url,
+                    'widget': widget.get('title', ''),
+                    'page': page.get('name', ''),
+                    'page_slug': page.get('slug', ''),
+                    'score': round(score, 3),
+                })
+            return results
+
+    @staticmethod
+    def _score(doc, norm_query, similarity):
+        score = similarity
+        if doc.norm_title.startswith(norm_query):
+            score += 3
+        elif any(word.startswith(norm_query) for word in doc.norm_title.split()):
+            score += 2
+        elif norm_query in doc.norm_title:
+            score += 1.5
+        if norm_query in doc.norm_url:
+            score += 0.5
+        if norm_query in doc.norm_context:
+            score += 0.5
+        return score
+
+
+link_index = LinkSearchIndex()
@@ -0,0 +1,172 @@
+"""Signaux du tableau de bord : invalidation des caches après chaque écriture.
+
+Tous les chemins de modification (vues, API HTMX, admin) passent par
+`save()` / `delete()`, donc par post_save / post_delete. Chaque écriture
+invalide, une fois validée, le fragment du widget concerné et la révision
+globale (ETag),
+met à jour l'index de recherche en mémoire (search.py) et l'historique
+des notes (revisions.py).
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from . import caching, fulltext, notes, revisions
+from .search import link_index
+from .models import Link, Page, Widget
+
+# Envoyé après un `Link.objects.bulk_update(...)` (qui ne déclenche pas post_save).
+# Arguments : links (liste des liens modifiés), previous_widget_ids (widgets quittés).
+links_bulk_updated = Signal()
+
+# Envoyé après une renumérotation en masse des clés 'order' (voir ordering.py).
+# Arguments : instances (liste des objets renumérotés). sender = le modèle.
+orders_bulk_updated = Signal()
+
+# Envoyé quand l'IP locale ou publique du serveur change (voir network.py).
+# Arguments : previous, current ({'local_ip', 'public_ip'}).
+network_changed = Signal()
+
+
+@receiver(post_init, sender=Link)
+def remember_link_widget(sender, instance, **kwargs):
+    """Mémorise le widget d'origine d'un lien pour invalider aussi l'ancien parent en cas de déplacement."""
+    # __dict__ : ne déclenche pas de requête si le champ est différé
+    instance._initial_widget_id = instance.__dict__.get('widget_id')
+
+
+def _invalidate(widget_ids=()):
+    """Invalide les fragments de `widget_ids` et l'ETag global, une fois l'écriture validée.
+
+    Avant le commit, un rendu concurrent lirait encore les anciennes lignes et
+    les mettrait en cache sous les nouvelles révisions.
+    """
+    widget_ids = [widget_id for widget_id in widget_ids if widget_id]
+    transaction.on_commit(lambda: caching.bump_revisions(widget_ids))
+
+
+@receiver(post_save, sender=Link)
+def link_saved(sender, instance, **kwargs):
+    _invalidate([instance.widget_id, instance._initial_widget_id])
+    instance._initial_widget_id = instance.widget_id
+
+
+@receiver(post_delete, sender=Link)
+def link_deleted(sender, instance, **kwargs):
+    _invalidate([instance.widget_id])
+
+
+@receiver(links_bulk_updated)
+def links_bulk_changed(sender, links, previous_widget_ids=(), **kwargs):
+    _invalidate({link.widget_id for link in links} | set(previous_widget_ids))
+
+
+@receiver(orders_bulk_updated)
+def orders_changed(sender, instances, **kwargs):
+    # L'ordre des liens fait partie du fragment du widget ; celui des pages et widgets, de la page seulement
+    _invalidate({link.widget_id for link in instances} if sender is Link else ())
+
+
+@receiver(post_save, sender=Widget)
+@receiver(post_delete, sender=Widget)
+def widget_changed(sender, instance, **kwargs):
+    _invalidate([instance.id])
+
+
+@receiver(post_save, sender=Widget)
+def record_note_revision(sender, instance, update_fields=None, **kwargs):
+    # Historique compressé des notes (voir revisions.py)
+    if instance.widget_type == 'note' and (update_fields is None or 'content' in update_fields):
+        revisions.record(instance)
+
+
+@receiver(post_delete, sender=Widget)
+def widget_deleted(sender, instance, **kwargs):
+    # Une note supprimée ne doit pas être réécrite par le tampon d'écriture ; seulement après
+    # validation : si la suppression est annulée (lot rejeté), le texte en attente est gardé
+    pk = instance.id
+    transaction.on_commit(lambda: notes.discard(pk))
+    if instance.widget_type == 'note':
+        fulltext.unindex_note(instance.id)
+
+
+@receiver(post_save, sender=Widget)
+def index_note_fulltext(sender, instance, update_fields=None, **kwargs):
+    # Index FTS des notes (voir fulltext.py)
+    if instance.widget_type == 'note' and (update_fields is None or {'content', 'title'} & set(update_fields)):
+        fulltext.index_note(instance)
+
+
+@receiver(post_save, sender=Page)
+@receiver(post_delete, sender=Page)
+def page_changed(sender, instance, **kwargs):
+    _invalidate()
+
+
+@receiver(post_save, sender=Link)
+def index_link_fulltext(sender, instance, update_fields=None, **kwargs):
+    # Index FTS des liens ; seuls le titre et l'URL y figurent (pas l'ordre ni le widget)
+    if update_fields is None or {'title', 'url'} & set(update_fields):
+        fulltext.index_link(instance)
+
+
+@receiver(post_delete, sender=Link)
+def unindex_link_fulltext(sender, instance, **kwargs):
+    fulltext.unindex_link(instance.id)
+
+
+# --- Index de recherche en mémoire ------------------------------------------
+# L'index n'est pas transactionnel : il n'est modifié qu'une fois l'écriture validée,
+# sinon un renommage ou une suppression annulés (lot rejeté) y resteraient.
+
+@receiver(post_save, sender=Link)
+def index_link(sender, instance, **kwargs):
+    args = (instance.id, instance.title, instance.url, instance.widget_id)
+    transaction.on_commit(lambda: link_index.update_link(*args))
+
+
+@receiver(links_bulk_updated)
+def reindex_links(sender, links, **kwargs):
+    rows = [(link.id, link.title, link.url, link.widget_id) for link in links]
+
+    def update():
+        for row in rows:
+            link_index.update_link(*row)
+    transaction.on_commit(update)
+
+
+@receiver(post_delete, sender=Link)
+def unindex_link(sender, instance, **kwargs):
+    pk = instance.id
+    transaction.on_commit(lambda: link_index.remove_link(pk))
+
+
+@receiver(post_save, sender=Widget)
+def index_widget(sender, instance, **kwargs):
+    args = (instance.id, instance.title, instance.page_id)
+    transaction.on_commit(lambda: link_index.update_widget(*args))
+
+
+@receiver(post_delete, sender=Widget)
+def unindex_widget(sender, instance, **kwargs):
+    pk = instance.id
+    transaction.on_commit(lambda: link_index.remove_widget(pk))
+
+
+@receiver(post_save, sender=Page)
+def index_page(sender, instance, **kwargs):
+    args = (instance.id, instance.name, instance.slug)
+    transaction.on_commit(lambda: link_index.update_page(*args))
+
+
+@receiver(post_delete, sender=Page)
+def unindex_page(sender, instance, **kwargs):
+    pk = instance.id
+    transaction.on_commit(lambda: link_index.remove_page(pk))
+
+
+@receiver(network_changed)
+def log_network_change(sender, previous, current, **kwargs):
+    for key, label in (('local_ip', 'locale'), ('public_ip', 'publique')):
+        if previous[key] != current[key]:
+            print(f"INFO: IP {label} changée : {previous[key]} -> {current[key]}")
@@ -0,0 +1,113 @@
+"""Diffusion en direct (Server-Sent Events) des instantanés du monitoring.
+
+Le thread d'échantillonnage (monitor.py) rend le fragment
+`partials/system_monitor.html` une seule fois par mesure, et seulement si
+des flux sont ouverts, puis le publie ici. Chaque flux
+(`api/system-monitor/stream/`) le reçoit et l'envoie au navigateur.
+
+Un client lent ne ralentit personne : chaque abonné n'a qu'une place
+d'attente (asyncio.Queue(maxsize=1)). Si le fragment précédent n'est pas
+encore parti, il est remplacé par le nouveau : le client saute des mesures
+mais reçoit toujours la plus récente, et la mémoire reste bornée.
+
+Sous ASGI (startme/asgi.py, par exemple `uvicorn startme.asgi:application`),
+un flux ne coûte qu'une tâche asyncio. Sous WSGI (`runserver`), chaque flux
+occupe un thread, qui attend les publications sur une Condition.
+
+Un flux se ferme après STREAM_MAX_DURATION secondes ; EventSource se
+reconnecte seul, ce qui libère les connexions de clients disparus.
+"""
+import asyncio
+import threading
+import time
+
+# Commentaire envoyé sans nouvelle mesure, pour garder la connexion ouverte
+HEARTBEAT_INTERVAL = 15
+STREAM_MAX_DURATION = 600
+# Délai de reconnexion demandé au navigateur (millisecondes)
+RETRY_DELAY_MS = 3000
+
+EVENT_NAME = 'monitor'
+
+
+def format_event(data, event=EVENT_NAME):
+    """Met un texte (éventuellement sur plusieurs lignes) au format SSE."""
+    lines = ''.join(f"data: {line}\n" for line in data.splitlines() or [''])
+    return f"event: {event}\n{lines}\n"
+
+
+def _put_latest(queue, message):
+    if queue.full():
+        queue.get_nowait()  # Le client n'a pas suivi : l'ancien fragment est abandonné
+    queue.put_nowait(message)
+
+
+class Broadcaster:
+    """Un producteur, plusieurs abonnés (asyncio ou threads), dernier message seulement."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._queues = set()  # (boucle asyncio, asyncio.Queue) des flux ASGI
+        self._waiting = 0  # Flux WSGI ouverts
+        self.version = 0
+        self.message = None
+
+    def has_subscribers(self):
+        with self._condition:
+            return bool(self._queues or self._waiting)
+
+    def publish(self, message):
+        """Envoie un message à tous les abonnés (appelé depuis le thread d'échantillonnage)."""
+        with self._condition:
+            self.version += 1
+            self.message = message
+            queues = list(self._queues)
+            self._condition.notify_all()
+        for loop, queue in queues:
+            try:
+                loop.call_soon_threadsafe(_put_latest, queue, message)
+            except RuntimeError:
+                pass  # Boucle fermée : le flux se désabonne de lui-même
+
+    async def events(self, first):
+        """Flux asynchrone (ASGI) : `first`, puis chaque message publié, au format SSE."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=1)
+        entry = (loop, queue)
+        with self._condition:
+            self._queues.add(entry)
+        try:
+            yield f"retry: {RETRY_DELAY_MS}\n" + format_event(first)
+            deadline = time.monotonic() + STREAM_MAX_DURATION
+            while time.monotonic() < deadline:
+                try:
+                    message = await asyncio.wait_for(queue.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                else:
+                    yield format_event(message)
+        finally:
+            with self._condition:
+                self._queues.discard(entry)
+
+    def sync_events(self, first):
+        """Flux bloquant (WSGI) : même contenu que `events()`, un thread par flux."""
+        with self._condition:
+            self._waiting += 1
+            version = self.version
+        try:
+            yield f"retry: {RETRY_DELAY_MS}\n" + format_event(first)
+            deadline = time.monotonic() + STREAM_MAX_DURATION
+            while time.monotonic() < deadline:
+                with self._condition:
+                    self._condition.wait_for(lambda: self.version != version, HEARTBEAT_INTERVAL)
+                    changed = self.version != version
+                    version, message = self.version, self.message
+                yield format_event(message) if changed else ": ping\n\n"
+        finally:
+            with self._condition:
+                self._waiting -= 1
+
+
+# Instance partagée, alimentée par monitor.py
+monitor_broadcaster = Broadcaster()
@@ -5,3 +5,19 @@ register = template.Library()
 @register.filter
 def get_item(dictionary, key):
     return dictionary.get(key, [])
+
+
+@register.filter
+def sparkline(values, height=20):
+    """Convertit une série de pourcentages (0-100) en points de <polyline> SVG.
+
+    Le SVG doit avoir viewBox="0 0 100 {height}" : la série occupe toute la largeur.
+    """
+    values = list(values or [])
+    if len(values) < 2:
+        return ''
+    step = 100 / (len(values) - 1)
+    return ' '.join(
+        f"{i * step:.1f},{height - min(max(v, 0), 100) * height / 100:.1f}"
+        for i, v in enumerate(values)
+    )
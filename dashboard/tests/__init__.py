@@ -0,0 +1,4 @@
+"""Tests du tableau de bord, un module par module de `dashboard`.
+
+Lancement : `python manage.py test dashboard`.
+"""
@@ -0,0 +1,21 @@
+"""Sauvegarde ZIP du projet (views.download_backup)."""
+import io
+import tempfile
+import zipfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+class BackupTests(TestCase):
+
+    def test_monitor_history_is_not_archived(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            project = Path(tmp)
+            (project / 'manage.py').write_text('# manage\n')
+            (project / 'monitor_history.bin').write_bytes(b'\0' * 1024)
+            with override_settings(BASE_DIR=project, DASHBOARD_MONITOR_HISTORY_FILE=str(project / 'monitor_history.bin')):
+                response = self.client.get(reverse('download_backup'))
+            archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ['manage.py'])
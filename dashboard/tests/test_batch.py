@@ -0,0 +1,80 @@
+"""Lots d'opérations de `api/batch/` (batch.py)."""
+from django.test import TestCase
+from django.urls import reverse
+
+from dashboard import batch
+from dashboard.models import Link, Page, Widget
+
+
+class BatchTests(TestCase):
+
+    def setUp(self):
+        self.home = Page.objects.create(name='Accueil', slug='accueil', order=1024)
+        self.tools = Page.objects.create(name='Outils', slug='outils', order=2048)
+        self.widget = Widget.objects.create(page=self.home, title='Liens', order=1024)
+        self.target = Widget.objects.create(page=self.tools, title='Cible', order=1024)
+        self.link = Link.objects.create(widget=self.widget, title='Lien', url='https://example.com/', order=1024)
+
+    def post(self, ops):
+        return self.client.post(reverse('apply_batch'), {'ops': ops}, content_type='application/json')
+
+    def test_applies_every_operation(self):
+        response = self.post([
+            {'op': 'rename_widget', 'id': self.widget.id, 'title': 'Renommé'},
+            {'op': 'move_link_to_page', 'id': self.link.id, 'page_id': self.tools.id},
+            {'op': 'move_widget_to_page', 'id': self.widget.id, 'page_id': self.tools.id},
+        ])
+        self.assertEqual(response.json(), {'applied': 3})
+        self.widget.refresh_from_db()
+        self.link.refresh_from_db()
+        self.assertEqual((self.widget.title, self.widget.page_id), ('Renommé', self.tools.id))
+        self.assertEqual(self.link.widget_id, self.target.id)
+
+    def test_failure_rolls_back_whole_batch(self):
+        response = self.post([
+            {'op': 'rename_widget', 'id': self.widget.id, 'title': 'Renommé'},
+            {'op': 'delete_link', 'id': self.link.id},
+            {'op': 'rename_link', 'id': 999, 'title': 'Introuvable'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['index'], 2)
+        self.assertEqual(Widget.objects.get(id=self.widget.id).title, 'Liens')
+        self.assertTrue(Link.objects.filter(id=self.link.id).exists())
+
+    def test_error_reports_failing_index(self):
+        with self.assertRaises(batch.BatchError) as cm:
+            batch.apply([
+                {'op': 'rename_widget', 'id': self.widget.id, 'title': 'Renommé'},
+                {'op': 'rename_widget', 'id': self.widget.id, 'title': '   '},
+            ])
+        self.assertEqual(cm.exception.index, 1)
+        with self.assertRaises(batch.BatchError) as cm:
+            batch.apply([{'op': 'rename_widget', 'id': self.widget.id, 'title': 'Renommé'}, {'op': 'inconnue'}])
+        self.assertEqual(cm.exception.index, 1)
+
+    def test_operations_on_deleted_objects_fail(self):
+        response = self.post([
+            {'op': 'delete_widget', 'id': self.widget.id},
+            {'op': 'rename_link', 'id': self.link.id, 'title': 'Supprimé en cascade'},
+        ])
+        self.assertEqual(response.json()['index'], 1)
+        self.assertTrue(Widget.objects.filter(id=self.widget.id).exists())
+
+    def test_page_slug_collision(self):
+        response = self.post([
+            {'op': 'rename_widget', 'id': self.widget.id, 'title': 'Renommé'},
+            {'op': 'rename_page', 'id': self.home.id, 'name': 'Outils'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['index'], 1)
+        self.assertEqual(Page.objects.get(id=self.home.id).slug, 'accueil')
+        self.assertEqual(Widget.objects.get(id=self.widget.id).title, 'Liens')
+
+    def test_move_link_to_page_without_widget(self):
+        empty = Page.objects.create(name='Vide', slug='vide', order=3072)
+        response = self.post([{'op': 'move_link_to_page', 'id': self.link.id, 'page_id': empty.id}])
+        self.assertEqual(response.json()['index'], 0)
+
+    def test_requires_json(self):
+        response = self.client.post(reverse('apply_batch'), {'ops': '[]'})
+        self.assertEqual(response.status_code, 415)
@@ -0,0 +1,59 @@
+"""Invalidation du cache de fragments et de l'ETag (caching.py, signals.py)."""
+from django.core.cache import cache
+from django.db import transaction
+from django.test import RequestFactory, TestCase
+
+from dashboard import caching
+from dashboard.models import Link, Page, Widget
+
+
+class InvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        page = Page.objects.create(name='Accueil', slug='accueil')
+        self.widget = Widget.objects.create(page=page, title='Liens')
+        self.link = Link.objects.create(widget=self.widget, title='Avant', url='https://example.com/')
+        self.request = RequestFactory().get('/')
+
+    def revisions(self):
+        return caching.get_dashboard_revision(), caching.get_widget_revisions([self.widget.id])[self.widget.id]
+
+    def test_bump_waits_for_commit(self):
+        before = self.revisions()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.link.title = 'Après'
+                self.link.save()
+                self.assertEqual(self.revisions(), before)
+        dashboard_revision, widget_revision = self.revisions()
+        self.assertNotEqual(dashboard_revision, before[0])
+        self.assertNotEqual(widget_revision, before[1])
+
+    def test_rolled_back_write_does_not_bump(self):
+        before = self.revisions()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.link.delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.revisions(), before)
+
+    def test_fragment_is_cached(self):
+        revision = caching.get_dashboard_revision()
+        caching.render_widgets(self.request, [self.widget], revision)
+        with self.assertNumQueries(0):
+            (_, html), = caching.render_widgets(self.request, [self.widget], revision)
+        self.assertIn('Avant', html)
+
+    def test_fragment_not_cached_when_revision_moved(self):
+        # Lignes chargées, puis une écriture validée avant la lecture des révisions
+        revision = caching.get_dashboard_revision()
+        widget = Widget.objects.prefetch_related('links').get(id=self.widget.id)
+        Link.objects.filter(id=self.link.id).update(title='Après')
+        caching.bump_revisions([self.widget.id])
+        caching.render_widgets(self.request, [widget], revision)
+        (_, html), = caching.render_widgets(self.request, [self.widget], caching.get_dashboard_revision())
+        self.assertIn('Après', html)
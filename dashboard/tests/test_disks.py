@@ -0,0 +1,97 @@
+"""Découverte et mesure des disques (disks.py)."""
+import threading
+import time
+from collections import namedtuple
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from dashboard import disks
+
+MOUNTS = '''\
+sysfs /sys sysfs rw,nosuid,nodev,noexec,relatime 0 0
+/dev/nvme0n1p2 / ext4 rw,relatime 0 0
+/dev/nvme0n1p1 /boot/efi vfat rw,relatime 0 0
+/dev/sda1 /media/Mes\\040Films ext4 rw,relatime 0 0
+/dev/sda1 /srv/films ext4 rw,relatime,bind 0 0
+/dev/sdb1 /media/Donn\xc3\xa9es btrfs rw,relatime 0 0
+server:/export /mnt/nas nfs4 rw,relatime 0 0
+/dev/loop3 /snap/core/123 squashfs ro 0 0
+'''
+
+Usage = namedtuple('Usage', 'total used free percent')
+
+
+@override_settings(
+    DASHBOARD_MONITOR_DISK_FSTYPES=['ext4', 'btrfs', 'vfat', 'nfs4', 'squashfs'],
+    DASHBOARD_MONITOR_DISK_EXCLUDE=['/boot', '/boot/*', '/snap/*'],
+    DASHBOARD_MONITOR_DISK_NAMES={'/': 'Système', '/mnt/nas': 'NAS'},
+)
+class SelectDisksTests(SimpleTestCase):
+
+    def test_parse_mounts_unescapes_paths(self):
+        mounts = disks.parse_mounts(MOUNTS)
+        self.assertIn(('/dev/sda1', '/media/Mes Films', 'ext4'), mounts)
+        self.assertIn(('/dev/sdb1', '/media/Données', 'btrfs'), mounts)
+        self.assertEqual(len(mounts), 8)
+
+    def test_select_disks(self):
+        self.assertEqual(disks.select_disks(disks.parse_mounts(MOUNTS)), [
+            {'name': 'Système', 'path': '/'},
+            {'name': 'Mes Films', 'path': '/media/Mes Films'},  # Le bind mount /srv/films est ignoré
+            {'name': 'Données', 'path': '/media/Données'},
+            {'name': 'NAS', 'path': '/mnt/nas'},
+        ])
+
+    @override_settings(DASHBOARD_MONITOR_DISK_FSTYPES=['ext4'], DASHBOARD_MONITOR_DISK_EXCLUDE=['/media/*'])
+    def test_fstype_and_exclude_filters(self):
+        self.assertEqual(disks.select_disks(disks.parse_mounts(MOUNTS)), [
+            {'name': 'Système', 'path': '/'},
+            {'name': 'films', 'path': '/srv/films'},
+        ])
+
+
+@override_settings(DASHBOARD_MONITOR_DISK_TIMEOUT=0.2)
+class HungMountTests(SimpleTestCase):
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.calls = []
+        self.addCleanup(disks._inflight.clear)
+        self.addCleanup(self.release.set)
+        table = [{'name': 'NAS', 'path': '/mnt/nas'}, {'name': 'Système', 'path': '/'}]
+        for patcher in (mock.patch.object(disks.mount_table, 'disks', return_value=table),
+                        mock.patch.object(disks.psutil, 'disk_usage', self.disk_usage)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def disk_usage(self, path):
+        self.calls.append(path)
+        if path == '/mnt/nas':
+            self.release.wait()  # Serveur NFS qui ne répond plus
+        return Usage(100 * 1024 ** 3, 25 * 1024 ** 3, 75 * 1024 ** 3, 25.0)
+
+    def measure(self):
+        start = time.monotonic()
+        info = {disk['path']: disk for disk in disks.get_disks_info()}
+        return info, time.monotonic() - start
+
+    def test_hung_mount_does_not_stall_others(self):
+        info, elapsed = self.measure()
+        self.assertLess(elapsed, 1)
+        self.assertTrue(info['/mnt/nas']['stalled'])
+        self.assertIsNone(info['/mnt/nas']['percent'])
+        self.assertEqual((info['/']['stalled'], info['/']['percent']), (False, 25.0))
+
+        # Appel toujours bloqué : pas de nouveau thread pour ce montage, et pas d'attente
+        info, elapsed = self.measure()
+        self.assertLess(elapsed, 0.15)
+        self.assertTrue(info['/mnt/nas']['stalled'])
+        self.assertEqual(self.calls.count('/mnt/nas'), 1)
+
+        # Le montage répond de nouveau
+        self.release.set()
+        disks._inflight['/mnt/nas'].join(1)
+        info, _ = self.measure()
+        self.assertFalse(info['/mnt/nas']['stalled'])
+        self.assertEqual(self.calls.count('/mnt/nas'), 2)
@@ -0,0 +1,88 @@
+"""Lecture continue des métriques GPU (gpu.py), sans GPU : source factice `--fake`."""
+import sys
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard import gpu
+
+FAKE_COMMAND = f'{sys.executable} -m dashboard.gpu --fake 2 {{interval}}'
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+class ParseLineTests(SimpleTestCase):
+
+    def test_nvidia_smi_line(self):
+        self.assertEqual(gpu.parse_line('0, 47, 2345, 8192, NVIDIA GeForce RTX 3070\n'), {
+            'index': 0, 'temp': 47, 'used': 2345, 'total': 8192, 'percent': 28.6,
+            'name': 'NVIDIA GeForce RTX 3070',
+        })
+
+    def test_unsupported_values(self):
+        parsed = gpu.parse_line('1, [N/A], [Not Supported], [Not Supported], Tesla K80')
+        self.assertEqual((parsed['index'], parsed['temp'], parsed['used'], parsed['total']), (1, None, None, None))
+        self.assertEqual(parsed['percent'], 0)
+
+    def test_name_with_comma(self):
+        self.assertEqual(gpu.parse_line('2, 60, 1, 2, Carte, édition spéciale')['name'], 'Carte, édition spéciale')
+
+    def test_malformed_lines(self):
+        for line in ('', '\n', 'No devices were found', '0, 47, 2345', 'GPU, 47, 1, 2, nom',
+                     'NVIDIA-SMI has failed because it couldn\'t communicate with the NVIDIA driver.'):
+            with self.subTest(line=line):
+                self.assertIsNone(gpu.parse_line(line))
+
+
+class GpuReaderTests(SimpleTestCase):
+
+    def start(self, command):
+        reader = gpu.GpuReader(command, interval=1)
+        reader.start()
+        self.addCleanup(reader.stop)
+        return reader
+
+    def test_reads_fake_source(self):
+        reader = self.start(FAKE_COMMAND)
+        self.assertTrue(wait_for(lambda: len(reader.stats()) == 2))
+        self.assertEqual([g['name'] for g in reader.stats()], ['Fake GPU 0', 'Fake GPU 1'])
+        self.assertEqual(reader.failures, 0)
+
+    def test_backoff_after_process_exits(self):
+        with mock.patch.object(gpu, 'GPU_RETRY_MIN', 0.5):
+            reader = self.start(FAKE_COMMAND)
+            self.assertTrue(wait_for(lambda: len(reader.stats()) == 2))
+            process = reader._process
+            reader.stop()
+            # Commande arrêtée : mesures oubliées, nouvel essai après le délai
+            self.assertTrue(wait_for(lambda: reader.failures == 1))
+            self.assertEqual(reader.stats(), [])
+            self.assertTrue(wait_for(lambda: reader._process is not process and len(reader.stats()) == 2))
+            self.assertEqual(reader.failures, 0)
+
+    def test_missing_command_backs_off_exponentially(self):
+        delays = []
+        real_sleep = time.sleep
+
+        def sleep(delay):
+            if threading.current_thread() is not threading.main_thread():
+                return real_sleep(delay)  # Lecteurs des autres tests
+            delays.append(delay)
+            if len(delays) >= 9:
+                raise SystemExit  # Fin de la boucle de lecture
+
+        with mock.patch.object(gpu.time, 'sleep', sleep):
+            reader = gpu.GpuReader('/nonexistent/nvidia-smi --loop={interval}', interval=1)
+            with self.assertRaises(SystemExit):
+                reader._run()
+        self.assertEqual(delays, [30, 60, 120, 240, 480, 960, 1920, 3600, 3600])
+        self.assertEqual(reader.stats(), [])
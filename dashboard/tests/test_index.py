@@ -0,0 +1,84 @@
+"""Vue `index` : nombre de requêtes SQL et ETag."""
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from dashboard.models import Link, Page, Widget
+
+
+class IndexQueryCountTests(TestCase):
+    """Nombre de requêtes SQL de la vue `index`, indépendant du nombre de widgets."""
+
+    WIDGETS = 6
+    LINKS_PER_WIDGET = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.page = Page.objects.create(name='Accueil', slug='accueil', order=1024)
+        Page.objects.create(name='Outils', slug='outils', order=2048)
+        for i in range(cls.WIDGETS):
+            widget = Widget.objects.create(page=cls.page, title=f'Widget {i}', order=(i + 1) * 1024)
+            for j in range(cls.LINKS_PER_WIDGET):
+                Link.objects.create(widget=widget, title=f'Lien {i}.{j}', url=f'https://example.com/{i}/{j}',
+                                    order=(j + 1) * 1024)
+        Widget.objects.create(page=cls.page, title='Note', widget_type='note', content='Bonjour',
+                              order=(cls.WIDGETS + 1) * 1024)
+
+    def setUp(self):
+        # Cache de fragments et révisions (LocMem) : chaque test part d'un cache vide
+        cache.clear()
+        self.url = reverse('index', args=[self.page.slug])
+
+    def test_full_render(self):
+        # Pages, widgets de la page active, liens des widgets (prefetch)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Lien 5.4')
+
+    def test_full_render_does_not_grow_with_widgets(self):
+        for i in range(10):
+            widget = Widget.objects.create(page=self.page, title=f'Extra {i}', order=(100 + i) * 1024)
+            Link.objects.create(widget=widget, title=f'Extra {i}', url='https://example.com/', order=1024)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+    @override_settings(DASHBOARD_LAZY_WIDGETS=3)
+    def test_lazy_render(self):
+        # Coquilles seulement : pages et widgets, aucun lien chargé
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Lien 5.4')
+
+    def test_conditional_get(self):
+        # Le cookie CSRF entre dans l'ETag : le premier passage le pose, comme dans un navigateur
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_changes_after_write(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Link.objects.filter(widget__page=self.page).first().save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_waits_for_commit(self):
+        # Tant que l'écriture n'est pas validée, l'ETag reste celui de l'ancien contenu
+        self.client.get(self.url)
+        etag = self.client.get(self.url)['ETag']
+        link = Link.objects.filter(widget__page=self.page).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                link.title = 'Renommé'
+                link.save()
+                self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Renommé')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
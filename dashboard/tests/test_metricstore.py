@@ -0,0 +1,104 @@
+"""Historique des métriques (history.py) et son fichier mmap (metricstore.py)."""
+import os
+import struct
+import tempfile
+
+from django.test import SimpleTestCase
+
+from dashboard import metricstore
+from dashboard.history import MAX_METRICS, RETENTION, SEQ, MetricHistory, Ring
+
+T0 = 1_699_999_200  # Instant de départ des mesures (multiple de 3600)
+
+
+class RingTests(SimpleTestCase):
+
+    def test_wrap_around(self):
+        ring = Ring(width=1, capacity=4)
+        for second in range(10):
+            ring.add(T0 + second, second)
+        self.assertEqual([bucket[0] for bucket in ring.read(0)], [T0 + 6, T0 + 7, T0 + 8, T0 + 9])
+        self.assertEqual(ring.last(), T0 + 9)
+
+    def test_bucket_aggregates(self):
+        ring = Ring(width=60, capacity=4)
+        for value in (3, 1, 5):
+            ring.add(T0 + 10, value)
+        self.assertEqual(ring.read(0), [(T0, 1, 9, 5, 3)])
+
+    def test_recover_interrupted_write(self):
+        ring = Ring(width=1, capacity=4)
+        ring.add(T0, 1)
+        ring.add(T0 + 1, 2)
+        ring.cursor[SEQ] += 1  # Arrêt brutal pendant une écriture
+        self.assertTrue(ring.recover())
+        self.assertEqual(ring.read(0), [(T0, 1, 1, 1, 1)])
+        self.assertFalse(ring.recover())
+
+
+class MetricStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'history.bin')
+
+    def writer(self):
+        history = MetricHistory()
+        history.attach(metricstore.MetricStore(self.path))
+        return history
+
+    def test_round_trip(self):
+        history = self.writer()
+        for second in range(120):
+            history.record({'cpu': second % 50, 'disk:Données': 42}, timestamp=T0 + second)
+        history._store.flush()
+        reader = metricstore.open_reader(self.path)
+        self.assertEqual(sorted(reader.names()), ['cpu', 'disk:Données'])
+        for seconds in (60, 3600, 86400):
+            self.assertEqual(reader.series('cpu', seconds, now=T0 + 120),
+                             history.series('cpu', seconds, now=T0 + 120))
+        self.assertEqual(reader.series('disk:Données', 3600, now=T0 + 120)['avg'][-1], 42)
+
+    def test_single_writer(self):
+        self.writer()
+        with self.assertRaises(BlockingIOError):
+            metricstore.MetricStore(self.path)
+
+    def test_bad_header_resets_file(self):
+        for content in (b'pas un historique', struct.pack('<4sHHI', b'DBMH', 0, 3, MAX_METRICS)):
+            with self.subTest(content=content):
+                path = f'{self.path}.{len(content)}'
+                with open(path, 'wb') as f:
+                    f.write(content)
+                with self.assertRaises(ValueError):
+                    metricstore.open_reader(path)
+                store = metricstore.MetricStore(path)
+                self.assertEqual(os.path.getsize(path), metricstore.FILE_SIZE)
+                self.assertEqual(store.names(), [])
+                metricstore.open_reader(path)  # Format reconnu désormais
+
+    def test_wrap_around_in_file(self):
+        history = self.writer()
+        for second in range(3700):
+            history.record({'cpu': 1}, timestamp=T0 + second)
+        ring = history._rings['cpu'][0]
+        self.assertEqual(ring.size, ring.capacity)
+        self.assertEqual(metricstore.open_reader(self.path).series('cpu', 3600, now=T0 + 3700)['t'][0], T0 + 100)
+
+    def test_reclaim_idle_metric_slot(self):
+        history = self.writer()
+        history.record({f'disk:{i}': 1 for i in range(MAX_METRICS)}, timestamp=T0)
+        history.record({f'disk:{i}': 1 for i in range(1, MAX_METRICS)}, timestamp=T0 + RETENTION)
+
+        # 'disk:0' a encore des mesures dans l'historique : pas de place pour une nouvelle métrique
+        history.record({'disk:nouveau': 2}, timestamp=T0 + RETENTION)
+        self.assertNotIn('disk:nouveau', history.names())
+
+        # Plus rien à lire pour 'disk:0' : son emplacement est repris, vidé
+        history.record({'disk:nouveau': 2}, timestamp=T0 + RETENTION + 1)
+        self.assertNotIn('disk:0', history.names())
+        reader = metricstore.open_reader(self.path)
+        self.assertIn('disk:nouveau', reader.names())
+        self.assertNotIn('disk:0', reader.names())
+        self.assertEqual(reader.series('disk:nouveau', 86400 * 30, now=T0 + RETENTION + 1)['avg'], [2])
@@ -0,0 +1,71 @@
+"""IP publique servie par un `Refresher` (network.py, refresh.py)."""
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from dashboard import network
+from dashboard.refresh import Refresher
+from dashboard.tests.upstream import FakeUpstream, wait_for
+
+
+class PublicIpTests(SimpleTestCase):
+
+    def setUp(self):
+        self.answer = (200, {'Content-Type': 'text/plain'}, b'203.0.113.7\n')
+        self.upstream = FakeUpstream(lambda request: self.answer)
+        self.addCleanup(self.upstream.close)
+        settings = override_settings(DASHBOARD_PUBLIC_IP_URL=self.upstream.url)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.changes = []
+        self.info = Refresher('network', network.fetch, ttl=60, retry=60,
+                              on_change=lambda previous, current: self.changes.append((previous, current)))
+
+    def load(self):
+        """Premier calcul, comme au démarrage : None tout de suite, puis la valeur."""
+        self.assertIsNone(self.info.get())
+        self.assertTrue(wait_for(lambda: self.info.value is not None))
+        self.assertTrue(wait_for(lambda: not self.info._running))
+
+    def expire(self):
+        self.info.fetched_at -= self.info.ttl
+
+    def test_fresh_value_is_served_without_request(self):
+        self.load()
+        for _ in range(5):
+            self.assertEqual(self.info.get()['public_ip'], '203.0.113.7')
+        self.assertEqual(len(self.upstream.requests), 1)
+        self.assertFalse(self.info._running)
+
+    def test_stale_value_is_served_while_revalidating(self):
+        self.load()
+        self.expire()
+        self.answer = (200, {}, b'203.0.113.8')
+        self.upstream.gate.clear()
+        # Réponse immédiate avec l'ancienne valeur ; un seul recalcul pour plusieurs lectures
+        for _ in range(3):
+            self.assertEqual(self.info.get()['public_ip'], '203.0.113.7')
+        self.assertTrue(wait_for(lambda: len(self.upstream.requests) == 2))
+        self.upstream.gate.set()
+        self.assertTrue(wait_for(lambda: self.info.value['public_ip'] == '203.0.113.8'))
+        self.assertTrue(self.info.is_fresh())
+        self.assertEqual(len(self.upstream.requests), 2)
+        self.assertEqual(self.changes[0][1]['public_ip'], '203.0.113.8')
+
+    def test_upstream_failure_keeps_last_value(self):
+        self.load()
+        for answer in ((500, {}, b'erreur'), (200, {}, b'<html>portail captif</html>')):
+            self.answer = answer
+            self.expire()
+            with mock.patch('builtins.print'):
+                self.info.get()
+                self.assertTrue(wait_for(lambda: not self.info._running and self.info.is_fresh()))
+            self.assertEqual(self.info.get()['public_ip'], '203.0.113.7')
+        self.assertEqual(len(self.upstream.requests), 3)
+        self.assertEqual(self.changes, [])
+
+    def test_first_failure_is_unavailable(self):
+        self.answer = (503, {}, b'')
+        with mock.patch('builtins.print'):
+            self.load()
+        self.assertIsNone(self.info.value['public_ip'])
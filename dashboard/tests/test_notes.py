@@ -0,0 +1,163 @@
+"""Sauvegarde des notes par deltas (notes.py)."""
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+
+from dashboard import notes
+from dashboard.models import Page, Widget
+
+
+class NoteTestCase(TestCase):
+    """Note de départ 'abc' (version 0) ; tampon et journal vidés entre deux tests."""
+
+    def setUp(self):
+        page = Page.objects.create(name='Notes', slug='notes')
+        self.note = Widget.objects.create(page=page, title='Note', widget_type='note', content='abc')
+        self.reset()
+        # Pas de thread d'écriture : les tests vident le tampon eux-mêmes
+        patcher = mock.patch.object(notes, '_start_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.reset)
+
+    def reset(self):
+        with notes._lock:
+            notes._pending.clear()
+            notes._flushing.clear()
+            notes._log.clear()
+
+
+class MergeTests(NoteTestCase):
+
+    def test_transform_insertions_at_same_offset(self):
+        # Celle déjà appliquée par le serveur reste en premier
+        self.assertEqual(notes.transform((1, 0, 'Y'), (1, 0, 'XX')), (3, 0, 'Y'))
+
+    def test_transform_disjoint_splices(self):
+        self.assertEqual(notes.transform((0, 1, 'A'), (2, 1, 'Z')), (0, 1, 'A'))
+        self.assertEqual(notes.transform((2, 1, 'Z'), (0, 1, 'AA')), (3, 1, 'Z'))
+
+    def test_transform_overlapping_splices(self):
+        self.assertIsNone(notes.transform((0, 2, ''), (1, 1, 'B')))
+
+    def test_concurrent_insertions_are_merged(self):
+        notes.save_patch(self.note.id, 0, (1, 0, 'X'))
+        content, version, merged = notes.save_patch(self.note.id, 0, (1, 0, 'Y'))
+        self.assertEqual((content, version, merged), ('aXYbc', 2, True))
+
+    def test_overlapping_splices_are_stale(self):
+        notes.save_patch(self.note.id, 0, (1, 1, 'B'))
+        with self.assertRaises(notes.StaleVersion) as cm:
+            notes.save_patch(self.note.id, 0, (0, 2, ''))
+        self.assertEqual((cm.exception.content, cm.exception.version), ('aBc', 1))
+
+    def test_base_version_older_than_log_is_stale(self):
+        for version in range(notes.NOTE_LOG_SIZE + 1):
+            notes.save_patch(self.note.id, version, (0, 0, '.'))
+        with self.assertRaises(notes.StaleVersion):
+            notes.save_patch(self.note.id, 0, (0, 0, '!'))
+        # Le journal couvre encore les NOTE_LOG_SIZE dernières versions
+        content, _, merged = notes.save_patch(self.note.id, 1, (0, 0, '!'))
+        self.assertTrue(merged)
+        self.assertTrue(content.startswith('.' * notes.NOTE_LOG_SIZE + '!'))
+
+    def test_base_version_from_the_future_is_stale(self):
+        with self.assertRaises(notes.StaleVersion):
+            notes.save_patch(self.note.id, 5, (0, 0, '!'))
+
+    def test_splice_cutting_surrogate_pair(self):
+        notes.save_full(self.note.id, 'a😀b')
+        # Le smiley occupe les positions UTF-16 1 et 2
+        with self.assertRaises(ValueError):
+            notes.save_patch(self.note.id, 1, (2, 0, 'x'))
+        content, version, _ = notes.save_patch(self.note.id, 1, (3, 0, 'x'))
+        self.assertEqual((content, version), ('a😀xb', 2))
+
+    def test_splice_past_end(self):
+        with self.assertRaises(ValueError):
+            notes.apply_splice('abc', (2, 5, ''))
+
+
+class WriteBehindTests(NoteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = Widget.objects.create(page=self.note.page, title='Autre', widget_type='note', content='')
+
+    def stored(self, widget):
+        widget.refresh_from_db()
+        return widget.get_note_text(), widget.content_version
+
+    def test_pending_text_is_visible_before_flush(self):
+        notes.save_patch(self.note.id, 0, (3, 0, 'd'))
+        self.assertEqual(self.stored(self.note), ('abc', 0))
+        widget = Widget.objects.get(id=self.note.id)
+        notes.apply_pending([widget])
+        self.assertEqual((widget.get_note_text(), widget.content_version), ('abcd', 1))
+
+    def test_flush_writes_every_note(self):
+        notes.save_full(self.note.id, 'un')
+        notes.save_full(self.other.id, 'deux')
+        self.assertEqual(notes.flush(), 2)
+        self.assertEqual(self.stored(self.note), ('un', 1))
+        self.assertEqual(self.stored(self.other), ('deux', 1))
+        self.assertEqual(notes.pending_size(), 0)
+        self.assertEqual(notes.flush(), 0)
+
+    def test_save_during_flush_stays_pending(self):
+        notes.save_full(self.note.id, 'un')
+        save = Widget.save
+
+        def save_then_edit(widget, *args, **kwargs):
+            save(widget, *args, **kwargs)
+            if widget.id == self.note.id:
+                # Sauvegarde d'un onglet pendant l'écriture : elle voit le texte en cours d'écriture
+                notes.save_patch(self.note.id, 1, (2, 0, '!'))
+
+        with mock.patch.object(Widget, 'save', save_then_edit):
+            notes.flush()
+        self.assertEqual(self.stored(self.note), ('un', 1))
+        self.assertEqual(notes._pending, {self.note.id: ('un!', 2)})
+        notes.flush()
+        self.assertEqual(self.stored(self.note), ('un!', 2))
+
+    def test_failed_flush_puts_entries_back(self):
+        notes.save_full(self.note.id, 'un')
+        notes.save_full(self.other.id, 'deux')
+        save = Widget.save
+
+        def fail_on_other(widget, *args, **kwargs):
+            if widget.id == self.other.id:
+                # Une sauvegarde plus récente arrive avant l'échec : elle ne doit pas être écrasée
+                notes.save_full(self.note.id, 'un bis')
+                raise RuntimeError("disque plein")
+            save(widget, *args, **kwargs)
+
+        with mock.patch.object(Widget, 'save', fail_on_other), self.assertRaises(RuntimeError):
+            notes.flush()
+        # Une seule transaction, annulée : la première note, déjà réécrite, ne l'est plus
+        self.assertEqual(self.stored(self.note), ('abc', 0))
+        self.assertEqual(notes._pending, {self.note.id: ('un bis', 2), self.other.id: ('deux', 1)})
+        self.assertEqual(notes._flushing, {})
+        notes.flush()
+        self.assertEqual(self.stored(self.note), ('un bis', 2))
+        self.assertEqual(self.stored(self.other), ('deux', 1))
+
+    def test_delete_discards_pending_text(self):
+        notes.save_full(self.note.id, 'un')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.note.delete()
+        self.assertEqual(notes._pending, {})
+        self.assertEqual(notes.flush(), 0)
+
+    def test_rolled_back_delete_keeps_pending_text(self):
+        notes.save_full(self.note.id, 'un')
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Widget.objects.get(id=self.note.id).delete()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(notes._pending, {self.note.id: ('un', 1)})
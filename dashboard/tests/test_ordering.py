@@ -0,0 +1,62 @@
+"""Clés d'ordre espacées (ordering.py)."""
+from django.test import TestCase
+from django.urls import reverse
+
+from dashboard import ordering
+from dashboard.models import Link, Page, Widget
+
+
+class MoveBetweenTests(TestCase):
+
+    def setUp(self):
+        page = Page.objects.create(name='Accueil', slug='accueil')
+        self.widget = Widget.objects.create(page=page, title='Liens')
+        self.links = [
+            Link.objects.create(widget=self.widget, title=title, order=(i + 1) * ordering.ORDER_GAP)
+            for i, title in enumerate('ABCD')
+        ]
+
+    def titles(self):
+        return list(self.widget.links.values_list('title', flat=True))
+
+    def move(self, link, prev, next_):
+        return ordering.move_between(link, self.widget.links.all(), prev_id=prev and prev.id,
+                                     next_id=next_ and next_.id)
+
+    def test_move_between_neighbours(self):
+        a, b, c, d = self.links
+        self.move(d, a, b)
+        self.assertEqual(self.titles(), list('ADBC'))
+
+    def test_rebalance_when_no_room(self):
+        a, b, c, d = self.links
+        Link.objects.filter(id=b.id).update(order=a.order + 1)
+        self.move(d, a, b)
+        self.assertEqual(self.titles(), list('ADBC'))
+
+    def test_reversed_neighbours_place_after_prev(self):
+        # Client périmé : 'prev' et 'next' inversés
+        a, b, c, d = self.links
+        order = self.move(a, c, b)
+        self.assertIsNotNone(order)
+        self.assertEqual(self.titles(), list('BCAD'))
+
+    def test_reversed_neighbours_at_end(self):
+        a, b, c, d = self.links
+        self.move(b, d, a)
+        self.assertEqual(self.titles(), list('ACDB'))
+
+    def test_view_accepts_reversed_neighbours(self):
+        a, b, c, d = self.links
+        response = self.client.post(reverse('update_order'), {
+            'widget_id': self.widget.id, 'moved_id': a.id, 'prev_id': c.id, 'next_id': b.id,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(), list('BCAD'))
+
+    def test_batch_accepts_reversed_neighbours(self):
+        a, b, c, d = self.links
+        ops = [{'op': 'move_link', 'id': a.id, 'widget_id': self.widget.id, 'prev_id': c.id, 'next_id': b.id}]
+        response = self.client.post(reverse('apply_batch'), {'ops': ops}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(), list('BCAD'))
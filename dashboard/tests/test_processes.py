@@ -0,0 +1,39 @@
+"""Table des processus du panneau "Processus" (processes.py)."""
+import subprocess
+import sys
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from dashboard.processes import WANTED_FOR, ProcessTable
+
+
+class ProcessTableTests(SimpleTestCase):
+
+    def spawn(self):
+        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+        self.addCleanup(child.wait)
+        self.addCleanup(child.kill)
+        return child
+
+    def test_idle_table_is_refreshed(self):
+        table = ProcessTable()
+        table.top('rss')
+        child = self.spawn()
+        # Panneau resté fermé : le thread d'échantillonnage n'a plus actualisé la table
+        table.refreshed_at -= WANTED_FOR + 60
+        self.assertIn(child.pid, [row['pid'] for row in table.top('rss', limit=10_000)])
+
+    def test_io_sort_covers_every_process(self):
+        # Processus endormi (0 % CPU) mais seul à écrire sur le disque
+        child = self.spawn()
+        time.sleep(0.5)  # fin du démarrage de l'interpréteur
+
+        def io_rate(table, pid, proc, now):
+            return 50e6 if pid == child.pid else 0.0
+
+        with mock.patch.object(ProcessTable, '_io_rate', io_rate):
+            top = ProcessTable().top('io', limit=1)
+        self.assertEqual([row['pid'] for row in top], [child.pid])
+        self.assertEqual(top[0]['io'], 50e6)
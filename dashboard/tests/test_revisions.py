@@ -0,0 +1,96 @@
+"""Historique compressé des notes (revisions.py)."""
+from datetime import timedelta
+from unittest import mock
+
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from dashboard import notes, revisions
+from dashboard.models import NoteRevision, Page, Widget
+
+
+@override_settings(DASHBOARD_NOTE_REVISION_INTERVAL=300, DASHBOARD_NOTE_SNAPSHOT_EVERY=20,
+                   DASHBOARD_NOTE_REVISION_MAX=200, DASHBOARD_NOTE_REVISION_RETENTION_DAYS=30)
+class RevisionTests(TestCase):
+
+    def setUp(self):
+        page = Page.objects.create(name='Notes', slug='notes')
+        self.note = Widget.objects.create(page=page, title='Note', widget_type='note', content='line1\n')
+
+    def write(self, text):
+        self.note.set_note_text(text)
+        self.note.content_version += 1
+        self.note.save(update_fields=Widget.NOTE_FIELDS + ['content_version'])
+
+    def close_window(self):
+        # Fait comme si la fenêtre de regroupement de chaque révision était passée
+        NoteRevision.objects.filter(widget=self.note).update(created_at=F('created_at') - timedelta(hours=1))
+
+    def history(self):
+        """Textes de toutes les révisions, de la plus ancienne à la plus récente."""
+        return [revisions.get_content(r) for r in NoteRevision.objects.filter(widget=self.note).order_by('id')]
+
+    def test_saves_within_window_share_a_revision(self):
+        self.write('line1\nline2\n')
+        self.write('line1\nline2\nline3\n')
+        self.assertEqual(self.history(), ['line1\nline2\nline3\n'])
+
+    def test_saves_after_window_create_revisions(self):
+        self.close_window()
+        self.write('line1\nline2\n')
+        self.assertEqual(self.history(), ['line1\n', 'line1\nline2\n'])
+
+    def test_identical_text_is_not_recorded(self):
+        self.close_window()
+        self.note.save()
+        self.assertEqual(NoteRevision.objects.filter(widget=self.note).count(), 1)
+
+    def test_replacing_windowed_snapshot_keeps_older_revisions(self):
+        self.write('line1\nline2\n')
+        self.close_window()
+        self.write('line1\nline2\nline3\n')
+        self.write('X\nY\nZ\n')  # même fenêtre que la précédente
+        self.assertEqual(self.history(), ['line1\nline2\n', 'X\nY\nZ\n'])
+
+    @override_settings(DASHBOARD_NOTE_REVISION_INTERVAL=0, DASHBOARD_NOTE_SNAPSHOT_EVERY=3)
+    def test_snapshot_cadence(self):
+        texts = ['line1\n'] + [f'line1\nline{i}\n' for i in range(2, 9)]
+        for text in texts[1:]:
+            self.write(text)
+        kinds = list(NoteRevision.objects.filter(widget=self.note).order_by('id').values_list('is_snapshot', flat=True))
+        # Un instantané après chaque série de 2 différences, et toujours sur la plus récente
+        self.assertEqual(kinds, [False, False, True, False, False, True, False, True])
+        self.assertEqual(self.history(), texts)
+
+    @override_settings(DASHBOARD_NOTE_REVISION_INTERVAL=0, DASHBOARD_NOTE_REVISION_MAX=3)
+    def test_prune_keeps_most_recent(self):
+        texts = ['line1\n'] + [f'line1\nline{i}\n' for i in range(2, 7)]
+        for text in texts[1:]:
+            self.write(text)
+        self.assertEqual(self.history(), texts[-3:])
+
+    @override_settings(DASHBOARD_NOTE_REVISION_INTERVAL=0)
+    def test_prune_drops_expired_but_not_latest(self):
+        self.write('line1\nline2\n')
+        NoteRevision.objects.filter(widget=self.note).update(updated_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(revisions.prune(self.note), 1)
+        self.assertEqual(self.history(), ['line1\nline2\n'])
+
+    def test_restore(self):
+        self.write('line1\nline2\n')
+        self.close_window()
+        self.write('autre\n')
+        self.close_window()
+        first = NoteRevision.objects.filter(widget=self.note).order_by('id').first()
+        # Pas de thread d'écriture : le tampon est vidé juste après
+        with mock.patch.object(notes, '_start_flusher'):
+            response = self.client.post(reverse('restore_note_revision', args=[self.note.id, first.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['content'], 'line1\nline2\n')
+        notes.flush()
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.get_note_text(), 'line1\nline2\n')
+        # Le texte remplacé reste dans l'historique
+        self.assertIn('autre\n', self.history())
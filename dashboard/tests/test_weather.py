@@ -0,0 +1,81 @@
+"""Prévisions météo partagées entre les clients (weather.py)."""
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import SimpleTestCase, override_settings
+
+from dashboard import weather
+from dashboard.tests.upstream import FakeUpstream, wait_for
+
+OPEN_METEO = {
+    'current': {'time': '2026-10-18T14:00', 'temperature_2m': 11.6, 'weather_code': 3},
+    'daily': {
+        'time': ['2026-10-18', '2026-10-19', '2026-10-20', '2026-10-21'],
+        'weather_code': [3, 61, 0, 99],
+        'temperature_2m_max': [12.4, 9.5, 14.49, 7.0],
+        'temperature_2m_min': [4.1, 2.5, -0.6, -3.2],
+    },
+}
+ETAG = '"forecast-1"'
+
+
+class WeatherTests(SimpleTestCase):
+
+    def setUp(self):
+        self.upstream = FakeUpstream(self.respond)
+        self.addCleanup(self.upstream.close)
+        settings = override_settings(DASHBOARD_WEATHER_API_URL=self.upstream.url, DASHBOARD_WEATHER_TTL=600)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        weather._refreshers.clear()
+        self.addCleanup(weather._refreshers.clear)
+
+    def respond(self, request):
+        if request.headers.get('If-None-Match') == ETAG:
+            return 304, {'ETag': ETAG}, b''
+        return 200, {'Content-Type': 'application/json', 'ETag': ETAG}, json.dumps(OPEN_METEO).encode()
+
+    def test_build_forecast(self):
+        forecast = weather.build_forecast(OPEN_METEO)
+        self.assertEqual((forecast['temperature'], forecast['icon'], forecast['description']), (12, '☁️', 'Couvert'))
+        self.assertEqual(forecast['days'], [
+            {'name': 'lun.', 'icon': '🌧️', 'description': 'Pluie légère', 'max': 10, 'min': 2},
+            {'name': 'mar.', 'icon': '☀️', 'description': 'Ciel dégagé', 'max': 14, 'min': -1},
+            {'name': 'mer.', 'icon': '❓', 'description': 'Code météo 99', 'max': 7, 'min': -3},
+        ])
+
+    def test_fetch_forecast(self):
+        result = weather.fetch_forecast(45.5, -73.57, None)
+        self.assertEqual(result['etag'], ETAG)
+        self.assertEqual(result['forecast']['temperature'], 12)
+        path, headers = self.upstream.requests[0]
+        params = parse_qs(urlsplit(path).query)
+        self.assertEqual((params['latitude'], params['longitude']), (['45.5'], ['-73.57']))
+        self.assertNotIn('If-None-Match', headers)
+
+    def test_not_modified_reuses_previous(self):
+        previous = weather.fetch_forecast(45.5, -73.57, None)
+        self.assertIs(weather.fetch_forecast(45.5, -73.57, previous), previous)
+        self.assertEqual(self.upstream.requests[1][1]['If-None-Match'], ETAG)
+
+    def test_nearby_clients_share_one_request(self):
+        context = weather.weather_context(45.5012, -73.5671)
+        self.assertTrue(context['pending'])
+        refresher = weather.get_refresher(45.5, -73.57)
+        self.assertTrue(wait_for(lambda: refresher.value is not None and not refresher._running))
+        for latitude, longitude in ((45.5012, -73.5671), (45.499, -73.568), (45.5, -73.57)):
+            context = weather.weather_context(latitude, longitude)
+            self.assertFalse(context['pending'])
+            self.assertEqual(context['forecast']['description'], 'Couvert')
+        self.assertEqual(len(weather._refreshers), 1)
+        self.assertEqual(len(self.upstream.requests), 1)
+
+    def test_expired_forecast_is_revalidated(self):
+        refresher = weather.get_refresher(45.5, -73.57)
+        first = refresher.refresh()
+        refresher.fetched_at -= refresher.ttl
+        self.assertIs(weather.weather_context(45.5, -73.57)['forecast'], first['forecast'])
+        self.assertTrue(wait_for(lambda: len(self.upstream.requests) == 2 and not refresher._running))
+        # 304 : même prévision (même objet), de nouveau fraîche
+        self.assertIs(refresher.value, first)
+        self.assertTrue(refresher.is_fresh())
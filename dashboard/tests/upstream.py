@@ -0,0 +1,52 @@
+"""Service externe factice (serveur HTTP local) pour les tests network / weather."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+class FakeUpstream:
+    """Serveur sur 127.0.0.1 qui renvoie la réponse configurée et note chaque requête.
+
+    `respond(request)` reçoit le gestionnaire HTTP et renvoie (statut, en-têtes, corps) ;
+    tant que `gate` n'est pas levé, les réponses sont retenues.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []  # (chemin, en-têtes)
+        self.gate = threading.Event()
+        self.gate.set()
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                upstream.requests.append((self.path, dict(self.headers)))
+                upstream.gate.wait(10)
+                status, headers, body = upstream.respond(self)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.gate.set()
+        self.server.shutdown()
+        self.server.server_close()
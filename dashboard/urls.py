@@ -21,6 +21,8 @@ urlpatterns = [
     path('widget/add/<int:page_id>/', views.add_widget, name='add_widget'),
     path('widget/delete/<int:widget_id>/', views.delete_widget, name='delete_widget'),
     path('widget/<int:pk>/rename/', views.rename_widget, name='rename_widget'),
+    path('widget/<int:widget_id>/fragment/', views.widget_fragment, name='widget_fragment'),
+    path('widget/<int:widget_id>/note/', views.note_editor, name='note_editor'),
     path('widget/move/<int:widget_id>/', views.move_widget_to_page, name='move_widget'),
 
     # =================================
@@ -38,13 +40,25 @@ urlpatterns = [
     path('api/update-page-order/', views.update_page_order, name='update_page_order'),
     path('api/update-widget-order/', views.update_widget_order, name='update_widget_order'),
     path('api/update-order/', views.update_link_order, name='update_order'), # Correction ici
+    path('api/batch/', views.apply_batch, name='apply_batch'),
     path('api/move-link/<int:link_id>/', views.move_link_to_page, name='move_link'),
     path('api/save-note/<int:widget_id>/', views.save_note_content, name='save_note'),
+    path('api/notes/<int:widget_id>/revisions/', views.note_revisions, name='note_revisions'),
+    path('api/notes/<int:widget_id>/revisions/<int:revision_id>/', views.note_revision_detail, name='note_revision_detail'),
+    path('api/notes/<int:widget_id>/revisions/<int:revision_id>/restore/', views.restore_note_revision, name='restore_note_revision'),
+    path('api/search/', views.search_links, name='search_links'),
+    path('api/search/notes/', views.search_notes, name='search_notes'),
 
     # =================================
     # UTILITAIRES
     # =================================
     path('api/system-monitor/', views.system_monitor, name='system_monitor'),
+    path('api/system-monitor/history/', views.system_monitor_history, name='system_monitor_history'),
+    path('api/system-monitor/stream/', views.system_monitor_stream, name='system_monitor_stream'),
+    path('api/system-monitor/processes/', views.top_processes, name='top_processes'),
     path('api/network-info/', views.get_network_info, name='get_network_info'),
+    path('api/infos/', views.infos_data, name='infos_data'),
+    path('api/weather/', views.weather, name='weather'),
     path('api/backup/', views.download_backup, name='download_backup'),
+    path('api/cache-stats/', views.cache_stats, name='cache_stats'),
 ]
@@ -1,22 +1,38 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.http import HttpResponse
-from django.views.decorators.http import require_POST
+from django.http import HttpResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST, condition
+from django.views.decorators.cache import cache_control
+from django.views.decorators.vary import vary_on_cookie, vary_on_headers
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.text import slugify
-from .models import Page, Widget, Link
-import psutil
+from django.db import transaction
+from django.db.models import Count
+from .models import Page, Widget, Link, NoteRevision
+from . import batch, caching, fulltext, infos, monitor, notes, ordering, revisions
+from .history import RESOLUTIONS, metric_history
+from .network import network_context
+from .processes import panel_context
+from .weather import weather_context
+from .search import link_index
+from .stream import monitor_broadcaster
+from .signals import links_bulk_updated, orders_bulk_updated
+import json
 import subprocess
 import os
 import shutil
-import socket
-import requests
 
 import zipfile
 import io
 from datetime import datetime
 from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.http import FileResponse
+from django.template.loader import render_to_string
 
+@vary_on_cookie
+@vary_on_headers('HX-Request', 'HX-History-Restore-Request')
+@cache_control(no_cache=True)
+@condition(etag_func=caching.page_etag)
 def index(request, slug=None):
     """Affiche la page principale du tableau de bord.
 
@@ -24,64 +40,193 @@ def index(request, slug=None):
     la page active en se basant sur le 'slug' fourni dans l'URL. Si aucun
     slug n'est fourni, la première page est affichée par défaut.
 
+    Le nombre de requêtes SQL est fixe, quel que soit le nombre de widgets :
+    une pour les pages (réutilisée par la navigation et les menus), une pour
+    les widgets de la page active et au plus une pour les liens des widgets
+    dont le fragment HTML n'est pas déjà en cache (voir caching.py).
+
+    Au-delà de DASHBOARD_LAZY_WIDGETS widgets, seules les coquilles (titre et
+    emplacement) sont rendues ; le contenu arrive ensuite via `widget_fragment`.
+
+    Pour une requête HTMX (clic sur un onglet), seule la grille est renvoyée,
+    avec la navigation, les menus et les modales en "out-of-band" swap
+    (`partials/page_swap.html`). Une restauration d'historique HTMX reçoit
+    la page complète.
+
+    Requête conditionnelle : l'ETag dépend de la révision globale du tableau
+    de bord et du slug. Si rien n'a changé, Django renvoie un 304 sans
+    interroger la base ni rendre le template.
+
     Args:
         request (HttpRequest): L'objet de requête Django.
         slug (str, optional): Le slug de la page à afficher. Defaults to None.
 
     Returns:
         HttpResponse: La page HTML du tableau de bord rendue avec le contexte.
+
+    Raises:
+        Http404: Si aucune page ne correspond au slug.
     """
-    pages = Page.objects.all()
+    # On évalue la liste une seule fois : nav_header.html et menus.html la parcourent tous les deux
+    pages = list(Page.objects.all())
     if not slug:
-        active_page = pages.first()
+        active_page = pages[0] if pages else None
     else:
-        active_page = get_object_or_404(Page, slug=slug)
+        active_page = next((page for page in pages if page.slug == slug), None)
+        if active_page is None:
+            raise Http404("Page introuvable")
+
+    widgets = []
+    widget_fragments = []
+    lazy_widgets = False
+    if active_page:
+        # Lue avant les widgets : voir caching.render_widgets
+        revision = caching.get_dashboard_revision()
+        # Widgets et liens sont déjà triés par 'order' (Meta.ordering)
+        # Le texte compressé des grandes notes n'est jamais chargé ici (seul l'aperçu est rendu)
+        widgets = list(active_page.widgets.defer('content_compressed').annotate(link_count=Count('links')))
+
+        # Très grosses pages : on n'envoie que les coquilles, chaque widget
+        # est chargé par HTMX quand il entre dans l'écran (widget_fragment).
+        lazy_widgets = 0 < settings.DASHBOARD_LAZY_WIDGETS < len(widgets)
+        if not lazy_widgets:
+            # Notes sauvegardées mais pas encore écrites en base (voir notes.py)
+            notes.apply_pending(widgets)
+            widget_fragments = caching.render_widgets(request, widgets, revision)
 
     context = {
         'pages': pages,
         'active_page': active_page,
+        'widgets': widgets,
+        'widget_fragments': widget_fragments,
+        'lazy_widgets': lazy_widgets,
     }
+    if request.htmx and not request.htmx.history_restore_request:
+        return render(request, 'partials/page_swap.html', context)
     return render(request, 'dashboard/index.html', context)
 
 
+def _post_id(request, name):
+    """Renvoie un ID entier lu dans request.POST, ou None s'il est absent ou invalide."""
+    value = request.POST.get(name, '')
+    return int(value) if value.isdigit() else None
+
+
 @csrf_exempt
 @require_POST
 def update_link_order(request):
     """Met à jour l'ordre et l'appartenance des liens après un glisser-déposer.
 
-    Cette API est appelée par HTMX/SortableJS. Elle met à jour l'attribut 'order'
-    de chaque lien et peut changer le widget parent si un lien est déplacé
-    vers une autre catégorie.
+    Cette API est appelée par HTMX/SortableJS. Deux formats sont acceptés :
+
+    - Déplacement unitaire (utilisé par l'interface) : "mettre le lien X entre
+      A et B". Seule la ligne du lien déplacé est écrite (voir ordering.py).
+    - Liste complète (ancien format) : tous les liens sont chargés en une
+      requête, puis seuls ceux dont le widget ou la position a changé sont
+      écrits avec un unique `bulk_update`, dans une seule transaction.
 
     Args:
         request (HttpRequest): La requête POST doit contenir :
             - 'widget_id' (int): L'ID du widget de destination.
-            - 'link' (list[int]): Une liste des IDs des liens dans leur nouvel ordre.
+            - soit 'moved_id' (int), et optionnellement 'prev_id' / 'next_id' (int) :
+              le lien déplacé et ses nouveaux voisins (absents = début/fin de liste) ;
+            - soit 'link' (list[int]): Une liste des IDs des liens dans leur nouvel ordre.
 
     Returns:
-        HttpResponse: Un statut 200 OK si la mise à jour réussit.
+        JsonResponse: {'updated': int, 'unchanged': int, 'missing': list[int]},
+            ou {'error': str} (400) si le lien ne peut pas être placé entre ses voisins.
     """
     # 1. On récupère l'ID du widget dans lequel le lien a atterri
     widget_id = request.POST.get('widget_id')
-    # 2. On récupère la liste des liens dans leur nouvel ordre
-    link_ids = request.POST.getlist('link')
-
-    # Si on a un widget_id (donc un déplacement ou réarrangement)
-    if widget_id:
-        target_widget = get_object_or_404(Widget, id=widget_id)
+    if not widget_id:
+        return JsonResponse({'updated': 0, 'unchanged': 0, 'missing': []})
+    target_widget = get_object_or_404(Widget, id=widget_id)
+
+    # 2a. Déplacement unitaire : une seule ligne écrite
+    moved_id = _post_id(request, 'moved_id')
+    if moved_id:
+        link = get_object_or_404(Link, id=moved_id)
+        try:
+            ordering.move_between(
+                link, target_widget.links.all(),
+                prev_id=_post_id(request, 'prev_id'), next_id=_post_id(request, 'next_id'),
+                widget=target_widget,
+            )
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        return JsonResponse({'updated': 1, 'unchanged': 0, 'missing': []})
+
+    # 2b. Liste complète dans le nouvel ordre
+    link_ids = [int(link_id) for link_id in request.POST.getlist('link') if link_id.isdigit()]
+    changed = []
+    previous_widget_ids = set()
+
+    with transaction.atomic():
+        found = Link.objects.in_bulk(link_ids)
 
         for index, link_id in enumerate(link_ids):
-            try:
-                link = Link.objects.get(id=link_id)
+            link = found.get(link_id)
+            order = (index + 1) * ordering.ORDER_GAP
+            if link is None or (link.widget_id == target_widget.id and link.order == order):
+                continue
+            if link.widget_id != target_widget.id:
+                previous_widget_ids.add(link.widget_id)
+            # On change le parent et la position du lien
+            link.widget = target_widget
+            link.order = order
+            changed.append(link)
+
+        if changed:
+            Link.objects.bulk_update(changed, ['widget', 'order'])
+            # bulk_update n'envoie pas post_save : on prévient les caches après le commit
+            transaction.on_commit(lambda: links_bulk_updated.send(
+                sender=Link, links=changed, previous_widget_ids=previous_widget_ids,
+            ))
+
+    return JsonResponse({
+        'updated': len(changed),
+        'unchanged': len(found) - len(changed),
+        'missing': [link_id for link_id in link_ids if link_id not in found],
+    })
 
-                # On change le parent du lien pour le nouveau widget
-                link.widget = target_widget
 
-                # On met à jour sa position
-                link.order = index
-                link.save()
-            except Link.DoesNotExist:
-                continue
+def _reorder(request, model, list_name, siblings):
+    """Logique commune à update_widget_order et update_page_order.
+
+    Args:
+        request (HttpRequest): La requête POST ('moved_id'/'prev_id'/'next_id' ou liste d'IDs).
+        model (type[Model]): Widget ou Page.
+        list_name (str): Nom du champ POST contenant la liste complète (ancien format).
+        siblings (Callable[[Model], QuerySet]): Renvoie les frères de l'objet déplacé.
+
+    Returns:
+        HttpResponse: Statut 200, ou 400 si l'objet ne peut pas être placé entre ses voisins.
+    """
+    moved_id = _post_id(request, 'moved_id')
+    if moved_id:
+        obj = get_object_or_404(model, id=moved_id)
+        try:
+            ordering.move_between(
+                obj, siblings(obj),
+                prev_id=_post_id(request, 'prev_id'), next_id=_post_id(request, 'next_id'),
+            )
+        except ValueError:
+            return HttpResponse(status=400)
+        return HttpResponse(status=200)
+
+    ids = [int(obj_id) for obj_id in request.POST.getlist(list_name) if obj_id.isdigit()]
+    with transaction.atomic():
+        found = model.objects.in_bulk(ids)
+        changed = []
+        for index, obj_id in enumerate(ids):
+            obj = found.get(obj_id)
+            order = (index + 1) * ordering.ORDER_GAP
+            if obj is not None and obj.order != order:
+                obj.order = order
+                changed.append(obj)
+        if changed:
+            model.objects.bulk_update(changed, ['order'])
+            transaction.on_commit(lambda: orders_bulk_updated.send(sender=model, instances=changed))
 
     return HttpResponse(status=200)
 
@@ -92,25 +237,48 @@ def update_widget_order(request):
     """Met à jour l'ordre des widgets (catégories) sur une page.
 
     Appelée par SortableJS lors du déplacement d'un bloc widget entier.
+    Seule la clé d'ordre du widget déplacé est réécrite (voir ordering.py).
 
     Args:
         request (HttpRequest): La requête POST doit contenir :
-            - 'widget' (list[int]): Liste ordonnée des IDs des widgets.
+            - soit 'moved_id' (int), et optionnellement 'prev_id' / 'next_id' (int) ;
+            - soit 'widget' (list[int]): Liste ordonnée des IDs des widgets (ancien format).
 
     Returns:
         HttpResponse: Statut 200 si succès.
     """
-    widget_ids = request.POST.getlist('widget')
+    return _reorder(request, Widget, 'widget', lambda widget: widget.page.widgets.all())
 
-    for index, widget_id in enumerate(widget_ids):
-        try:
-            widget = get_object_or_404(Widget, id=widget_id)
-            widget.order = index
-            widget.save()
-        except:
-            continue
 
-    return HttpResponse(status=200)
+@require_POST
+def apply_batch(request):
+    """Applique en une seule transaction un lot d'opérations mis en file par le client.
+
+    Remplace, pendant une session de réorganisation, les dizaines de requêtes
+    unitaires (glisser-déposer, renommages, suppressions...) : les objets cités
+    sont chargés en une requête par modèle et tout est validé en un seul commit.
+    Voir dashboard/batch.py pour le format des opérations.
+
+    Args:
+        request (HttpRequest): La requête POST, corps JSON {"ops": [...]}, avec
+            l'en-tête X-CSRFToken.
+
+    Returns:
+        JsonResponse: {'applied': int} si succès, ou {'error': str, 'index': int | None}
+            avec le statut 400 (aucune opération n'est alors conservée). 415 si le
+            corps n'est pas déclaré en JSON.
+    """
+    if request.content_type != 'application/json':
+        return JsonResponse({'error': 'Content-Type application/json attendu', 'index': None}, status=415)
+    try:
+        payload = json.loads(request.body or b'{}')
+        ops = payload.get('ops', []) if isinstance(payload, dict) else None
+        applied = batch.apply(ops)
+    except ValueError:
+        return JsonResponse({'error': 'JSON invalide', 'index': None}, status=400)
+    except batch.BatchError as exc:
+        return JsonResponse({'error': exc.message, 'index': exc.index}, status=400)
+    return JsonResponse({'applied': applied})
 
 
 @csrf_exempt
@@ -136,6 +304,8 @@ def move_link_to_page(request, link_id):
 
     if target_widget:
         link.widget = target_widget
+        # On place le lien à la fin du widget cible
+        link.order = ordering.next_order(target_widget.links.all())
         link.save()
         return HttpResponse(status=200)
     return HttpResponse(status=400)
@@ -159,7 +329,7 @@ def add_link(request, widget_id):
     # MODIFICATION : On vérifie seulement si 'title' existe.
     if title:
         # Si l'URL est vide, on s'assure que c'est bien None ou une chaîne vide
-        Link.objects.create(title=title, url=url, widget=widget, order=999)
+        Link.objects.create(title=title, url=url, widget=widget, order=ordering.next_order(widget.links.all()))
 
     return redirect(request.META.get('HTTP_REFERER', '/'))
 
@@ -203,7 +373,7 @@ def create_page(request):
             counter += 1
 
         # On crée la page (à la fin de la liste par défaut)
-        Page.objects.create(name=name, slug=slug, order=999)
+        Page.objects.create(name=name, slug=slug, order=ordering.next_order(Page.objects.all()))
 
         # On redirige immédiatement vers la nouvelle page
         return redirect('index', slug=slug)
@@ -270,7 +440,7 @@ def move_widget_to_page(request, widget_id):
         target_page = get_object_or_404(Page, id=target_page_id)
         widget.page = target_page
         # On place le widget à la fin de la nouvelle page
-        widget.order = 999
+        widget.order = ordering.next_order(target_page.widgets.all())
         widget.save()
 
     # On recharge la page actuelle pour voir le widget disparaître
@@ -315,13 +485,55 @@ def add_widget(request, page_id):
         Widget.objects.create(
             title=title,
             page=page,
-            order=999,
+            order=ordering.next_order(page.widgets.all()),
             widget_type=w_type  # On enregistre le type en base de données
         )
 
     return redirect('index', slug=page.slug)
 
 
+@vary_on_cookie
+@cache_control(no_cache=True)
+@condition(etag_func=caching.widget_etag)
+def widget_fragment(request, widget_id):
+    """Renvoie le HTML complet d'un widget (chargement paresseux).
+
+    Appelée par HTMX (`hx-trigger="revealed"`) depuis `partials/widget_shell.html`
+    lorsque la coquille du widget devient visible à l'écran.
+
+    Args:
+        request (HttpRequest): L'objet de requête.
+        widget_id (int): L'ID du widget à rendre.
+
+    Returns:
+        HttpResponse: Le fragment `partials/widget.html` (servi depuis le cache si possible).
+    """
+    revision = caching.get_dashboard_revision()
+    widget = get_object_or_404(Widget.objects.defer('content_compressed'), id=widget_id)
+    notes.apply_pending([widget])
+    (_, html), = caching.render_widgets(request, [widget], revision)
+    return HttpResponse(html)
+
+
+def note_editor(request, widget_id):
+    """Renvoie l'éditeur d'une grande note avec son texte complet.
+
+    Les notes de plus de DASHBOARD_NOTE_COMPRESS_THRESHOLD caractères ne sont
+    rendues dans la page que sous forme d'aperçu en lecture seule ; au premier
+    clic, HTMX remplace l'aperçu par ce fragment.
+
+    Args:
+        request (HttpRequest): L'objet de requête.
+        widget_id (int): L'ID du widget 'note'.
+
+    Returns:
+        HttpResponse: Le fragment `partials/note_editor.html` avec le texte complet.
+    """
+    widget = get_object_or_404(Widget, id=widget_id, widget_type='note')
+    notes.apply_pending([widget])
+    return render(request, 'partials/note_editor.html', {'widget': widget, 'full_text': widget.get_note_text()})
+
+
 def rename_widget(request, pk):
     """Gère l'édition en ligne du titre d'un widget.
 
@@ -394,98 +606,243 @@ def edit_link(request, pk):
 
 # dashboard/views.py
 
-def get_gpu_stats():
-    """Récupère VRAM et Température via nvidia-smi sans librairie tierce.
+# Bornes de l'API d'historique du monitoring : la plus longue résolution, 1000 points par série
+MONITOR_HISTORY_MAX_RANGE = RESOLUTIONS[-1][1] * RESOLUTIONS[-1][2]
+MONITOR_HISTORY_MAX_POINTS = 1000
+
+
+def system_monitor(request):
+    """Affiche les métriques du système (CPU, GPU, RAM, Disque) pour le widget de monitoring.
+
+    Cette vue est appelée périodiquement par HTMX (Polling). Elle ne mesure
+    rien : elle rend le dernier instantané du thread d'échantillonnage (voir
+    dashboard/monitor.py), quel que soit le nombre d'onglets ouverts.
+
+    Si le client envoie l'ETag de ce qu'il affiche (If-None-Match) et qu'aucune
+    valeur n'a bougé d'au moins DASHBOARD_MONITOR_TOLERANCE, rien n'est rendu :
+    204 pour HTMX (pas de remplacement), 304 sinon. L'en-tête X-Monitor-Interval
+    indique au client quand revenir (voir monitor.poll_interval).
+
+    Args:
+        request (HttpRequest): L'objet de requête. L'en-tête X-Page-Visibility
+            vaut 'hidden' quand l'onglet n'est pas affiché.
 
     Returns:
-        dict: Un dictionnaire contenant 'temp', 'used', 'total', 'percent' si succès.
-        None: Si la commande échoue (pas de GPU Nvidia ou driver manquant).
+        HttpResponse: Le fragment HTML (Partial) avec les jauges et valeurs mises à jour,
+            ou une réponse vide (204 / 304) si l'affichage est encore à jour.
     """
-    try:
-        # On demande : température, mémoire utilisée, mémoire totale
-        cmd = "nvidia-smi --query-gpu=temperature.gpu,memory.used,memory.total --format=csv,noheader,nounits"
-        output = subprocess.check_output(cmd.split(), encoding='utf-8')
-        temp, used, total = map(int, output.strip().split(', '))
-        return {
-            'temp': temp,
-            'used': used,
-            'total': total,
-            'percent': round((used / total) * 100, 1)
-        }
-    except Exception:
-        return None  # Pas de GPU Nvidia ou erreur driver
+    snapshot = monitor.get_snapshot()
+    etag = request.headers.get('If-None-Match')
+    if etag and monitor.is_close(etag, snapshot, settings.DASHBOARD_MONITOR_TOLERANCE):
+        response = HttpResponse(status=204 if request.htmx else 304)
+        response['ETag'] = etag  # Le client garde ses valeurs de référence
+    else:
+        response = render(request, 'partials/system_monitor.html', snapshot)
+        response['ETag'] = monitor.make_etag(snapshot)
+    hidden = request.headers.get('X-Page-Visibility') == 'hidden'
+    response['X-Monitor-Interval'] = monitor.poll_interval(snapshot, hidden)
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
-def system_monitor(request):
-    """Récupère les métriques du système (CPU, GPU, RAM, Disque) pour le widget de monitoring.
+def system_monitor_stream(request):
+    """Flux Server-Sent Events du widget de monitoring.
 
-    Cette vue est appelée périodiquement par HTMX (Polling).
+    Envoie le fragment `partials/system_monitor.html` actuel, puis chaque
+    nouveau fragment rendu par le thread d'échantillonnage (un seul rendu
+    pour tous les flux, voir dashboard/stream.py). Le navigateur cesse alors
+    d'interroger `system_monitor` et y revient si le flux est coupé.
 
     Args:
         request (HttpRequest): L'objet de requête.
 
     Returns:
-        HttpResponse: Le fragment HTML (Partial) avec les jauges et valeurs mises à jour.
+        StreamingHttpResponse: Un flux 'text/event-stream' (asynchrone sous
+            ASGI, bloquant sous WSGI).
     """
-    # 1. CPU & RAM (Existant)
-    cpu = psutil.cpu_percent(interval=None)
-    ram = psutil.virtual_memory()
+    first = render_to_string(monitor.MONITOR_TEMPLATE, monitor.get_snapshot())
+    if isinstance(request, ASGIRequest):
+        events = monitor_broadcaster.events(first)
+    else:
+        events = monitor_broadcaster.sync_events(first)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Pas de mise en tampon par un proxy nginx
+    return response
 
-    # 2. DISQUES (CONFIGURATION À ADAPTER ICI)
-    # Remplacez les chemins par VOS points de montage (ceux trouvés avec df -h)
-    disks_to_check = [
-        {'name': 'Système', 'path': '/'},
-        {'name': 'Data 3TB', 'path': '/media/nimzo/3tb'},  # <--- Mettez votre chemin ici
-        {'name': 'Fast 120GB', 'path': '/media/120gb'},  # <--- Mettez votre chemin ici
-    ]
 
-    disks_info = []
-    for d in disks_to_check:
-        try:
-            usage = psutil.disk_usage(d['path'])
-            disks_info.append({
-                'name': d['name'],
-                'percent': usage.percent,
-                'free_gb': round(usage.free / (1024 ** 3), 0),
-                'total_gb': round(usage.total / (1024 ** 3), 0)
-            })
-        except FileNotFoundError:
-            # Si le disque n'est pas monté, on l'ignore ou on met 0
-            continue
-
-    # 3. GPU
-    gpu = get_gpu_stats()
+def top_processes(request):
+    """Affiche les processus les plus gourmands (panneau "Processus" de la page Infos).
+
+    La table des processus est gardée en mémoire et actualisée par le thread
+    d'échantillonnage tant que le panneau est consulté (voir dashboard/processes.py) :
+    la vue ne fait que trier et lire les premiers.
+
+    Args:
+        request (HttpRequest): La requête GET, avec en option 'sort' ('cpu', 'rss' ou 'io').
+
+    Returns:
+        HttpResponse: Le fragment `partials/top_processes.html`.
+    """
+    monitor.get_snapshot()  # Démarre l'échantillonnage s'il ne tourne pas encore
+    return render(request, 'partials/top_processes.html', panel_context(request.GET.get('sort', 'cpu')))
+
+
+def infos_data(request):
+    """Charge d'un coup toutes les cartes de la page Infos (voir dashboard/infos.py).
+
+    Les sources sont rendues en parallèle ; chaque fragment est renvoyé avec
+    `hx-swap-oob` vers sa carte. Les sources absentes (délai dépassé, erreur)
+    sont listées dans HX-Trigger (`infos-missing-<nom>`) pour que leur carte
+    se charge elle-même.
+
+    Args:
+        request (HttpRequest): L'objet de requête.
+
+    Returns:
+        HttpResponse: Les fragments hors bande, à appliquer avec hx-swap="none".
+    """
+    fragments, missing, headers = infos.gather()
+    response = render(request, 'partials/infos_data.html', {'fragments': fragments})
+    for name, value in headers.items():
+        response[name] = value
+    if missing:
+        response['HX-Trigger'] = ', '.join(f'infos-missing-{name}' for name in missing)
+    response['Cache-Control'] = 'no-cache'
+    return response
 
-    context = {
-        'cpu_usage': cpu,
-        'ram_percent': ram.percent,
-        'ram_used_gb': round(ram.used / (1024 ** 3), 1),
-        'ram_total_gb': round(ram.total / (1024 ** 3), 1),
-        'disks': disks_info,  # On envoie la liste des disques
-        'gpu': gpu,
-    }
-    return render(request, 'partials/system_monitor.html', context)
+
+def system_monitor_history(request):
+    """Renvoie l'historique des métriques système (séries pour mini-graphes).
+
+    Args:
+        request (HttpRequest): La requête GET, avec en option 'metric' (répétable,
+            toutes les métriques par défaut), 'range' (période en secondes, 3600
+            par défaut) et 'points' (nombre maximal de points par série, 120 par défaut).
+
+    Returns:
+        JsonResponse: {'range': int, 'series': {métrique: {'resolution', 't', 'min',
+            'avg', 'max'}}}, ou 400 si un paramètre est invalide.
+    """
+    try:
+        seconds = min(int(request.GET.get('range', 3600)), MONITOR_HISTORY_MAX_RANGE)
+        points = min(int(request.GET.get('points', 120)), MONITOR_HISTORY_MAX_POINTS)
+    except ValueError:
+        return JsonResponse({'error': "'range' et 'points' doivent être des entiers"}, status=400)
+    if seconds <= 0 or points <= 0:
+        return JsonResponse({'error': "'range' et 'points' doivent être positifs"}, status=400)
+
+    monitor.get_snapshot()  # Démarre l'échantillonnage s'il ne tourne pas encore
+    names = request.GET.getlist('metric') or metric_history.names()
+    series = {}
+    for name in names:
+        data = metric_history.series(name, seconds, points)
+        if data is not None:
+            series[name] = data
+    return JsonResponse({'range': seconds, 'series': series})
 
 @require_POST
 def save_note_content(request, widget_id):
     """Sauvegarde automatiquement le contenu textuel d'un widget 'Bloc-notes'.
 
-    Déclenché par HTMX lors de la frappe ou de la perte de focus.
+    Déclenché par scripts.html lors de la frappe (500 ms sans frappe) ou de la
+    perte de focus. Le client n'envoie que la partie modifiée du texte (voir
+    dashboard/notes.py). La note va dans un tampon en mémoire, écrit en base
+    toutes les quelques secondes en une seule transaction pour toutes les notes.
 
     Args:
-        request (HttpRequest): La requête POST doit contenir 'content'.
+        request (HttpRequest): La requête POST contient soit un corps JSON
+            {'base_version': int, 'patch': [début, nb_supprimés, texte]},
+            soit (ancien format) le champ 'content' avec tout le texte.
         widget_id (int): L'ID du widget.
 
     Returns:
-        HttpResponse: Statut 200 OK (pas de rendu HTML nécessaire).
+        JsonResponse:
+            - 200 {'version': int} ; plus 'content' si le delta a été fusionné
+              avec une sauvegarde plus récente (autre onglet).
+            - 409 {'version': int, 'content': str} si la version du client est
+              périmée et que la fusion est impossible.
+            - 400 si le delta est invalide.
     """
-    widget = get_object_or_404(Widget, id=widget_id)
-    # On récupère le contenu envoyé par le champ texte
-    new_content = request.POST.get('content', '')
-    widget.content = new_content
-    widget.save()
-    # On ne renvoie rien (ou un petit statut 200 OK), HTMX n'a pas besoin de redessiner
-    return HttpResponse(status=200)
+    try:
+        if request.content_type == 'application/json':
+            payload = json.loads(request.body)
+            base_version = payload['base_version']
+            if not isinstance(base_version, int):
+                raise ValueError("base_version invalide")
+            content, version, merged = notes.save_patch(widget_id, base_version, notes.parse_splice(payload['patch']))
+        else:
+            content, version, merged = '', notes.save_full(widget_id, request.POST.get('content', '')), False
+    except Widget.DoesNotExist:
+        raise Http404("Widget introuvable")
+    except notes.StaleVersion as exc:
+        return JsonResponse({'version': exc.version, 'content': exc.content}, status=409)
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({'error': 'delta invalide'}, status=400)
+
+    response = {'version': version}
+    if merged:
+        response['content'] = content
+    return JsonResponse(response)
+
+
+def note_revisions(request, widget_id):
+    """Liste les révisions enregistrées d'une note, de la plus récente à la plus ancienne.
+
+    Les sauvegardes en attente sont d'abord écrites, pour que la dernière
+    révision corresponde au texte affiché.
+
+    Args:
+        request (HttpRequest): L'objet de requête.
+        widget_id (int): L'ID du widget 'note'.
+
+    Returns:
+        JsonResponse: {'revisions': [{'id', 'version', 'created_at', 'updated_at', 'length'}]}.
+    """
+    widget = get_object_or_404(Widget, id=widget_id, widget_type='note')
+    notes.flush()
+    fields = ('id', 'version', 'created_at', 'updated_at', 'length')
+    return JsonResponse({'revisions': list(widget.revisions.values(*fields))})
+
+
+def note_revision_detail(request, widget_id, revision_id):
+    """Renvoie le texte d'une révision de note (reconstitué depuis l'historique compressé).
+
+    Args:
+        request (HttpRequest): L'objet de requête.
+        widget_id (int): L'ID du widget 'note'.
+        revision_id (int): L'ID de la révision.
+
+    Returns:
+        JsonResponse: {'id', 'version', 'created_at', 'content'}.
+    """
+    revision = get_object_or_404(NoteRevision, id=revision_id, widget_id=widget_id)
+    return JsonResponse({
+        'id': revision.id,
+        'version': revision.version,
+        'created_at': revision.created_at,
+        'content': revisions.get_content(revision),
+    })
+
+
+@require_POST
+def restore_note_revision(request, widget_id, revision_id):
+    """Remet le contenu d'une note à une révision passée.
+
+    La restauration est une sauvegarde comme une autre : la version de la note
+    augmente et le texte remplacé reste disponible dans l'historique.
+
+    Args:
+        request (HttpRequest): L'objet de requête.
+        widget_id (int): L'ID du widget 'note'.
+        revision_id (int): L'ID de la révision à restaurer.
+
+    Returns:
+        JsonResponse: {'version': int, 'content': str} pour recharger la note côté client.
+    """
+    revision = get_object_or_404(NoteRevision, id=revision_id, widget_id=widget_id)
+    content = revisions.get_content(revision)
+    return JsonResponse({'version': notes.save_full(widget_id, content), 'content': content})
 
 
 def open_local_file(request, link_id):
@@ -525,23 +882,17 @@ def open_local_file(request, link_id):
 def update_page_order(request):
     """API pour réorganiser les pages (onglets) via Drag & Drop.
 
+    Seule la clé d'ordre de la page déplacée est réécrite (voir ordering.py).
+
     Args:
-        request (HttpRequest): La requête POST doit contenir 'page' (liste d'IDs).
+        request (HttpRequest): La requête POST doit contenir :
+            - soit 'moved_id' (int), et optionnellement 'prev_id' / 'next_id' (int) ;
+            - soit 'page' (list[int]): Liste ordonnée des IDs des pages (ancien format).
 
     Returns:
         HttpResponse: Statut 200 si succès.
     """
-    page_ids = request.POST.getlist('page')
-
-    for index, page_id in enumerate(page_ids):
-        try:
-            page = get_object_or_404(Page, id=page_id)
-            page.order = index
-            page.save()
-        except:
-            continue
-
-    return HttpResponse(status=200)
+    return _reorder(request, Page, 'page', lambda page: Page.objects.all())
 
 
 def download_backup(request):
@@ -556,6 +907,9 @@ def download_backup(request):
         FileResponse: Le fichier ZIP en téléchargement (attachment).
     """
 
+    # 0. Les notes encore en mémoire doivent être dans la base sauvegardée
+    notes.flush()
+
     # 1. Préparation du fichier en mémoire (pas d'écriture sur le disque du serveur)
     buffer = io.BytesIO()
 
@@ -569,6 +923,10 @@ def download_backup(request):
     # __pycache__ : Fichiers compilés python inutiles
     # .idea : Configuration PyCharm (optionnel, souvent perso)
     EXCLUDE_DIRS = {'.venv', 'venv', '.git', '__pycache__', '.idea'}
+    # Fichiers à ignorer : l'historique du monitoring (~4,5 Mo, simple cache) s'il est dans le projet
+    EXCLUDE_FILES = set()
+    if settings.DASHBOARD_MONITOR_HISTORY_FILE:
+        EXCLUDE_FILES.add(os.path.abspath(settings.DASHBOARD_MONITOR_HISTORY_FILE))
 
     # 4. Création du ZIP
     with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
@@ -584,6 +942,8 @@ def download_backup(request):
 
                 # Chemin complet sur le disque
                 file_path = os.path.join(root, file)
+                if os.path.abspath(file_path) in EXCLUDE_FILES:
+                    continue
 
                 # Chemin relatif à l'intérieur du ZIP (pour garder la structure)
                 # ex: /home/nimzo/.../startme/manage.py devient startme/manage.py
@@ -689,27 +1049,80 @@ def run_command(request, link_id):
         return HttpResponse(status=500)
 
 def get_network_info(request):
-    """Récupère les informations réseau (IP locale et publique).
+    """Informations réseau (IP locale et publique), depuis le cache de network.py.
+
+    Ne fait jamais d'appel réseau (voir network.network_context).
 
     Returns:
         HttpResponse: Fragment HTML avec les IPs.
     """
-    # 1. IP Locale
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-    except:
-        local_ip = "127.0.0.1"
-
-    # 2. IP Publique (via API externe rapide)
-    try:
-        public_ip = requests.get('https://api.ipify.org', timeout=2).text
-    except:
-        public_ip = "Indisponible"
+    return render(request, 'partials/network_info.html', network_context())
 
-    return render(request, 'partials/network_info.html', {
-        'local_ip': local_ip,
-        'public_ip': public_ip
-    })
+
+def weather(request):
+    """Météo du widget de la page Infos, depuis le cache partagé de weather.py.
+
+    Le service météo n'est jamais appelé pendant la requête : la prévision
+    (déjà mise en forme) est redemandée en arrière-plan quand elle a expiré.
+
+    Args:
+        request (HttpRequest): La requête GET, avec en option 'lat' et 'lon'
+            (lieu des réglages par défaut).
+
+    Returns:
+        HttpResponse: Le fragment `partials/weather.html`, ou 400 si les
+            coordonnées sont invalides.
+    """
+    latitude = longitude = None
+    if 'lat' in request.GET or 'lon' in request.GET:
+        try:
+            latitude, longitude = float(request.GET['lat']), float(request.GET['lon'])
+        except (KeyError, ValueError):
+            return HttpResponse(status=400)
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return HttpResponse(status=400)
+    return render(request, 'partials/weather.html', weather_context(latitude, longitude))
+
+
+def search_links(request):
+    """Recherche instantanée dans tous les liens (lanceur rapide).
+
+    Appelée par HTMX à chaque frappe dans la barre de recherche. Les résultats
+    viennent de l'index en mémoire (search.py), sans requête SQL.
+
+    Args:
+        request (HttpRequest): La requête GET contenant 'q'.
+
+    Returns:
+        HttpResponse: Le fragment `partials/search_results.html` (vide si 'q' est vide).
+    """
+    query = request.GET.get('q', '').strip()
+    results = link_index.search(query) if query else []
+    return render(request, 'partials/search_results.html', {'query': query, 'results': results})
+
+
+def search_notes(request):
+    """Recherche plein texte (FTS5) dans le contenu des notes et les liens.
+
+    Args:
+        request (HttpRequest): La requête GET contenant 'q'.
+
+    Returns:
+        HttpResponse: Le fragment `partials/fulltext_results.html`, résultats
+            classés par pertinence avec extraits surlignés.
+    """
+    query = request.GET.get('q', '').strip()
+    if query:
+        # L'index FTS est tenu à jour par des triggers : les notes en attente doivent être écrites
+        notes.flush()
+    results = fulltext.search(query) if query else []
+    return render(request, 'partials/fulltext_results.html', {'query': query, 'results': results})
+
+
+def cache_stats(request):
+    """Expose les compteurs du cache de fragments des widgets.
+
+    Returns:
+        JsonResponse: {'hits': int, 'misses': int, 'hit_ratio': float | None}.
+    """
+    return JsonResponse(caching.get_stats())
@@ -0,0 +1,154 @@
+"""Météo du widget de la page Infos, obtenue par le serveur pour tous les clients.
+
+Le service (DASHBOARD_WEATHER_API_URL, Open-Meteo par défaut) n'est plus
+appelé par chaque onglet : le serveur garde, pour chaque lieu, la dernière
+prévision déjà mise en forme pour `partials/weather.html` (température,
+description, icônes, noms des jours). Un `Refresher` (refresh.py) la sert
+immédiatement et la redemande en arrière-plan quand elle a plus de
+DASHBOARD_WEATHER_TTL secondes.
+
+La redemande est conditionnelle : l'ETag / Last-Modified de la réponse
+précédente est renvoyé, et un 304 garde la prévision en place sans la
+recalculer.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import requests
+from django.conf import settings
+
+from .refresh import Refresher
+
+WEATHER_TIMEOUT = 5
+# Nombre maximal de lieux gardés en mémoire (les moins récemment consultés sont oubliés)
+MAX_LOCATIONS = 32
+FORECAST_DAYS = 4
+
+# Codes météo WMO -> (icône, description)
+WEATHER_CODES = {
+    0: ('☀️', 'Ciel dégagé'), 1: ('🌤️', 'Plutôt dégagé'), 2: ('⛅', 'Partiellement nuageux'),
+    3: ('☁️', 'Couvert'), 45: ('🌫️', 'Brouillard'), 48: ('🌫️', 'Brouillard givrant'),
+    51: ('🌦️', 'Bruine légère'), 53: ('🌦️', 'Bruine'), 55: ('🌧️', 'Bruine forte'),
+    61: ('🌧️', 'Pluie légère'), 63: ('🌧️', 'Pluie'), 65: ('⛈️', 'Pluie forte'),
+    71: ('🌨️', 'Neige légère'), 73: ('🌨️', 'Neige'), 75: ('❄️', 'Neige forte'),
+    80: ('🌦️', 'Averses'), 81: ('🌧️', 'Averses fortes'), 82: ('⛈️', 'Averses violentes'),
+    95: ('⛈️', 'Orage'),
+}
+DAY_NAMES = ('lun.', 'mar.', 'mer.', 'jeu.', 'ven.', 'sam.', 'dim.')
+
+_lock = threading.Lock()
+_refreshers = OrderedDict()  # (latitude, longitude) -> Refresher
+
+
+def describe(code):
+    """Renvoie (icône, description) d'un code météo WMO."""
+    return WEATHER_CODES.get(code, ('❓', f"Code météo {code}"))
+
+
+def build_forecast(data):
+    """Met en forme la réponse d'Open-Meteo pour le gabarit.
+
+    Returns:
+        dict: 'temperature', 'icon', 'description', 'days' (les jours suivants :
+            'name', 'icon', 'max', 'min') et 'updated' (heure de la mesure).
+    """
+    current, daily = data['current'], data['daily']
+    icon, description = describe(current['weather_code'])
+    days = []
+    for i in range(1, len(daily['time'])):
+        day_icon, day_description = describe(daily['weather_code'][i])
+        days.append({
+            'name': DAY_NAMES[date.fromisoformat(daily['time'][i]).weekday()],
+            'icon': day_icon,
+            'description': day_description,
+            'max': round(daily['temperature_2m_max'][i]),
+            'min': round(daily['temperature_2m_min'][i]),
+        })
+    return {
+        'temperature': round(current['temperature_2m']),
+        'icon': icon,
+        'description': description,
+        'days': days,
+        'updated': time.strftime('%H:%M'),
+    }
+
+
+def fetch_forecast(latitude, longitude, previous):
+    """Interroge DASHBOARD_WEATHER_API_URL (requête conditionnelle si `previous`).
+
+    Raises:
+        requests.RequestException: Service injoignable ou en erreur.
+        KeyError, TypeError, ValueError: Réponse inattendue.
+    """
+    headers = {}
+    if previous:
+        if previous['etag']:
+            headers['If-None-Match'] = previous['etag']
+        if previous['last_modified']:
+            headers['If-Modified-Since'] = previous['last_modified']
+    response = requests.get(settings.DASHBOARD_WEATHER_API_URL, timeout=WEATHER_TIMEOUT, headers=headers, params={
+        'latitude': latitude,
+        'longitude': longitude,
+        'current': 'temperature_2m,weather_code',
+        'daily': 'weather_code,temperature_2m_max,temperature_2m_min',
+        'timezone': settings.DASHBOARD_WEATHER_TIMEZONE,
+        'forecast_days': FORECAST_DAYS,
+    })
+    if response.status_code == 304 and previous:
+        return previous  # Rien de nouveau : même objet, rien à recalculer
+    response.raise_for_status()
+    return {
+        'forecast': build_forecast(response.json()),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+
+
+def get_refresher(latitude, longitude):
+    """Renvoie le `Refresher` partagé d'un lieu (coordonnées arrondies à 0,01°, soit ~1 km)."""
+    key = (round(latitude, 2), round(longitude, 2))
+    with _lock:
+        refresher = _refreshers.get(key)
+        if refresher is None:
+            refresher = Refresher(
+                f'météo {key[0]},{key[1]}',
+                lambda previous: fetch_forecast(key[0], key[1], previous),
+                ttl=settings.DASHBOARD_WEATHER_TTL,
+            )
+            _refreshers[key] = refresher
+            if len(_refreshers) > MAX_LOCATIONS:
+                _refreshers.popitem(last=False)
+        else:
+            _refreshers.move_to_end(key)
+        return refresher
+
+
+def weather_context(latitude=None, longitude=None):
+    """Contexte de `partials/weather.html`, depuis le cache (n'attend jamais le service).
+
+    Args:
+        latitude, longitude (float | None): Lieu ; par défaut celui des réglages.
+
+    Returns:
+        dict: 'label', 'custom' (lieu autre que celui des réglages), 'forecast'
+            (None tant qu'aucune prévision n'est connue), 'pending' (première
+            demande en cours) et 'failed' (service en erreur, aucune prévision).
+    """
+    if latitude is None or longitude is None:
+        latitude, longitude = settings.DASHBOARD_WEATHER_LATITUDE, settings.DASHBOARD_WEATHER_LONGITUDE
+        label, custom = settings.DASHBOARD_WEATHER_LABEL, False
+    else:
+        label, custom = f"{latitude:.2f}, {longitude:.2f}", True
+    refresher = get_refresher(latitude, longitude)
+    value = refresher.get()
+    return {
+        'label': label,
+        'custom': custom,
+        'latitude': latitude,
+        'longitude': longitude,
+        'forecast': value and value['forecast'],
+        'pending': value is None and refresher.error is None,
+        'failed': value is None and refresher.error is not None,
+    }
@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Le flux SSE du monitoring (api/system-monitor/stream/) ne coûte qu'une tâche
+asyncio par client sous ASGI, par exemple : uvicorn startme.asgi:application
 """
 
 import os
@@ -94,6 +94,105 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Partagé par tous les threads du serveur : fragments HTML des widgets et révisions.
+# LocMemCache est propre à chaque processus : l'invalidation (révisions des
+# widgets et révision globale de l'ETag, voir dashboard/caching.py) n'est vue
+# que par le processus qui a fait l'écriture. Le tableau de bord doit donc
+# tourner dans un seul processus (`runserver`, ou un serveur WSGI/ASGI lancé
+# avec un seul worker, threads autorisés). Pour plusieurs processus, remplacer
+# ce backend par un cache partagé (Redis, Memcached, FileBasedCache...).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+# Durée de vie (secondes) d'un fragment HTML de widget en cache
+DASHBOARD_FRAGMENT_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_FRAGMENT_CACHE_TIMEOUT', 24 * 3600))
+
+# Au-delà de ce nombre de widgets, une page charge ses widgets à l'affichage (0 = désactivé)
+DASHBOARD_LAZY_WIDGETS = int(os.getenv('DASHBOARD_LAZY_WIDGETS', 40))
+
+# Tampon d'écriture des notes (voir dashboard/notes.py) : les sauvegardes sont
+# regroupées et écrites en une transaction toutes les N secondes (0 = écriture immédiate),
+# ou plus tôt si le texte en attente dépasse la taille maximale (en caractères).
+DASHBOARD_NOTE_FLUSH_INTERVAL = float(os.getenv('DASHBOARD_NOTE_FLUSH_INTERVAL', 5))
+DASHBOARD_NOTE_BUFFER_MAX_SIZE = int(os.getenv('DASHBOARD_NOTE_BUFFER_MAX_SIZE', 2_000_000))
+
+# Historique des notes (voir dashboard/revisions.py) : les sauvegardes rapprochées de moins
+# de N secondes sont regroupées dans une même révision ; un instantané complet est gardé
+# toutes les N révisions ; les révisions plus vieilles que N jours ou au-delà de N par note
+# sont supprimées.
+DASHBOARD_NOTE_REVISION_INTERVAL = int(os.getenv('DASHBOARD_NOTE_REVISION_INTERVAL', 300))
+DASHBOARD_NOTE_SNAPSHOT_EVERY = int(os.getenv('DASHBOARD_NOTE_SNAPSHOT_EVERY', 20))
+DASHBOARD_NOTE_REVISION_RETENTION_DAYS = int(os.getenv('DASHBOARD_NOTE_REVISION_RETENTION_DAYS', 30))
+DASHBOARD_NOTE_REVISION_MAX = int(os.getenv('DASHBOARD_NOTE_REVISION_MAX', 200))
+
+# Au-delà de ce nombre de caractères, une note est stockée compressée (zlib) et la page
+# n'en affiche qu'un aperçu ; le texte complet est chargé quand on clique dans la note.
+DASHBOARD_NOTE_COMPRESS_THRESHOLD = int(os.getenv('DASHBOARD_NOTE_COMPRESS_THRESHOLD', 8000))
+
+# Intervalle (secondes) entre deux mesures des métriques système (voir dashboard/monitor.py).
+# Le widget de monitoring affiche la dernière mesure, quel que soit le nombre d'onglets.
+DASHBOARD_MONITOR_INTERVAL = float(os.getenv('DASHBOARD_MONITOR_INTERVAL', 4))
+
+# Écart minimal (points de %, °C) pour renvoyer le widget de monitoring à un client qui
+# l'interroge : en dessous, la réponse est vide (204 pour HTMX, 304 sinon).
+DASHBOARD_MONITOR_TOLERANCE = float(os.getenv('DASHBOARD_MONITOR_TOLERANCE', 1.0))
+
+# Commande qui écrit en continu les métriques GPU au format de nvidia-smi (voir dashboard/gpu.py).
+# Vide = nvidia-smi en boucle ; '{interval}' est remplacé par l'intervalle ci-dessus.
+# Sans GPU : DASHBOARD_MONITOR_GPU_COMMAND="python -m dashboard.gpu --fake 2 {interval}"
+DASHBOARD_MONITOR_GPU_COMMAND = os.getenv('DASHBOARD_MONITOR_GPU_COMMAND', '')
+
+# Fichier (mmap, taille fixe d'environ 4,5 Mo) où est gardé l'historique du monitoring
+# (voir dashboard/metricstore.py). Vide = historique en mémoire, perdu au redémarrage.
+# Par défaut dans le dossier de cache de l'utilisateur, hors du projet (et donc de la sauvegarde ZIP).
+DASHBOARD_MONITOR_HISTORY_FILE = os.getenv('DASHBOARD_MONITOR_HISTORY_FILE', str(
+    Path(os.getenv('XDG_CACHE_HOME') or Path.home() / '.cache') / 'startme' / 'monitor_history.bin'))
+
+# Disques du monitoring (voir dashboard/disks.py), découverts dans /proc/mounts :
+# types de système de fichiers retenus, points de montage ignorés (motifs), noms affichés
+# ("chemin=Nom,chemin=Nom") et délai maximal (secondes) d'une mesure avant de déclarer
+# le disque bloqué (montage réseau qui ne répond plus).
+DASHBOARD_MONITOR_DISK_FSTYPES = os.getenv(
+    'DASHBOARD_MONITOR_DISK_FSTYPES',
+    'ext2,ext3,ext4,xfs,btrfs,zfs,f2fs,vfat,exfat,ntfs,ntfs3,fuseblk,nfs,nfs4,cifs,smb3,fuse.sshfs',
+).split(',')
+DASHBOARD_MONITOR_DISK_EXCLUDE = os.getenv(
+    'DASHBOARD_MONITOR_DISK_EXCLUDE', '/boot,/boot/*,/snap/*,/var/snap/*,/var/lib/docker/*,/run/*',
+).split(',')
+DASHBOARD_MONITOR_DISK_NAMES = dict(
+    item.split('=', 1) for item in os.getenv(
+        'DASHBOARD_MONITOR_DISK_NAMES', '/=Système,/media/nimzo/3tb=Data 3TB,/media/120gb=Fast 120GB',
+    ).split(',') if '=' in item
+)
+DASHBOARD_MONITOR_DISK_TIMEOUT = float(os.getenv('DASHBOARD_MONITOR_DISK_TIMEOUT', 2))
+
+# Widget "Réseau" (voir dashboard/network.py) : service qui renvoie l'IP publique en texte
+# brut (à remplacer par un serveur local pour les tests) et durée (secondes) pendant laquelle
+# les adresses connues sont servies sans être redemandées.
+DASHBOARD_PUBLIC_IP_URL = os.getenv('DASHBOARD_PUBLIC_IP_URL', 'https://api.ipify.org')
+DASHBOARD_NETWORK_TTL = float(os.getenv('DASHBOARD_NETWORK_TTL', 300))
+
+# Widget "Météo" (voir dashboard/weather.py) : service au format Open-Meteo (à remplacer par
+# un faux serveur local pour les tests), lieu par défaut et durée (secondes) pendant laquelle
+# une prévision est servie sans être redemandée.
+DASHBOARD_WEATHER_API_URL = os.getenv('DASHBOARD_WEATHER_API_URL', 'https://api.open-meteo.com/v1/forecast')
+DASHBOARD_WEATHER_LATITUDE = float(os.getenv('DASHBOARD_WEATHER_LATITUDE', 45.5017))
+DASHBOARD_WEATHER_LONGITUDE = float(os.getenv('DASHBOARD_WEATHER_LONGITUDE', -73.5673))
+DASHBOARD_WEATHER_LABEL = os.getenv('DASHBOARD_WEATHER_LABEL', 'Montréal, QC')
+DASHBOARD_WEATHER_TIMEZONE = os.getenv('DASHBOARD_WEATHER_TIMEZONE', 'America/Toronto')
+DASHBOARD_WEATHER_TTL = float(os.getenv('DASHBOARD_WEATHER_TTL', 1800))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 